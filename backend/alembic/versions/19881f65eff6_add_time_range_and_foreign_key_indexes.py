@@ -0,0 +1,71 @@
+"""add time range and foreign key indexes
+
+Revision ID: 19881f65eff6
+Revises: 8ac1172e680b
+Create Date: 2026-10-18 04:54:50.585884
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "19881f65eff6"
+down_revision: Union[str, Sequence[str], None] = "8ac1172e680b"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (index name, table, columns)
+INDEXES = [
+    ("ix_sessions_user_id_created_at", "sessions", ["user_id", "created_at"]),
+    ("ix_sessions_exercises_created_at", "sessions_exercises", ["created_at"]),
+    (
+        "ix_sessions_exercises_exercise_id_created_at",
+        "sessions_exercises",
+        ["exercise_id", "created_at"],
+    ),
+    ("ix_sessions_exercises_session_id", "sessions_exercises", ["session_id"]),
+    ("ix_routines_exercises_routine_id", "routines_exercises", ["routine_id"]),
+    ("ix_routines_exercises_exercise_id", "routines_exercises", ["exercise_id"]),
+    (
+        "ix_routines_exercises_sets_routine_exercise_id",
+        "routines_exercises_sets",
+        ["routine_exercise_id"],
+    ),
+    (
+        "ix_personal_records_session_exercise_id",
+        "personal_records",
+        ["session_exercise_id"],
+    ),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # NOTE: CREATE INDEX CONCURRENTLY does not block writes but can not run inside
+    # a transaction. A failed build leaves an INVALID index behind, drop it before
+    # running the migration again.
+    with op.get_context().autocommit_block():
+        for name, table_name, columns in INDEXES:
+            op.create_index(
+                name,
+                table_name,
+                columns,
+                unique=False,
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table_name, _ in reversed(INDEXES):
+            op.drop_index(
+                name,
+                table_name=table_name,
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
@@ -0,0 +1,77 @@
+"""backfill daily user volume rollup
+
+Revision ID: 3f0a8c2d9b61
+Revises: 7d9e6b6802d1
+Create Date: 2026-10-18 14:21:07.318204
+
+Fills daily_user_volume from the sets written before the release maintaining it,
+safe to run while that release serves requests. Deploy order:
+
+1. alembic upgrade 7d9e6b6802d1, then deploy the release on every instance
+2. alembic upgrade head once no older release writes sets anymore
+
+Until then the rollup misses older sets and edits of them may log negative rows.
+Each user is rebuilt from their sets, so running it again is harmless: downgrade
+is a no-op, and downgrade -1 followed by upgrade head catches up the sets of older
+instances when entrypoint.sh already ran it during a rolling deploy.
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "3f0a8c2d9b61"
+down_revision: Union[str, Sequence[str], None] = "7d9e6b6802d1"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# users rebuilt per statement, each batch commits on its own
+BATCH_SIZE = 100
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.get_context().autocommit_block():
+        connection = op.get_bind()
+        max_id = connection.exec_driver_sql(
+            "SELECT coalesce(max(id), 0) FROM users"
+        ).scalar()
+        for batch_start in range(0, max_id + 1, BATCH_SIZE):
+            batch = f"user_id >= {batch_start} AND user_id < {batch_start + BATCH_SIZE}"
+            # NOTE: a DO block runs as one transaction. The lock waits for the
+            # writes already adding their deltas and holds back new ones until the
+            # batch commits, the sets it reads and the deltas never overlap
+            connection.exec_driver_sql(
+                f"""
+                DO $$
+                BEGIN
+                    LOCK TABLE daily_user_volume IN SHARE ROW EXCLUSIVE MODE;
+                    DELETE FROM daily_user_volume WHERE {batch};
+                    INSERT INTO daily_user_volume
+                        (user_id, day, exercise_id, total_weight, total_reps,
+                        total_sets, session_count)
+                    SELECT s.user_id,
+                        (se.created_at AT TIME ZONE u.timezone)::date,
+                        se.exercise_id,
+                        coalesce(sum(se.weight_lifted), 0),
+                        coalesce(sum(se.reps_completed), 0),
+                        count(*),
+                        count(DISTINCT se.session_id)
+                    FROM sessions_exercises se
+                    JOIN sessions s ON s.id = se.session_id
+                    JOIN users u ON u.id = s.user_id
+                    WHERE s.{batch}
+                    GROUP BY 1, 2, 3;
+                END
+                $$
+                """
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # NOTE: the rows stay, they are maintained by the release from then on
+    pass
@@ -0,0 +1,64 @@
+"""add sets exercise id weight index
+
+Replaces the exercise_id, created_at index of the sets: personal records are now
+recomputed from the heaviest set and no query reads the latest set of an exercise
+anymore. The new index also leads with exercise_id, so it still serves the foreign
+key lookups of a removed exercise.
+
+Revision ID: 7d9e6b6802d1
+Revises: e2b890d3b0a7
+Create Date: 2026-10-18 09:12:41.204318
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "7d9e6b6802d1"
+down_revision: Union[str, Sequence[str], None] = "e2b890d3b0a7"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # NOTE: built concurrently like the other indexes of the sets, drop an INVALID
+    # index left by a failed build before running the migration again
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_sessions_exercises_exercise_id_weight_lifted",
+            "sessions_exercises",
+            ["exercise_id", sa.text("weight_lifted DESC")],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.drop_index(
+            "ix_sessions_exercises_exercise_id_created_at",
+            table_name="sessions_exercises",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_sessions_exercises_exercise_id_created_at",
+            "sessions_exercises",
+            ["exercise_id", "created_at"],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.drop_index(
+            "ix_sessions_exercises_exercise_id_weight_lifted",
+            table_name="sessions_exercises",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
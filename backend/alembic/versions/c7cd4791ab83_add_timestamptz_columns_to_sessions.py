@@ -0,0 +1,137 @@
+"""add timestamptz columns to sessions
+
+Revision ID: c7cd4791ab83
+Revises: e6e98a92701e
+Create Date: 2026-10-18 05:07:57.659503
+
+First half of the move of sessions and sessions_exercises to timestamptz, safe to
+run while the previous release still writes epoch seconds. A trigger fills the new
+columns on every write, existing rows are backfilled in small batches and the new
+indexes are built concurrently. The next revision swaps the columns.
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "c7cd4791ab83"
+down_revision: Union[str, Sequence[str], None] = "e6e98a92701e"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# table -> epoch seconds columns copied into <column>_tz
+COLUMNS = {
+    "sessions": ["created_at", "updated_at"],
+    "sessions_exercises": ["created_at"],
+}
+
+# (index name, table, columns), renamed to the name without _tz by the swap
+INDEXES = [
+    ("ix_sessions_user_id_created_at_tz", "sessions", ["user_id", "created_at_tz"]),
+    ("ix_sessions_exercises_created_at_tz", "sessions_exercises", ["created_at_tz"]),
+    (
+        "ix_sessions_exercises_exercise_id_created_at_tz",
+        "sessions_exercises",
+        ["exercise_id", "created_at_tz"],
+    ),
+]
+
+# rows updated per statement, each batch commits on its own
+BATCH_SIZE = 10000
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table_name, columns in COLUMNS.items():
+        for column in columns:
+            op.add_column(
+                table_name,
+                sa.Column(f"{column}_tz", sa.DateTime(timezone=True), nullable=True),
+            )
+
+        assignments = "; ".join(
+            f"NEW.{column}_tz := to_timestamp(NEW.{column})" for column in columns
+        )
+        op.execute(
+            f"""
+            CREATE FUNCTION {table_name}_sync_timestamptz() RETURNS trigger AS $$
+            BEGIN
+                {assignments};
+                RETURN NEW;
+            END
+            $$ LANGUAGE plpgsql
+            """
+        )
+        op.execute(
+            f"""
+            CREATE TRIGGER {table_name}_sync_timestamptz
+            BEFORE INSERT OR UPDATE ON {table_name}
+            FOR EACH ROW EXECUTE FUNCTION {table_name}_sync_timestamptz()
+            """
+        )
+
+    # NOTE: the trigger is committed before the backfill starts, rows written from
+    # now on are already filled in
+    with op.get_context().autocommit_block():
+        connection = op.get_bind()
+        for table_name, columns in COLUMNS.items():
+            assignments = ", ".join(
+                f"{column}_tz = to_timestamp({column})" for column in columns
+            )
+            max_id = connection.exec_driver_sql(
+                f"SELECT coalesce(max(id), 0) FROM {table_name}"
+            ).scalar()
+            # short transactions keep row locks brief and let vacuum keep up
+            for batch_start in range(0, max_id + 1, BATCH_SIZE):
+                connection.exec_driver_sql(
+                    f"UPDATE {table_name} SET {assignments} "
+                    f"WHERE id >= %(start)s AND id < %(end)s "
+                    f"AND {columns[0]}_tz IS NULL",
+                    {"start": batch_start, "end": batch_start + BATCH_SIZE},
+                )
+
+            # NOTE: validated without blocking writes, lets the swap set NOT NULL
+            # without scanning the table again
+            for column in columns:
+                connection.exec_driver_sql(
+                    f"ALTER TABLE {table_name} ADD CONSTRAINT "
+                    f"{table_name}_{column}_tz_not_null "
+                    f"CHECK ({column}_tz IS NOT NULL) NOT VALID"
+                )
+                connection.exec_driver_sql(
+                    f"ALTER TABLE {table_name} VALIDATE CONSTRAINT "
+                    f"{table_name}_{column}_tz_not_null"
+                )
+
+        for name, table_name, columns in INDEXES:
+            op.create_index(
+                name,
+                table_name,
+                columns,
+                unique=False,
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table_name, _ in reversed(INDEXES):
+            op.drop_index(
+                name,
+                table_name=table_name,
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
+
+    for table_name, columns in COLUMNS.items():
+        op.execute(f"DROP TRIGGER {table_name}_sync_timestamptz ON {table_name}")
+        op.execute(f"DROP FUNCTION {table_name}_sync_timestamptz()")
+        # the check constraints go with their columns
+        for column in columns:
+            op.drop_column(table_name, f"{column}_tz")
@@ -0,0 +1,105 @@
+"""swap sessions timestamps to timestamptz
+
+Revision ID: e2b890d3b0a7
+Revises: c7cd4791ab83
+Create Date: 2026-10-18 05:08:13.631781
+
+
+Second half of the move to timestamptz, deploy it together with the code reading
+the new columns. Every statement only touches the catalog: the columns are filled
+by the previous revision and NOT NULL is proven by its validated check constraints.
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "e2b890d3b0a7"
+down_revision: Union[str, Sequence[str], None] = "c7cd4791ab83"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# table -> columns moved from epoch seconds to timestamptz
+COLUMNS = {
+    "sessions": ["created_at", "updated_at"],
+    "sessions_exercises": ["created_at"],
+}
+
+# (index name, table, columns) of the epoch seconds columns
+INDEXES = [
+    ("ix_sessions_user_id_created_at", "sessions", ["user_id", "created_at"]),
+    ("ix_sessions_exercises_created_at", "sessions_exercises", ["created_at"]),
+    (
+        "ix_sessions_exercises_exercise_id_created_at",
+        "sessions_exercises",
+        ["exercise_id", "created_at"],
+    ),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # NOTE: give up instead of queueing every query behind the table locks
+    op.execute("SET LOCAL lock_timeout = '5s'")
+
+    for table_name, columns in COLUMNS.items():
+        op.execute(f"DROP TRIGGER {table_name}_sync_timestamptz ON {table_name}")
+        op.execute(f"DROP FUNCTION {table_name}_sync_timestamptz()")
+
+        for column in columns:
+            op.alter_column(table_name, f"{column}_tz", nullable=False)
+            op.drop_constraint(f"{table_name}_{column}_tz_not_null", table_name)
+            # the epoch seconds indexes go with the column
+            op.drop_column(table_name, column)
+            op.alter_column(table_name, f"{column}_tz", new_column_name=column)
+
+    for name, _, _ in INDEXES:
+        op.execute(f"ALTER INDEX {name}_tz RENAME TO {name}")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # NOTE: not online, the epoch seconds columns are rebuilt under lock
+    for name, _, _ in INDEXES:
+        op.execute(f"ALTER INDEX {name} RENAME TO {name}_tz")
+
+    for table_name, columns in COLUMNS.items():
+        for column in columns:
+            op.alter_column(table_name, column, new_column_name=f"{column}_tz")
+            op.execute(f"ALTER TABLE {table_name} ADD COLUMN {column} double precision")
+            op.execute(
+                f"UPDATE {table_name} SET {column} = extract(epoch FROM {column}_tz)"
+            )
+            op.alter_column(table_name, column, nullable=False)
+            op.alter_column(table_name, f"{column}_tz", nullable=True)
+            op.execute(
+                f"ALTER TABLE {table_name} ADD CONSTRAINT "
+                f"{table_name}_{column}_tz_not_null CHECK ({column}_tz IS NOT NULL)"
+            )
+
+        assignments = "; ".join(
+            f"NEW.{column}_tz := to_timestamp(NEW.{column})" for column in columns
+        )
+        op.execute(
+            f"""
+            CREATE FUNCTION {table_name}_sync_timestamptz() RETURNS trigger AS $$
+            BEGIN
+                {assignments};
+                RETURN NEW;
+            END
+            $$ LANGUAGE plpgsql
+            """
+        )
+        op.execute(
+            f"""
+            CREATE TRIGGER {table_name}_sync_timestamptz
+            BEFORE INSERT OR UPDATE ON {table_name}
+            FOR EACH ROW EXECUTE FUNCTION {table_name}_sync_timestamptz()
+            """
+        )
+
+    for name, table_name, columns in INDEXES:
+        op.create_index(name, table_name, columns, unique=False)
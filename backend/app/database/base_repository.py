@@ -7,6 +7,10 @@ class BaseRepository(ABC):
     def get_by_id(self, session: Session, id: int):
         pass
 
+    @abstractmethod
+    def get_by_ids(self, session: Session, ids: list[int]):
+        pass
+
     @abstractmethod
     def get_all(self, session: Session):
         pass
@@ -0,0 +1,251 @@
+from collections import defaultdict
+from datetime import date
+from decimal import Decimal
+from typing import Optional
+from zoneinfo import ZoneInfo
+import logging
+
+from sqlalchemy import Date, cast
+from sqlalchemy.dialects.postgresql import insert
+from sqlmodel import Session, delete, func, select
+
+from app.database.models import DailyUserVolume, SessionExercise, User, WorkoutSession
+
+logger = logging.getLogger(__name__)
+
+# (user_id, day, exercise_id)
+VolumeKey = tuple[int, date, Optional[int]]
+
+CONSTRAINT_NAME = "uq_daily_user_volume_user_id_day_exercise_id"
+
+
+class DailyVolumeRepository:
+    """Keeps the daily_user_volume rollup in step with the sessions.
+
+    The session repository computes the contribution of a session before and after
+    a write and applies the difference, in the same transaction as the sets.
+    """
+
+    @staticmethod
+    def contribution(workout_session: WorkoutSession) -> dict[VolumeKey, dict]:
+        """Returns the totals a session adds to each (user_id, day, exercise_id).
+
+        Sets are bucketed by the day of their own created_at in the user's time zone.
+        """
+        user_timezone = ZoneInfo(workout_session.user.timezone)
+        contribution: dict[VolumeKey, dict] = defaultdict(
+            lambda: {"weight": Decimal(0), "reps": 0, "sets": 0, "sessions": 1}
+        )
+        for session_exercise in workout_session.exercise_links or []:
+            day = session_exercise.created_at.astimezone(user_timezone).date()
+            totals = contribution[
+                (workout_session.user_id, day, session_exercise.exercise_id)
+            ]
+            totals["weight"] += Decimal(session_exercise.weight_lifted or 0)
+            totals["reps"] += session_exercise.reps_completed or 0
+            totals["sets"] += 1
+
+        return dict(contribution)
+
+    @staticmethod
+    def difference(
+        old: dict[VolumeKey, dict], new: dict[VolumeKey, dict]
+    ) -> dict[VolumeKey, dict]:
+        """Returns new - old per key, leaving out the keys that did not change."""
+        deltas: dict[VolumeKey, dict] = {}
+        for key in old.keys() | new.keys():
+            empty = {"weight": Decimal(0), "reps": 0, "sets": 0, "sessions": 0}
+            delta = {
+                name: new.get(key, empty)[name] - old.get(key, empty)[name]
+                for name in empty
+            }
+            if any(delta.values()):
+                deltas[key] = delta
+
+        return deltas
+
+    @staticmethod
+    def negate(contribution: dict[VolumeKey, dict]) -> dict[VolumeKey, dict]:
+        return {
+            key: {name: -value for name, value in totals.items()}
+            for key, totals in contribution.items()
+        }
+
+    def apply(self, session: Session, deltas: dict[VolumeKey, dict]):
+        """Adds the deltas to the rollup in one upsert and drops emptied rows.
+
+        A row only goes below zero when the rollup drifted from the sets, it is then
+        kept and logged so rebuild can fix it, instead of silently dropping it.
+        """
+        if not deltas:
+            return
+
+        statement = insert(DailyUserVolume).values(
+            [
+                {
+                    "user_id": user_id,
+                    "day": day,
+                    "exercise_id": exercise_id,
+                    "total_weight": delta["weight"],
+                    "total_reps": delta["reps"],
+                    "total_sets": delta["sets"],
+                    "session_count": delta["sessions"],
+                }
+                # NOTE: a stable order, concurrent writers lock rows in the same order
+                for (user_id, day, exercise_id), delta in sorted(
+                    deltas.items(), key=lambda item: (item[0][:2], item[0][2] or 0)
+                )
+            ]
+        )
+        rows = session.exec(
+            statement.on_conflict_do_update(
+                constraint=CONSTRAINT_NAME,
+                set_={
+                    "total_weight": DailyUserVolume.total_weight
+                    + statement.excluded.total_weight,
+                    "total_reps": DailyUserVolume.total_reps
+                    + statement.excluded.total_reps,
+                    "total_sets": DailyUserVolume.total_sets
+                    + statement.excluded.total_sets,
+                    "session_count": DailyUserVolume.session_count
+                    + statement.excluded.session_count,
+                },
+            ).returning(
+                DailyUserVolume.id,
+                DailyUserVolume.user_id,
+                DailyUserVolume.day,
+                DailyUserVolume.exercise_id,
+                DailyUserVolume.total_weight,
+                DailyUserVolume.total_reps,
+                DailyUserVolume.total_sets,
+                DailyUserVolume.session_count,
+            )
+        ).all()
+
+        emptied_ids: list[int] = []
+        for row in rows:
+            totals = (
+                row.total_weight,
+                row.total_reps,
+                row.total_sets,
+                row.session_count,
+            )
+            if any(total < 0 for total in totals):
+                logger.error(
+                    f"Rollup of user {row.user_id} went negative on {row.day} for "
+                    f"exercise {row.exercise_id}: {totals}, rebuild it"
+                )
+            elif not any(totals):
+                emptied_ids.append(row.id)
+
+        # days and exercises left without sets
+        if emptied_ids:
+            session.exec(
+                delete(DailyUserVolume).where(DailyUserVolume.id.in_(emptied_ids))
+            )
+
+    def merge_into_no_exercise(self, session: Session, exercise_id: int):
+        """Moves the rollup rows of an exercise about to be removed to the NULL rows.
+
+        Its sets keep their history without an exercise, so their totals join the
+        rows of the sets without one. Must run before the exercise is deleted, a
+        session is only counted again when it has no set without an exercise that
+        day yet.
+        """
+        moved_rows = session.exec(
+            delete(DailyUserVolume)
+            .where(DailyUserVolume.exercise_id == exercise_id)
+            .returning(
+                DailyUserVolume.user_id,
+                DailyUserVolume.day,
+                DailyUserVolume.total_weight,
+                DailyUserVolume.total_reps,
+                DailyUserVolume.total_sets,
+            )
+        ).all()
+        if not moved_rows:
+            return
+
+        day = cast(func.timezone(User.timezone, SessionExercise.created_at), Date)
+        # sessions of each day whose sets, among the moved and the NULL ones, are
+        # all of the exercise
+        sessions_by_day = (
+            select(
+                WorkoutSession.user_id,
+                day.label("day"),
+                SessionExercise.session_id,
+            )
+            .join(WorkoutSession, WorkoutSession.id == SessionExercise.session_id)
+            .join(User, User.id == WorkoutSession.user_id)
+            .where(
+                SessionExercise.session_id.in_(
+                    select(SessionExercise.session_id).where(
+                        SessionExercise.exercise_id == exercise_id
+                    )
+                ),
+                (SessionExercise.exercise_id == exercise_id)
+                | SessionExercise.exercise_id.is_(None),
+            )
+            .group_by(WorkoutSession.user_id, day, SessionExercise.session_id)
+            .having(
+                func.bool_and(
+                    func.coalesce(SessionExercise.exercise_id == exercise_id, False)
+                )
+            )
+            .subquery()
+        )
+        new_sessions: dict[tuple[int, date], int] = {
+            (user_id, day): count
+            for user_id, day, count in session.exec(
+                select(
+                    sessions_by_day.c.user_id, sessions_by_day.c.day, func.count()
+                ).group_by(sessions_by_day.c.user_id, sessions_by_day.c.day)
+            ).all()
+        }
+
+        self.apply(
+            session,
+            {
+                (row.user_id, row.day, None): {
+                    "weight": row.total_weight,
+                    "reps": row.total_reps,
+                    "sets": row.total_sets,
+                    "sessions": new_sessions.get((row.user_id, row.day), 0),
+                }
+                for row in moved_rows
+            },
+        )
+
+    def rebuild(self, session: Session, user_id: int, user_timezone: str):
+        """Recomputes the rollup rows of a user from the sets.
+
+        Needed when the user moves to another time zone, any set may change day.
+        """
+        session.exec(delete(DailyUserVolume).where(DailyUserVolume.user_id == user_id))
+
+        day = cast(func.timezone(user_timezone, SessionExercise.created_at), Date)
+        session.exec(
+            insert(DailyUserVolume).from_select(
+                [
+                    "user_id",
+                    "day",
+                    "exercise_id",
+                    "total_weight",
+                    "total_reps",
+                    "total_sets",
+                    "session_count",
+                ],
+                select(
+                    WorkoutSession.user_id,
+                    day,
+                    SessionExercise.exercise_id,
+                    func.coalesce(func.sum(SessionExercise.weight_lifted), 0),
+                    func.coalesce(func.sum(SessionExercise.reps_completed), 0),
+                    func.count(),
+                    func.count(SessionExercise.session_id.distinct()),
+                )
+                .join(WorkoutSession, WorkoutSession.id == SessionExercise.session_id)
+                .where(WorkoutSession.user_id == user_id)
+                .group_by(WorkoutSession.user_id, day, SessionExercise.exercise_id),
+            )
+        )
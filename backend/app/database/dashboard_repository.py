@@ -1,206 +1,249 @@
-from zoneinfo import ZoneInfo
-from app.routers.mappers.dashboard_mapper import MONTH
+from app.routers.mappers.dashboard_mapper import GRANULARITY, METRIC, MONTH
+from sqlalchemy import DateTime, cast, true
 from sqlmodel import Session
-from datetime import datetime, timezone
+from datetime import date, datetime, time
+from decimal import Decimal
+from zoneinfo import ZoneInfo
 from dateutil.relativedelta import relativedelta
-from sqlmodel import case, func, select, and_
-from app.database.models import SessionExercise, WorkoutSession
+from sqlmodel import func, select
+from app.database.models import DailyUserVolume, User, WorkoutSession
+
+UTC = ZoneInfo("UTC")
+
+
+# the rollup column summed for each metric
+METRIC_COLUMNS = {
+    METRIC.VOLUME: DailyUserVolume.total_weight,
+    METRIC.REPS: DailyUserVolume.total_reps,
+    METRIC.SETS: DailyUserVolume.total_sets,
+    METRIC.SESSIONS: DailyUserVolume.session_count,
+}
+
+# the length of each bucket
+GRANULARITY_STEPS = {
+    GRANULARITY.DAY: relativedelta(days=1),
+    GRANULARITY.WEEK: relativedelta(weeks=1),
+    GRANULARITY.MONTH: relativedelta(months=1),
+    GRANULARITY.YEAR: relativedelta(years=1),
+}
 
 
 class DashboardRepository:
-    def get_glance(self, session: Session):
-        # total recent workout
-        current_date_obj = datetime.now(timezone.utc)
-        week_start_day_obj = current_date_obj - relativedelta(
-            days=current_date_obj.weekday()
+    def get_zone(self, session: Session, user_id: int = 1) -> dict:
+        """Returns the time zone of a user and the generation of its settings.
+
+        The generation is the user's updated_at, it changes along with the zone.
+        """
+        user = session.get(User, user_id)
+        if not user:
+            return {"timezone": UTC.key, "generation": 0}
+        return {"timezone": user.timezone, "generation": int(user.updated_at)}
+
+    def get_glance(
+        self, session: Session, user_timezone: ZoneInfo = UTC, user_id: int = 1
+    ):
+        """Returns this week's workouts and volume, this year's workouts and the
+        latest workout in a single round trip.
+
+        Each part is a range filtered CTE served by the created_at indexes, the
+        volume is read from the daily rollup. Weeks and years start at midnight in
+        the user's time zone.
+        """
+        current_date_obj = datetime.now(user_timezone)
+        week_start_day_obj = datetime.combine(
+            current_date_obj.date() - relativedelta(days=current_date_obj.weekday()),
+            time.min,
+            tzinfo=user_timezone,
+        )
+        first_day_of_a_year_obj = datetime(
+            current_date_obj.year, 1, 1, tzinfo=user_timezone
         )
-        recent_workouts = session.exec(
-            select(
-                func.count(
-                    case(
-                        (
-                            (WorkoutSession.created_at > week_start_day_obj.timestamp())
-                            & (
-                                WorkoutSession.created_at < current_date_obj.timestamp()
-                            ),
-                            1,
-                        ),
-                        else_=0,
-                    )
-                )
-            )
-        ).one()
 
-        # total volumes 1 week
-        total_volumes = session.exec(
+        # total recent workouts
+        recent_workouts = (
+            select(func.count().label("total_workouts"))
+            .select_from(WorkoutSession)
+            .where(
+                WorkoutSession.user_id == user_id,
+                WorkoutSession.created_at >= week_start_day_obj,
+                WorkoutSession.created_at < current_date_obj,
+            )
+            .cte("recent_workouts")
+        )
+        # total volumes 1 week, at most 7 rollup days per exercise
+        total_volumes = (
             select(
-                func.sum(
-                    case(
-                        (
-                            (
-                                SessionExercise.created_at
-                                > week_start_day_obj.timestamp()
-                            )
-                            & (
-                                SessionExercise.created_at
-                                < current_date_obj.timestamp()
-                            ),
-                            SessionExercise.weight_lifted,
-                        ),
-                        else_=0,
-                    )
+                func.coalesce(func.sum(DailyUserVolume.total_weight), 0).label(
+                    "total_volumes"
                 )
             )
-        ).one()
-        # current streak
-        first_day_of_a_year_obj = datetime(
-            current_date_obj.year, 1, 1, tzinfo=timezone.utc
+            .where(
+                DailyUserVolume.user_id == user_id,
+                DailyUserVolume.day >= week_start_day_obj.date(),
+                DailyUserVolume.day <= current_date_obj.date(),
+            )
+            .cte("total_volumes")
+        )
+        # workouts this year
+        streaks = (
+            select(func.count().label("streaks"))
+            .select_from(WorkoutSession)
+            .where(
+                WorkoutSession.user_id == user_id,
+                WorkoutSession.created_at >= first_day_of_a_year_obj,
+                WorkoutSession.created_at < current_date_obj,
+            )
+            .cte("streaks")
         )
-        streaks = session.exec(
+        # last workout, read from the end of the (user_id, created_at) index
+        last_workout = (
+            select(func.max(WorkoutSession.created_at).label("last_workout"))
+            .where(WorkoutSession.user_id == user_id)
+            .cte("last_workout")
+        )
+
+        # NOTE: every CTE is an aggregate returning exactly one row
+        result = session.exec(
             select(
-                func.count(
-                    case(
-                        (
-                            (
-                                WorkoutSession.created_at
-                                > first_day_of_a_year_obj.timestamp()
-                            )
-                            & (
-                                WorkoutSession.created_at < current_date_obj.timestamp()
-                            ),
-                            1,
-                        ),
-                        else_=0,
-                    )
-                )
+                recent_workouts.c.total_workouts,
+                total_volumes.c.total_volumes,
+                streaks.c.streaks,
+                last_workout.c.last_workout,
+            ).select_from(
+                recent_workouts.join(total_volumes, true())
+                .join(streaks, true())
+                .join(last_workout, true())
             )
         ).one()
 
-        # last workout
-        last_workout_statement = (
-            select(WorkoutSession.created_at)
-            .order_by(WorkoutSession.created_at.desc())
-            .limit(1)
-        )
-        last_workout = session.exec(last_workout_statement).one_or_none()
-
         return {
-            "total_workouts": recent_workouts or 0,
-            "total_volumes": total_volumes or 0,
-            "streaks": streaks or 0,
-            "last_workout": last_workout or None,
+            "total_workouts": result.total_workouts or 0,
+            "total_volumes": result.total_volumes or 0,
+            "streaks": result.streaks or 0,
+            "last_workout": result.last_workout or None,
         }
 
     def get_total_weight_by_year(self, session: Session, year: int):
-        current_month_start = datetime(year, 1, 1, tzinfo=timezone.utc)
-
-        timestamp_dict = {}
-        # construct timestamp for each month
-        for month in MONTH:
-            timestamp_dict[month] = {"start_date": current_month_start.timestamp()}
-            current_month_start += relativedelta(months=1)
-            timestamp_dict[month].update({"end_date": current_month_start.timestamp()})
-
-        # construct each statement to calculate sum of weights lifted each month
-        sum_statements = []
-        for month in MONTH:
-            start_date_timestamp = timestamp_dict[month]["start_date"]
-            end_date_timestamp = timestamp_dict[month]["end_date"]
-            statement = func.sum(
-                case(
-                    (
-                        (SessionExercise.created_at > start_date_timestamp)
-                        & (SessionExercise.created_at < end_date_timestamp),
-                        SessionExercise.weight_lifted,
-                    ),
-                    else_=0,
-                )
-            ).label(month.value)
-            sum_statements.append(statement)
-
-        statement = select(*sum_statements)
-        results = session.exec(statement).one()
+        points = self.get_series(
+            session,
+            GRANULARITY.MONTH,
+            METRIC.VOLUME,
+            date(year, 1, 1),
+            date(year, 12, 31),
+        )
 
-        return results
+        # one total per month, in calendar order, months without sets are 0
+        return tuple(value for _, value in points[: len(MONTH)])
 
     def get_total_weight_by_week(
-        self, session: Session, start_date: int, end_date: int
+        self, session: Session, start_date: str, end_date: str
     ):
-        # idea: get the week of start day
-        # get the week of end day -> count how many week
-        # then construct each week from mon sun and
-        start_date_obj = datetime.strptime(start_date, "%Y-%m-%d").replace(
-            tzinfo=ZoneInfo("UTC")
+        # weeks run from the monday of start_date to the monday after end_date
+        points = self.get_series(
+            session,
+            GRANULARITY.WEEK,
+            METRIC.VOLUME,
+            datetime.strptime(start_date, "%Y-%m-%d").date(),
+            datetime.strptime(end_date, "%Y-%m-%d").date(),
         )
-        end_date_obj = datetime.strptime(end_date, "%Y-%m-%d").replace(
-            tzinfo=ZoneInfo("UTC")
-        )
-        week_start_day_obj = start_date_obj - relativedelta(
-            days=start_date_obj.weekday()
-        )
-        # next Monday
-        week_end_day_obj = end_date_obj + relativedelta(days=7 - end_date_obj.weekday())
-
-        # get how many days apart
-        diff_days = (week_end_day_obj - week_start_day_obj).days
-        # get weeks
-        weeks = diff_days // 7
-
-        statements = []
-        for week in range(1, weeks + 1):
-            start_date_timestamp = week_start_day_obj.timestamp()
-            end_date_timestamp = (
-                week_start_day_obj + relativedelta(days=7)
-            ).timestamp()
-
-            statement = func.sum(
-                case(
-                    (
-                        (SessionExercise.created_at > start_date_timestamp)
-                        & (SessionExercise.created_at < end_date_timestamp),
-                        SessionExercise.weight_lifted,
-                    ),
-                    else_=0,
-                )
-            )
-            statements.append(statement)
-
-            week_start_day_obj = week_start_day_obj + relativedelta(days=7)
-        results = session.exec(select(*statements)).one()
 
-        return results
+        # one total per week, in order, weeks without sets are 0
+        return tuple(value for _, value in points)
 
-    def get_total_weight_by_day(self, session: Session, target_date: int):
-        current_day = datetime.today().strftime("%Y-%m-%d")
+    def get_total_weight_by_day(self, session: Session, target_date: str):
+        day = datetime.strptime(target_date, "%Y-%m-%d").date()
+        [(_, total_weights)] = self.get_series(
+            session, GRANULARITY.DAY, METRIC.VOLUME, day, day
+        )
 
-        total_weights = 0
+        return total_weights
 
-        if target_date == current_day:
-            timestamp = (
-                datetime.strptime(target_date, "%Y-%m-%d")
-                .replace(tzinfo=ZoneInfo("UTC"))
-                .timestamp()
-            )
-            total_weights = session.exec(
-                select(func.coalesce(func.sum(SessionExercise.weight_lifted), 0)).where(
-                    SessionExercise.created_at > timestamp
-                )
-            ).one()
+    @staticmethod
+    def get_buckets(granularity: GRANULARITY, start: date, end: date) -> list[date]:
+        """Returns the first day of every bucket overlapping [start, end].
+
+        Weeks start on monday, as they do for PostgreSQL date_trunc.
+        """
+        if granularity == GRANULARITY.WEEK:
+            bucket = start - relativedelta(days=start.weekday())
+        elif granularity == GRANULARITY.MONTH:
+            bucket = start.replace(day=1)
+        elif granularity == GRANULARITY.YEAR:
+            bucket = start.replace(month=1, day=1)
         else:
-            date_obj = datetime.strptime(target_date, "%Y-%m-%d").replace(
-                tzinfo=ZoneInfo("UTC")
+            bucket = start
+
+        buckets: list[date] = []
+        while bucket <= end:
+            buckets.append(bucket)
+            bucket += GRANULARITY_STEPS[granularity]
+        return buckets
+
+    def get_series(
+        self,
+        session: Session,
+        granularity: GRANULARITY,
+        metric: METRIC,
+        start: date,
+        end: date,
+        exercise_id: int | None = None,
+        user_timezone: ZoneInfo = UTC,
+        user_id: int = 1,
+    ) -> list[tuple[date, Decimal | int]]:
+        """Aggregates a metric per day, week, month or year between two dates.
+
+        Days are the user's local days, the rollup is kept in the user's time zone.
+        Both dates are inclusive and widened to whole buckets. Returns the first day
+        of every bucket with its value, in order, buckets without sets are 0.
+        """
+        buckets = self.get_buckets(granularity, start, end)
+        if not buckets:
+            return []
+        range_start = buckets[0]
+        range_end = buckets[-1] + GRANULARITY_STEPS[granularity]
+
+        if metric == METRIC.SESSIONS and exercise_id is None:
+            # NOTE: the rollup counts a session once per exercise, count the
+            # sessions themselves through the (user_id, created_at) index. The range
+            # bounds are computed here, created_at is compared as stored.
+            bucket = func.date_trunc(
+                granularity.value,
+                func.timezone(user_timezone.key, WorkoutSession.created_at),
+            ).label("bucket")
+            statement = (
+                select(bucket, func.count())
+                .where(
+                    WorkoutSession.user_id == user_id,
+                    WorkoutSession.created_at
+                    >= self._midnight(range_start, user_timezone),
+                    WorkoutSession.created_at
+                    < self._midnight(range_end, user_timezone),
+                )
+                .group_by(bucket)
             )
-            start_timestamp = date_obj.timestamp()
-            end_timestamp = (
-                date_obj + relativedelta(days=date_obj.weekday() + 1)
-            ).timestamp()
-            total_weights = session.exec(
-                select(func.sum(SessionExercise.weight_lifted)).where(
-                    and_(
-                        SessionExercise.created_at > start_timestamp,
-                        SessionExercise.created_at < end_timestamp,
-                    )
+        else:
+            # NOTE: a timestamp without time zone, the session TimeZone plays no part
+            bucket = func.date_trunc(
+                granularity.value, cast(DailyUserVolume.day, DateTime)
+            ).label("bucket")
+            statement = (
+                select(bucket, func.sum(METRIC_COLUMNS[metric]))
+                .where(
+                    DailyUserVolume.user_id == user_id,
+                    DailyUserVolume.day >= range_start,
+                    DailyUserVolume.day < range_end,
                 )
-            ).one()
+                .group_by(bucket)
+            )
+            if exercise_id is not None:
+                statement = statement.where(DailyUserVolume.exercise_id == exercise_id)
 
-        return total_weights
+        totals = {
+            bucket_start.date(): total
+            for bucket_start, total in session.exec(statement).all()
+        }
+        return [(bucket_start, totals.get(bucket_start, 0)) for bucket_start in buckets]
+
+    @staticmethod
+    def _midnight(day: date, user_timezone: ZoneInfo) -> datetime:
+        return datetime.combine(day, time.min, tzinfo=user_timezone)
@@ -1,4 +1,5 @@
 from app.database.base_repository import BaseRepository
+from app.database.daily_volume_repository import DailyVolumeRepository
 from app.routers.schemas.request_schemas import (
     CreateExerciseRequest,
     UpdateExerciseRequest,
@@ -14,6 +15,9 @@ logger = logging.getLogger(__name__)
 
 
 class ExerciseRepository(BaseRepository):
+    def __init__(self):
+        self.daily_volume_repository = DailyVolumeRepository()
+
     def get_by_id(self, session: Session, id: int):
         try:
             exercise = session.exec(
@@ -26,6 +30,18 @@ class ExerciseRepository(BaseRepository):
             logger.error(e)
             raise e
 
+    def get_by_ids(self, session: Session, ids: list[int]):
+        try:
+            exercises = session.exec(
+                select(Exercise)
+                .where(Exercise.id.in_(ids))
+                .options(joinedload(Exercise.personal_record))
+            ).all()
+            return exercises
+        except Exception as e:
+            logger.error(e)
+            raise e
+
     def get_all(self, session: Session):
         try:
             exercises = session.exec(
@@ -42,6 +58,8 @@ class ExerciseRepository(BaseRepository):
             if not exercise:
                 raise HTTPException(status_code=404, detail="Exercise not found")
 
+            # NOTE: its sets are kept without an exercise, so is their volume
+            self.daily_volume_repository.merge_into_no_exercise(session, exercise.id)
             session.delete(exercise)
         except Exception as e:
             raise e
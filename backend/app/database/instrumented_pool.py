@@ -0,0 +1,66 @@
+from threading import Lock
+import time
+
+from sqlalchemy.exc import TimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+
+class InstrumentedQueuePool(QueuePool):
+    """A QueuePool that records how long checkouts wait for a connection.
+
+    Wait time covers queueing behind an exhausted pool as well as opening a new
+    connection. Counters belong to the worker process and restart when the pool is
+    recreated, e.g. after the database went away.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._stats_lock = Lock()
+        self._waiting = 0
+        self._checkouts = 0
+        self._timeouts = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+
+    def _do_get(self):
+        with self._stats_lock:
+            self._waiting += 1
+        started_at = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except TimeoutError:
+            with self._stats_lock:
+                self._timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - started_at
+            with self._stats_lock:
+                self._waiting -= 1
+
+        with self._stats_lock:
+            self._checkouts += 1
+            self._total_wait += waited
+            self._max_wait = max(self._max_wait, waited)
+        return connection
+
+    def snapshot(self) -> dict:
+        with self._stats_lock:
+            return {
+                "size": self.size(),
+                "max_overflow": self._max_overflow,
+                "checked_out": self.checkedout(),
+                "checked_in": self.checkedin(),
+                # NOTE: negative while the pool itself is not full yet
+                "overflow": max(self.overflow(), 0),
+                "waiting": self._waiting,
+                "checkouts": self._checkouts,
+                "timeouts": self._timeouts,
+                "average_wait": self._total_wait / self._checkouts
+                if self._checkouts
+                else 0.0,
+                "max_wait": self._max_wait,
+            }
+
+
+class InstrumentedAsyncAdaptedQueuePool(InstrumentedQueuePool, AsyncAdaptedQueuePool):
+    """InstrumentedQueuePool for the async engine, checkouts await the queue."""
@@ -1,5 +1,7 @@
+from datetime import date, datetime
 from typing import Optional
 
+from sqlalchemy import DateTime, Index, UniqueConstraint, desc
 from sqlmodel import Field, Relationship, SQLModel
 
 from decimal import Decimal
@@ -20,6 +22,7 @@ class User(BaseModel, table=True):
     Attributes:
         id (Optional[int]): The unique identifier for the user.
         username (str): The user's unique username.
+        timezone (str): The IANA time zone dashboards bucket the user's workouts in.
         created_at (float): Timestamp of when the user was created.
         updated_at (float): Timestamp of when the user was last updated.
     """
@@ -29,6 +32,9 @@ class User(BaseModel, table=True):
     # this is the way to let database to the id increment for us not sqlmodel
     id: Optional[int] = Field(default=None, primary_key=True)
     username: str = Field(nullable=False, unique=True)
+    timezone: str = Field(
+        default="UTC", nullable=False, sa_column_kwargs={"server_default": "UTC"}
+    )
     created_at: float = Field(nullable=False)
     updated_at: float = Field(nullable=False)
 
@@ -65,11 +71,11 @@ class RoutineExercise(BaseModel, table=True):
     created_at: float = Field(nullable=False)
     updated_at: float = Field(nullable=False)
     routine_id: int = Field(
-        foreign_key="routines.id", ondelete="CASCADE", nullable=False
+        foreign_key="routines.id", ondelete="CASCADE", nullable=False, index=True
     )
     # Trigger
     exercise_id: int = Field(
-        foreign_key="exercises.id", ondelete="CASCADE", nullable=False
+        foreign_key="exercises.id", ondelete="CASCADE", nullable=False, index=True
     )
 
     # Relationships
@@ -100,7 +106,10 @@ class RoutineExerciseSet(BaseModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
 
     routine_exercise_id: int = Field(
-        foreign_key="routines_exercises.id", ondelete="CASCADE", nullable=False
+        foreign_key="routines_exercises.id",
+        ondelete="CASCADE",
+        nullable=False,
+        index=True,
     )
     set_number: int = Field(default=1, nullable=False)
     set_type: str = Field(default="normal", nullable=False)
@@ -129,14 +138,22 @@ class SessionExercise(BaseModel, table=True):
         set_number (int): The sequential number of the set within the exercise.
         weight_lifted (Optional[Decimal]): The weight used for the set.
         reps_completed (Optional[int]): The number of repetitions completed for the set.
-        created_at (float): Timestamp of when the set was performed.
+        created_at (datetime): When the set was performed.
     """
 
     __tablename__ = "sessions_exercises"
+    __table_args__ = (
+        # heaviest set of an exercise, personal records are recomputed from it
+        Index(
+            "ix_sessions_exercises_exercise_id_weight_lifted",
+            "exercise_id",
+            desc("weight_lifted"),
+        ),
+    )
 
     id: Optional[int] = Field(default=None, primary_key=True)
 
-    session_id: int = Field(foreign_key="sessions.id", ondelete="CASCADE")
+    session_id: int = Field(foreign_key="sessions.id", ondelete="CASCADE", index=True)
     # NOTE: Allow null when an exercise is removed
     exercise_id: Optional[int] = Field(default=None, foreign_key="exercises.id")
 
@@ -149,7 +166,10 @@ class SessionExercise(BaseModel, table=True):
     set_number: int = Field(default=1)
     weight_lifted: Optional[Decimal] = Field(default=0, decimal_places=2)
     reps_completed: Optional[int] = Field(default=0)
-    created_at: float = Field(nullable=False)
+    # NOTE: dashboards sum the sets performed within a time range
+    created_at: datetime = Field(
+        sa_type=DateTime(timezone=True), nullable=False, index=True
+    )
 
     # Relationships
     session: "WorkoutSession" = Relationship(back_populates="exercise_links")
@@ -240,21 +260,25 @@ class WorkoutSession(BaseModel, table=True):
         description (Optional[str]): A description of the workout.
         duration (Optional[int]): The duration of the workout in seconds.
         notes (Optional[str]): Any notes recorded during the workout.
-        created_at (float): Timestamp of when the session was created.
-        updated_at (float): Timestamp of when the session was last updated.
+        created_at (datetime): When the session was created.
+        updated_at (datetime): When the session was last updated.
         user_id (int): Foreign key linking to the user who performed the workout.
         routine_id (Optional[int]): Foreign key linking to the routine used for this session, if any.
     """
 
     __tablename__ = "sessions"
+    __table_args__ = (
+        # sessions of a user within a time range, latest first
+        Index("ix_sessions_user_id_created_at", "user_id", "created_at"),
+    )
 
     id: Optional[int] = Field(default=None, primary_key=True)
     name: Optional[str] = Field(nullable=False)
     description: Optional[str]
     duration: Optional[int] = Field(default=0)
     total_weights: Optional[int] = Field(default=0, nullable=False)
-    created_at: float = Field(nullable=False)
-    updated_at: float = Field(nullable=False)
+    created_at: datetime = Field(sa_type=DateTime(timezone=True), nullable=False)
+    updated_at: datetime = Field(sa_type=DateTime(timezone=True), nullable=False)
     user_id: int = Field(default=None, foreign_key="users.id", nullable=False)
     routine_id: Optional[int] = Field(default=None, foreign_key="routines.id")
 
@@ -305,9 +329,50 @@ class PersonalRecord(BaseModel, table=True):
         foreign_key="sessions_exercises.id",
         ondelete="CASCADE",
         nullable=False,
+        index=True,
     )
 
     # Relationships
     user: User = Relationship(back_populates="personal_records")
     exercise: Exercise = Relationship(back_populates="personal_record")
     session_exercise: SessionExercise = Relationship(back_populates="personal_record")
+
+
+class DailyUserVolume(BaseModel, table=True):
+    """A rollup of the sets a user performed per local day and exercise.
+
+    Maintained by the session repository within the same transaction as the sets,
+    so dashboards read one row per day and exercise instead of every set.
+
+    Attributes:
+        id (Optional[int]): The unique identifier for the rollup row.
+        user_id (int): Foreign key linking to the user who performed the sets.
+        day (date): The day the sets were performed on, in the user's time zone.
+        exercise_id (Optional[int]): The exercise performed, `NULL` for sets without one.
+        total_weight (Decimal): The sum of the weights lifted.
+        total_reps (int): The sum of the repetitions completed.
+        total_sets (int): The number of sets performed.
+        session_count (int): The number of sessions the sets belong to.
+    """
+
+    __tablename__ = "daily_user_volume"
+    __table_args__ = (
+        # NOTE: sets without an exercise share a single row per user and day
+        UniqueConstraint(
+            "user_id",
+            "day",
+            "exercise_id",
+            name="uq_daily_user_volume_user_id_day_exercise_id",
+            postgresql_nulls_not_distinct=True,
+        ),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    user_id: int = Field(foreign_key="users.id", ondelete="CASCADE", nullable=False)
+    day: date = Field(nullable=False)
+    # NOTE: no foreign key, the history of a removed exercise is kept
+    exercise_id: Optional[int] = Field(default=None)
+    total_weight: Decimal = Field(default=0, decimal_places=2)
+    total_reps: int = Field(default=0, nullable=False)
+    total_sets: int = Field(default=0, nullable=False)
+    session_count: int = Field(default=0, nullable=False)
@@ -5,7 +5,7 @@ from app.routers.schemas.request_schemas import (
 from datetime import datetime, timezone
 from app.database.base_repository import BaseRepository
 from fastapi import HTTPException
-from sqlalchemy.orm import joinedload
+from sqlalchemy.orm import joinedload, selectinload
 from sqlmodel import Session, select
 from app.database.models import Routine, RoutineExercise, Exercise, RoutineExerciseSet
 import logging
@@ -20,8 +20,8 @@ class RoutineRepository(BaseRepository):
                 select(Routine)
                 .where(Routine.id == id)
                 .options(
-                    joinedload(Routine.exercise_links).options(
-                        joinedload(RoutineExercise.routine_exercise_sets),
+                    selectinload(Routine.exercise_links).options(
+                        selectinload(RoutineExercise.routine_exercise_sets),
                         joinedload(RoutineExercise.exercise).joinedload(
                             Exercise.personal_record
                         ),
@@ -33,22 +33,37 @@ class RoutineRepository(BaseRepository):
             logger.error(e)
             raise e
 
+    def get_by_ids(self, session: Session, ids: list[int]):
+        try:
+            routines = session.exec(
+                select(Routine)
+                .where(Routine.id.in_(ids))
+                .options(
+                    selectinload(Routine.exercise_links).options(
+                        selectinload(RoutineExercise.routine_exercise_sets),
+                        joinedload(RoutineExercise.exercise).joinedload(
+                            Exercise.personal_record
+                        ),
+                    )
+                )
+            ).all()
+            return routines
+        except Exception as e:
+            logger.error(e)
+            raise e
+
     def get_all(self, session: Session):
         try:
-            routines = (
-                session.exec(
-                    select(Routine).options(
-                        joinedload(Routine.exercise_links).options(
-                            joinedload(RoutineExercise.routine_exercise_sets),
-                            joinedload(RoutineExercise.exercise).joinedload(
-                                Exercise.personal_record
-                            ),
-                        )
+            routines = session.exec(
+                select(Routine).options(
+                    selectinload(Routine.exercise_links).options(
+                        selectinload(RoutineExercise.routine_exercise_sets),
+                        joinedload(RoutineExercise.exercise).joinedload(
+                            Exercise.personal_record
+                        ),
                     )
                 )
-                .unique()
-                .all()
-            )
+            ).all()
             return routines
         except Exception as e:
             logger.error(e)
@@ -4,31 +4,53 @@ from app.routers.schemas.request_schemas import (
 )
 from datetime import datetime, timezone
 from app.database.base_repository import BaseRepository
+from app.database.daily_volume_repository import DailyVolumeRepository
 from fastapi import HTTPException
-from sqlalchemy.orm import joinedload
+from sqlalchemy import (
+    cast,
+    column,
+    delete,
+    exists,
+    insert,
+    literal,
+    or_,
+    true,
+    tuple_,
+    update,
+    values,
+)
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.orm import selectinload
+from sqlalchemy.orm.attributes import set_committed_value
 from sqlmodel import Session, select
-from app.database.models import WorkoutSession, SessionExercise, PersonalRecord
+from app.database.models import (
+    Exercise,
+    PersonalRecord,
+    SessionExercise,
+    WorkoutSession,
+)
+from decimal import Decimal
+from typing import Iterable
 import logging
 
 logger = logging.getLogger(__name__)
 
 
 class SessionRepository(BaseRepository):
+    def __init__(self):
+        self.daily_volume_repository = DailyVolumeRepository()
+
     def get_by_id(self, session: Session, id: int):
         try:
-            workout_session = (
-                session.exec(
-                    select(WorkoutSession)
-                    .where(WorkoutSession.id == id)
-                    .options(
-                        joinedload(WorkoutSession.exercise_links).joinedload(
-                            SessionExercise.exercise
-                        )
+            workout_session = session.exec(
+                select(WorkoutSession)
+                .where(WorkoutSession.id == id)
+                .options(
+                    selectinload(WorkoutSession.exercise_links).joinedload(
+                        SessionExercise.exercise
                     )
                 )
-                .unique()
-                .one_or_none()
-            )
+            ).one_or_none()
             if not workout_session:
                 raise HTTPException(status_code=404, detail="Workout session not found")
             return workout_session
@@ -36,42 +58,127 @@ class SessionRepository(BaseRepository):
             logger.error(e)
             raise e
 
+    def get_by_ids(self, session: Session, ids: list[int]):
+        try:
+            workout_sessions = session.exec(
+                select(WorkoutSession)
+                .where(WorkoutSession.id.in_(ids))
+                .options(
+                    selectinload(WorkoutSession.exercise_links).joinedload(
+                        SessionExercise.exercise
+                    )
+                )
+            ).all()
+            return workout_sessions
+        except Exception as e:
+            logger.error(e)
+            raise e
+
     def get_all(self, session: Session):
         try:
-            workout_sessions = (
-                session.exec(
-                    select(WorkoutSession).options(
-                        joinedload(WorkoutSession.exercise_links).joinedload(
-                            SessionExercise.exercise
-                        )
+            workout_sessions = session.exec(
+                select(WorkoutSession).options(
+                    selectinload(WorkoutSession.exercise_links).joinedload(
+                        SessionExercise.exercise
                     )
                 )
-                .unique()
-                .all()
-            )
+            ).all()
             return workout_sessions
         except Exception as e:
             logger.error(e)
             raise e
 
-    def remove_by_id(self, session: Session, id: int):
+    def get_page(
+        self,
+        session: Session,
+        limit: int,
+        cursor: tuple[datetime, int] | None = None,
+        start: datetime | None = None,
+        end: datetime | None = None,
+        user_id: int = 1,
+    ):
+        """Returns up to limit sessions of a user, latest first.
+
+        cursor is the (created_at, id) of the last session of the previous page,
+        only older sessions are returned. start is inclusive and end exclusive.
+        """
+        try:
+            statement = select(WorkoutSession).where(WorkoutSession.user_id == user_id)
+            if cursor:
+                statement = statement.where(
+                    tuple_(WorkoutSession.created_at, WorkoutSession.id)
+                    < tuple_(*cursor)
+                )
+            if start is not None:
+                statement = statement.where(WorkoutSession.created_at >= start)
+            if end is not None:
+                statement = statement.where(WorkoutSession.created_at < end)
+
+            workout_sessions = session.exec(
+                statement.order_by(
+                    WorkoutSession.created_at.desc(), WorkoutSession.id.desc()
+                )
+                .limit(limit)
+                .options(
+                    selectinload(WorkoutSession.exercise_links).joinedload(
+                        SessionExercise.exercise
+                    )
+                )
+            ).all()
+            return workout_sessions
+        except Exception as e:
+            logger.error(e)
+            raise e
+
+    def remove_by_id(self, session: Session, id: int) -> list[int]:
+        """Deletes a session, returns the exercises whose record it held."""
         try:
             workout_session = session.get(WorkoutSession, id)
             if not workout_session:
                 raise HTTPException(status_code=404, detail="Workout session not found")
 
+            # NOTE: records of the session's sets are deleted along with them
+            record_exercise_ids = list(
+                self.get_personal_record_sets(session, id).values()
+            )
+
+            self.daily_volume_repository.apply(
+                session,
+                self.daily_volume_repository.negate(
+                    self.daily_volume_repository.contribution(workout_session)
+                ),
+            )
             session.delete(workout_session)
+            session.flush()
+            self.recompute_personal_records(session, record_exercise_ids)
+
+            return record_exercise_ids
         except Exception as e:
             raise e
 
-    def update(self, session: Session, id: int, input: UpdateWorkoutSessionRequest):
+    def update(
+        self,
+        session: Session,
+        id: int,
+        input: UpdateWorkoutSessionRequest,
+        workout_session: WorkoutSession | None = None,
+        record_sets: dict[int, int] | None = None,
+    ):
+        """Applies input to a session, its sets, their records and the rollup.
+
+        workout_session and record_sets, as returned by get_by_id and
+        get_personal_record_sets, are loaded here unless the caller already has them.
+        """
         try:
-            workout_session = self.get_by_id(session, id)
+            if not workout_session:
+                workout_session = self.get_by_id(session, id)
             if not workout_session:
                 raise HTTPException(status_code=404, detail="Workout session not found")
 
-            timestamp = datetime.now(timezone.utc).timestamp()
+            now = datetime.now(timezone.utc)
             is_edited = False
+            # NOTE: taken before any change, the rollup is adjusted by the difference
+            previous_volume = self.daily_volume_repository.contribution(workout_session)
 
             if input.name and workout_session.name != input.name:
                 workout_session.name = input.name
@@ -92,230 +199,416 @@ class SessionRepository(BaseRepository):
                 workout_session.user_id = input.user_id
                 is_edited = True
 
-            if input.duration:
-                workout_session.user_id = input.user_id
+            if input.duration and workout_session.duration != input.duration:
+                workout_session.duration = input.duration
                 is_edited = True
 
+            # exercises whose record is removed or lowered by the update
+            affected_exercise_ids: list[int] = []
+
             if input.exercises and len(input.exercises) > 0:
                 is_edited = True
-
-                # track of total performed weights
-                total_weights: int = 0
-
-                # idea:
-                # get dictionary for session exercise
-                # then iterate through the input to keep track of the exercise order and set number
-                # do the update accordingly, if not exist then create new
-                # then remove the remaining session exercises within a session
-
-                session_exercises: dict[int, SessionExercise] = {
-                    exercise_session.id: exercise_session
-                    for exercise_session in workout_session.exercise_links
-                }
-
-                for exercise_index, exercise in enumerate(input.exercises):
-                    exercise_details: UpdateWorkoutSessionRequest.RoutineExerciseRequest = exercise
-
-                    # iterate through performed sets of each exercise and update
-                    # if not have an idea, create one using exercise_id to link cuz
-                    # the set is not in an routine
-                    for set_index, set in enumerate(exercise_details.sets):
-                        exercise_set: UpdateWorkoutSessionRequest.RoutineExerciseRequest.ExerciseSet = set
-                        workout_session_exercise = None
-                        if exercise_set.id in session_exercises.keys():
-                            workout_session_exercise: SessionExercise = (
-                                session_exercises[exercise_set.id]
-                            )
-                            workout_session_exercise.exercise_name = (
-                                exercise_details.name,
-                            )
-                            workout_session_exercise.order = exercise_index + 1
-                            workout_session_exercise.set_number = set_index + 1
-                            workout_session_exercise.set_type = exercise_set.set_type
-                            workout_session_exercise.weight_lifted = (
-                                exercise_set.weight_lifted
-                            )
-                            workout_session_exercise.reps_completed = (
-                                exercise_set.reps_completed
-                            )
-
-                            del session_exercises[exercise_set.id]
-                        else:
-                            workout_session_exercise = SessionExercise(
-                                session=workout_session,
-                                exercise_id=exercise_details.id,
-                                exercise_name=exercise_details.name,
-                                order=exercise_index + 1,
-                                set_number=set_index + 1,
-                                set_type=exercise_set.set_type,
-                                weight_lifted=exercise_set.weight_lifted,
-                                reps_completed=exercise_set.reps_completed,
-                                created_at=timestamp,
-                            )
-
-                        session.add(workout_session_exercise)
-
-                        # increment total weight from each exercise set
-                        total_weights += exercise_set.weight_lifted
-
-                        # personal record is valid for valid exercise id
-                        if exercise_details.id:
-                            personal_record = (
-                                workout_session_exercise.exercise.personal_record
-                                if workout_session_exercise.exercise
-                                else None
-                            )
-                            # check if the exercise set performed has best records
-                            if personal_record:
-                                if personal_record.weight < exercise_set.weight_lifted:
-                                    workout_session_exercise.exercise.personal_record.weight = exercise_set.weight_lifted
-                                    workout_session_exercise.exercise.personal_record.updated_at = timestamp
-                                    workout_session_exercise.exercise.personal_record.session_exercise = workout_session_exercise
-                            else:
-                                personal_record = PersonalRecord(
-                                    user_id=input.user_id,
-                                    exercise_id=exercise_details.id,
-                                    weight=exercise_set.weight_lifted,
-                                    updated_at=timestamp,
-                                    session_exercise=workout_session_exercise,
-                                )
-                                session.add(personal_record)
-
-                # update total weights for the session
-                workout_session.total_weights = total_weights
-
-                # remove remaining session_exercises
-                for removed_session_exercises in session_exercises.values():
-                    # update personal_record if possible
-                    if removed_session_exercises.personal_record:
-                        personal_record = removed_session_exercises.personal_record
-                        if personal_record:
-                            session.delete(personal_record)
-                            # find updated session to fill in
-                            new_best_exercise_session = session.exec(
-                                select(SessionExercise)
-                                .where(
-                                    SessionExercise.id != removed_session_exercises.id,
-                                    SessionExercise.exercise_id
-                                    == removed_session_exercises.exercise_id,
-                                )
-                                .order_by(SessionExercise.created_at.desc())
-                                .limit(1)
-                            ).one()
-
-                            if new_best_exercise_session:
-                                personal_record.session_exercise_id = (
-                                    new_best_exercise_session.id
-                                )
-                                personal_record.weight = (
-                                    new_best_exercise_session.weight_lifted
-                                )
-                                personal_record.updated_at = timestamp
-
-                    session.delete(removed_session_exercises)
+                if record_sets is None:
+                    record_sets = self.get_personal_record_sets(
+                        session, workout_session.id
+                    )
+                affected_exercise_ids = self._update_sets(
+                    session, workout_session, input.exercises, record_sets, now
+                )
 
             if is_edited:
-                workout_session.updated_at = timestamp
+                workout_session.updated_at = now
                 session.add(workout_session)
                 session.flush()
-                session.refresh(workout_session)
+                self.recompute_personal_records(session, affected_exercise_ids)
+                self.daily_volume_repository.apply(
+                    session,
+                    self.daily_volume_repository.difference(
+                        previous_volume,
+                        self.daily_volume_repository.contribution(workout_session),
+                    ),
+                )
                 return workout_session
 
             return None
-        except Exception as e:
-            print(e)
-            raise e
+        except Exception:
+            logger.exception(f"Can't update workout session {id}")
+            raise
+
+    def _update_sets(
+        self,
+        session: Session,
+        workout_session: WorkoutSession,
+        exercises: list[UpdateWorkoutSessionRequest.RoutineExerciseRequest],
+        record_sets: dict[int, int],
+        now: datetime,
+    ) -> list[int]:
+        """Writes the difference between the stored sets of a session and exercises.
+
+        Sets are matched by id. Unchanged sets are left alone, changed ones are
+        written with one UPDATE, new ones with one INSERT and the missing ones
+        removed with one DELETE, total_weights is adjusted by the difference.
+        Returns the exercises whose record set was removed, lowered or moved to
+        another exercise.
+        """
+        stored_sets: dict[int, SessionExercise] = {
+            session_exercise.id: session_exercise
+            for session_exercise in workout_session.exercise_links
+        }
+
+        affected_exercise_ids: list[int] = []
+        kept_sets: list[SessionExercise] = []
+        changed_rows: list[tuple[SessionExercise, dict]] = []
+        new_rows: list[dict] = []
+        weight_difference = Decimal(0)
+        for exercise_index, exercise in enumerate(exercises):
+            for set_index, exercise_set in enumerate(exercise.sets or []):
+                set_values = {
+                    "exercise_id": exercise.id,
+                    "exercise_name": exercise.name,
+                    "order": exercise_index + 1,
+                    "set_number": set_index + 1,
+                    "set_type": exercise_set.set_type,
+                    "weight_lifted": exercise_set.weight_lifted,
+                    "reps_completed": exercise_set.reps_completed,
+                }
+                weight = Decimal(exercise_set.weight_lifted or 0)
+
+                # sets without a known id are added, even with the id of another session
+                stored_set = stored_sets.pop(exercise_set.id, None)
+                if not stored_set:
+                    new_rows.append(
+                        {
+                            **set_values,
+                            "session_id": workout_session.id,
+                            "created_at": now,
+                        }
+                    )
+                    weight_difference += weight
+                    continue
+
+                kept_sets.append(stored_set)
+                if all(
+                    getattr(stored_set, name) == set_values[name] for name in set_values
+                ):
+                    continue
+
+                changed_rows.append((stored_set, set_values))
+                stored_weight = Decimal(stored_set.weight_lifted or 0)
+                weight_difference += weight - stored_weight
+                # NOTE: a lowered or moved record set may not be the heaviest anymore
+                if stored_set.id in record_sets and (
+                    weight < stored_weight or stored_set.exercise_id != exercise.id
+                ):
+                    affected_exercise_ids.append(record_sets[stored_set.id])
+
+        # NOTE: the session row is written once, by the flush of update
+        with session.no_autoflush:
+            if changed_rows:
+                self._update_set_rows(session, changed_rows)
+
+            if stored_sets:
+                session.exec(
+                    delete(SessionExercise).where(
+                        SessionExercise.id.in_(stored_sets.keys())
+                    )
+                )
+                for removed_set in stored_sets.values():
+                    weight_difference -= Decimal(removed_set.weight_lifted or 0)
+                    if removed_set.id in record_sets:
+                        affected_exercise_ids.append(record_sets[removed_set.id])
+
+            # NOTE: already known, saves loading the sets back for the rollup
+            set_committed_value(
+                workout_session,
+                "exercise_links",
+                kept_sets + self._insert_sets(session, new_rows),
+            )
+
+        workout_session.total_weights = (workout_session.total_weights or 0) + int(
+            weight_difference
+        )
+
+        return affected_exercise_ids
+
+    @staticmethod
+    def _update_set_rows(
+        session: Session, changed_rows: list[tuple[SessionExercise, dict]]
+    ):
+        """Writes the new values of stored sets with one UPDATE ... FROM VALUES."""
+        names: list[str] = list(changed_rows[0][1])
+        changed_values = values(
+            column("id", SessionExercise.__table__.c.id.type),
+            *(column(name, SessionExercise.__table__.c[name].type) for name in names),
+            name="changed_values",
+        ).data(
+            [
+                (stored_set.id, *(set_values[name] for name in names))
+                for stored_set, set_values in changed_rows
+            ]
+        )
+        session.exec(
+            update(SessionExercise)
+            .where(SessionExercise.id == changed_values.c.id)
+            .values(
+                {
+                    # NOTE: VALUES columns holding only NULLs are typed as text
+                    name: cast(
+                        changed_values.c[name], SessionExercise.__table__.c[name].type
+                    )
+                    for name in names
+                }
+            ),
+            execution_options={"synchronize_session": False},
+        )
+
+        # NOTE: written as they are stored, saves loading the sets back
+        for stored_set, set_values in changed_rows:
+            if stored_set.exercise_id != set_values["exercise_id"]:
+                # loaded again from the new exercise_id when it is read
+                session.expire(stored_set, ["exercise"])
+            for name, value in set_values.items():
+                if name == "weight_lifted" and value is not None:
+                    value = Decimal(value)
+                set_committed_value(stored_set, name, value)
+
+    @staticmethod
+    def _insert_sets(session: Session, set_rows: list[dict]) -> list[SessionExercise]:
+        if not set_rows:
+            return []
+
+        # NOTE: one multi row INSERT, RETURNING rows come back in the order of
+        # set_rows and join the identity map
+        return (
+            session.exec(
+                insert(SessionExercise).returning(
+                    SessionExercise, sort_by_parameter_order=True
+                ),
+                params=set_rows,
+            )
+            .scalars()
+            .all()
+        )
+
+    def upsert_personal_records(
+        self, session: Session, workout_session: WorkoutSession
+    ) -> list[int]:
+        """Raises the personal records beaten by the sets of a session.
+
+        The best set of each exercise, the first one on a tie, is written with one
+        INSERT ... ON CONFLICT that only replaces heavier records, so concurrent
+        writers can't lose a record. Returns the ids of the exercises whose record
+        was created or replaced.
+        """
+        best_sets: dict[int, SessionExercise] = {}
+        for session_exercise in sorted(
+            workout_session.exercise_links,
+            key=lambda session_exercise: (
+                session_exercise.order,
+                session_exercise.set_number,
+            ),
+        ):
+            # personal record is valid for valid exercise id and weight
+            if (
+                not session_exercise.exercise_id
+                or session_exercise.weight_lifted is None
+            ):
+                continue
+            best_set = best_sets.get(session_exercise.exercise_id)
+            if not best_set or best_set.weight_lifted < session_exercise.weight_lifted:
+                best_sets[session_exercise.exercise_id] = session_exercise
+
+        if not best_sets:
+            return []
+
+        # NOTE: personal records still store epoch seconds
+        timestamp = datetime.now(timezone.utc).timestamp()
+        statement = postgresql_insert(PersonalRecord).values(
+            [
+                {
+                    "user_id": workout_session.user_id,
+                    "exercise_id": exercise_id,
+                    "weight": best_set.weight_lifted,
+                    "updated_at": timestamp,
+                    "session_exercise_id": best_set.id,
+                }
+                # NOTE: a stable order, concurrent writers lock rows in the same order
+                for exercise_id, best_set in sorted(best_sets.items())
+            ]
+        )
+        return (
+            session.exec(
+                statement.on_conflict_do_update(
+                    index_elements=[PersonalRecord.exercise_id],
+                    set_={
+                        "weight": statement.excluded.weight,
+                        "updated_at": statement.excluded.updated_at,
+                        "session_exercise_id": statement.excluded.session_exercise_id,
+                    },
+                    where=statement.excluded.weight > PersonalRecord.weight,
+                ).returning(PersonalRecord.exercise_id)
+            )
+            .scalars()
+            .all()
+        )
+
+    def recompute_personal_records(
+        self, session: Session, exercise_ids: Iterable[int]
+    ) -> list[int]:
+        """Sets the records of exercises to their heaviest set, the earliest on a tie.
+
+        For sets that were removed, lowered or moved, which the upsert can't handle.
+        One INSERT ... ON CONFLICT for all the exercises, each heaviest set is read
+        from the top of ix_sessions_exercises_exercise_id_weight_lifted. The record of
+        an exercise without weighted sets left is removed. Returns the ids of the
+        exercises whose record was created, replaced or removed.
+        """
+        exercise_ids = sorted(set(exercise_ids))
+        if not exercise_ids:
+            return []
+
+        removed_exercise_ids = (
+            session.exec(
+                delete(PersonalRecord)
+                .where(
+                    PersonalRecord.exercise_id.in_(exercise_ids),
+                    ~exists().where(
+                        SessionExercise.exercise_id == PersonalRecord.exercise_id,
+                        SessionExercise.weight_lifted.is_not(None),
+                    ),
+                )
+                .returning(PersonalRecord.exercise_id)
+            )
+            .scalars()
+            .all()
+        )
+
+        # NOTE: personal records still store epoch seconds
+        timestamp = datetime.now(timezone.utc).timestamp()
+        statement = postgresql_insert(PersonalRecord).from_select(
+            ["user_id", "exercise_id", "weight", "session_exercise_id", "updated_at"],
+            self.select_heaviest_sets(exercise_ids).add_columns(literal(timestamp)),
+        )
+        return (
+            session.exec(
+                statement.on_conflict_do_update(
+                    index_elements=[PersonalRecord.exercise_id],
+                    set_={
+                        "weight": statement.excluded.weight,
+                        "updated_at": statement.excluded.updated_at,
+                        "session_exercise_id": statement.excluded.session_exercise_id,
+                    },
+                    where=or_(
+                        PersonalRecord.session_exercise_id
+                        != statement.excluded.session_exercise_id,
+                        PersonalRecord.weight != statement.excluded.weight,
+                    ),
+                ).returning(PersonalRecord.exercise_id)
+            )
+            .scalars()
+            .all()
+        ) + removed_exercise_ids
+
+    @staticmethod
+    def select_heaviest_sets(exercise_ids: Iterable[int]):
+        """Selects the user, id, heaviest weight and its set of each exercise.
+
+        The heaviest set of an exercise is the top of a LATERAL scan of
+        ix_sessions_exercises_exercise_id_weight_lifted, the earliest on a tie.
+        """
+        exercises = (
+            select(Exercise.id, Exercise.user_id)
+            .where(Exercise.id.in_(exercise_ids))
+            .subquery()
+        )
+        best_set = (
+            select(SessionExercise.id, SessionExercise.weight_lifted)
+            .where(
+                SessionExercise.exercise_id == exercises.c.id,
+                SessionExercise.weight_lifted.is_not(None),
+            )
+            .order_by(SessionExercise.weight_lifted.desc(), SessionExercise.id)
+            .limit(1)
+            .lateral()
+        )
+        return (
+            select(
+                exercises.c.user_id,
+                exercises.c.id,
+                best_set.c.weight_lifted,
+                best_set.c.id,
+            )
+            .select_from(exercises.join(best_set, true()))
+            # NOTE: a stable order, concurrent writers lock rows in the same order
+            .order_by(exercises.c.id)
+        )
+
+    def get_personal_record_sets(
+        self, session: Session, workout_session_id: int
+    ) -> dict[int, int]:
+        """Returns the exercise id of every set of the session holding a record."""
+        return dict(
+            session.exec(
+                select(PersonalRecord.session_exercise_id, PersonalRecord.exercise_id)
+                .join(
+                    SessionExercise,
+                    SessionExercise.id == PersonalRecord.session_exercise_id,
+                )
+                .where(SessionExercise.session_id == workout_session_id)
+            ).all()
+        )
 
     def create(self, session: Session, input: CreateWorkoutSessionRequest):
         try:
-            timestamp = datetime.now(timezone.utc).timestamp()
+            now = datetime.now(timezone.utc)
 
             workout_session = WorkoutSession(
                 name=input.name,
                 description=input.description,
                 user_id=input.user_id,
                 routine_id=input.routine_id,
-                created_at=timestamp,
-                updated_at=timestamp,
+                created_at=now,
+                updated_at=now,
                 notes=input.notes,
                 duration=input.duration,
             )
-            session.add(workout_session)
 
-            # track of total performed weights
-            total_weights: int = 0
-
-            # add each exercise set to workout session based on the input
-            if input.exercises:
-                # get personal record from all  exercises id and construct a hashmap for it
-                exercise_ids: list[int] = [exercise.id for exercise in input.exercises]
-                personal_records: list[PersonalRecord] = session.exec(
-                    select(PersonalRecord).where(
-                        PersonalRecord.exercise_id.in_(exercise_ids)
-                    )
-                ).all()
-                map_exercise_personal_records: dict = {
-                    personal_record.exercise_id: personal_record
-                    for personal_record in personal_records
+            # every set of the session, in the order they were performed
+            set_rows: list[dict] = [
+                {
+                    "exercise_id": exercise.id,
+                    "exercise_name": exercise.name,
+                    "order": exercise_index + 1,
+                    "set_number": set_index + 1,
+                    "set_type": exercise_set.set_type,
+                    # NOTE: an explicit null weight counts as a bodyweight set
+                    "weight_lifted": exercise_set.weight_lifted or 0,
+                    "reps_completed": exercise_set.reps_completed,
+                    "created_at": now,
                 }
+                for exercise_index, exercise in enumerate(input.exercises or [])
+                # ignore empty sets
+                for set_index, exercise_set in enumerate(exercise.sets or [])
+            ]
 
-                for exercise_index, exercise in enumerate(input.exercises):
-                    exercise_details: CreateWorkoutSessionRequest.RoutineExerciseRequest = exercise
-
-                    # ignore empty sets
-                    if not exercise_details.sets:
-                        continue
-
-                    # add each performed set of an exercise to become an session exercise
-                    for set_index, set in enumerate(exercise_details.sets):
-                        exercise_set: CreateWorkoutSessionRequest.RoutineExerciseRequest.ExerciseSet = set
-
-                        workout_session_exercise = SessionExercise(
-                            session=workout_session,
-                            exercise_id=exercise_details.id,
-                            exercise_name=exercise_details.name,
-                            order=exercise_index + 1,
-                            set_number=set_index + 1,
-                            set_type=exercise_set.set_type,
-                            weight_lifted=exercise_set.weight_lifted,
-                            reps_completed=exercise_set.reps_completed,
-                            created_at=timestamp,
-                        )
-
-                        # increment total weigh lifted
-                        total_weights += exercise_set.weight_lifted
-
-                        session.add(workout_session_exercise)
-
-                        personal_record: PersonalRecord = (
-                            map_exercise_personal_records.get(
-                                workout_session_exercise.exercise_id, None
-                            )
-                        )
-                        # check if the exercise set performed has best records
-                        if personal_record:
-                            if personal_record.weight < exercise_set.weight_lifted:
-                                personal_record.weight = exercise_set.weight_lifted
-                                personal_record.updated_at = timestamp
-                                personal_record.session_exercise = (
-                                    workout_session_exercise
-                                )
-                        else:
-                            personal_record = PersonalRecord(
-                                user_id=input.user_id,
-                                exercise_id=exercise_details.id,
-                                weight=exercise_set.weight_lifted,
-                                updated_at=timestamp,
-                                session_exercise=workout_session_exercise,
-                            )
-                            session.add(personal_record)
-
-            # update workout_session with total_weights
-            workout_session.total_weights = total_weights
+            # track of total performed weights
+            workout_session.total_weights = sum(
+                (set_row["weight_lifted"] or 0) for set_row in set_rows
+            )
+            session.add(workout_session)
             session.flush()
-            session.refresh(workout_session)
+
+            for set_row in set_rows:
+                set_row["session_id"] = workout_session.id
+            session_exercises = self._insert_sets(session, set_rows)
+
+            # NOTE: already known, saves loading the sets back for the rollup
+            set_committed_value(workout_session, "exercise_links", session_exercises)
+            self.daily_volume_repository.apply(
+                session, self.daily_volume_repository.contribution(workout_session)
+            )
 
             return workout_session
-        except Exception as e:
-            print(e)
-            raise e
+        except Exception:
+            logger.exception("Can't create workout session")
+            raise
@@ -1,9 +1,20 @@
 from sqlmodel import Session, create_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from fastapi import Depends
+from contextlib import asynccontextmanager, contextmanager
 from functools import lru_cache
 from dotenv import load_dotenv
 import os
 from os.path import join
 from pathlib import Path
+from typing import Callable
+
+from app.database.instrumented_pool import (
+    InstrumentedAsyncAdaptedQueuePool,
+    InstrumentedQueuePool,
+)
 
 
 class Settings:
@@ -18,11 +29,61 @@ class Settings:
 
         # getenv for unnecessary env vars
         self.DATABASE_ECHO: bool = bool(os.getenv("DATABASE_ECHO", 0))
+        # NOTE: pools are per worker process, workers * (pool size + max overflow)
+        # has to stay below the max_connections of postgres (100 by default)
+        self.DATABASE_POOL_SIZE: int = int(os.getenv("DATABASE_POOL_SIZE", 10))
+        self.DATABASE_MAX_OVERFLOW: int = int(os.getenv("DATABASE_MAX_OVERFLOW", 10))
+        # seconds a request waits for a connection before failing
+        self.DATABASE_POOL_TIMEOUT: float = float(
+            os.getenv("DATABASE_POOL_TIMEOUT", 10)
+        )
+        # seconds after which a connection is replaced, -1 keeps them forever
+        self.DATABASE_POOL_RECYCLE: int = int(os.getenv("DATABASE_POOL_RECYCLE", 1800))
+        self.DATABASE_POOL_PRE_PING: bool = bool(
+            int(os.getenv("DATABASE_POOL_PRE_PING", 1))
+        )
+        # milliseconds a statement may run unless the route sets its own, 0 disables it
+        self.DATABASE_STATEMENT_TIMEOUT: int = int(
+            os.getenv("DATABASE_STATEMENT_TIMEOUT", 10000)
+        )
 
         self.REDIS_HOST: str = os.getenv("REDIS_HOST", "localhost")
         self.REDIS_PORT: int = int(os.getenv("REDIS_PORT", 6379))
         self.REDIS_DATABASE_INDEX: int = int(os.getenv("REDIS_DATABASE_INDEX", 0))
+        # NOTE: connection pool is shared by every request of a worker process
+        self.REDIS_MAX_CONNECTIONS: int = int(os.getenv("REDIS_MAX_CONNECTIONS", 50))
+        self.REDIS_SOCKET_TIMEOUT: float = float(os.getenv("REDIS_SOCKET_TIMEOUT", 0.5))
+        self.REDIS_SOCKET_CONNECT_TIMEOUT: float = float(
+            os.getenv("REDIS_SOCKET_CONNECT_TIMEOUT", 0.5)
+        )
+        self.REDIS_HEALTH_CHECK_INTERVAL: int = int(
+            os.getenv("REDIS_HEALTH_CHECK_INTERVAL", 30)
+        )
+        # redis is skipped after this many consecutive failures, then probed
+        # again after the reset timeout, doubled on every failed probe
+        self.REDIS_BREAKER_FAILURE_THRESHOLD: int = int(
+            os.getenv("REDIS_BREAKER_FAILURE_THRESHOLD", 5)
+        )
+        self.REDIS_BREAKER_RESET_TIMEOUT: float = float(
+            os.getenv("REDIS_BREAKER_RESET_TIMEOUT", 5)
+        )
+        self.REDIS_BREAKER_MAX_RESET_TIMEOUT: float = float(
+            os.getenv("REDIS_BREAKER_MAX_RESET_TIMEOUT", 60)
+        )
+        # in-process cache tier in front of redis, ttl in seconds
+        self.CACHE_LOCAL_MAX_ENTRIES: int = int(
+            os.getenv("CACHE_LOCAL_MAX_ENTRIES", 256)
+        )
+        self.CACHE_LOCAL_TTL: float = float(os.getenv("CACHE_LOCAL_TTL", 30))
+        # cached response bodies from this size on are gzip compressed, 0 disables it
+        self.CACHE_COMPRESS_MIN_BYTES: int = int(
+            os.getenv("CACHE_COMPRESS_MIN_BYTES", 4096)
+        )
+
+        # serve the read routes with async handlers on asyncpg and redis.asyncio
+        self.ASYNC_ROUTES: bool = bool(int(os.getenv("ASYNC_ROUTES", 0)))
 
+        self.DATABASE_ASYNC_URL: str = f"postgresql+asyncpg://{self.DATABASE_USER}:{self.DATABASE_PASS}@{self.DATABASE_HOST}:{self.DATABASE_PORT}/{self.DATABASE_NAME}"
         self.DATABASE_URL: str = f"postgresql+psycopg2://{self.DATABASE_USER}:{self.DATABASE_PASS}@{self.DATABASE_HOST}:{self.DATABASE_PORT}/{self.DATABASE_NAME}"
         self.SQLALCHEMY_URL: str = f"postgresql://{self.DATABASE_USER}:{self.DATABASE_PASS}@{self.DATABASE_HOST}/{self.DATABASE_NAME}"
 
@@ -37,7 +98,75 @@ def get_settings():
     return Settings()
 
 
-engine = create_engine(get_settings().DATABASE_URL, echo=get_settings().DATABASE_ECHO)
+engine = create_engine(
+    get_settings().DATABASE_URL,
+    echo=get_settings().DATABASE_ECHO,
+    poolclass=InstrumentedQueuePool,
+    pool_size=get_settings().DATABASE_POOL_SIZE,
+    max_overflow=get_settings().DATABASE_MAX_OVERFLOW,
+    pool_timeout=get_settings().DATABASE_POOL_TIMEOUT,
+    pool_recycle=get_settings().DATABASE_POOL_RECYCLE,
+    pool_pre_ping=get_settings().DATABASE_POOL_PRE_PING,
+    # NOTE: the default of every connection, including background cache refreshes
+    connect_args={
+        "options": f"-c statement_timeout={get_settings().DATABASE_STATEMENT_TIMEOUT}"
+    },
+)
+
+
+# NOTE: created on first use, asyncpg is only needed with ASYNC_ROUTES enabled
+@lru_cache
+def get_async_engine() -> AsyncEngine:
+    settings = get_settings()
+    return create_async_engine(
+        settings.DATABASE_ASYNC_URL,
+        echo=settings.DATABASE_ECHO,
+        poolclass=InstrumentedAsyncAdaptedQueuePool,
+        pool_size=settings.DATABASE_POOL_SIZE,
+        max_overflow=settings.DATABASE_MAX_OVERFLOW,
+        pool_timeout=settings.DATABASE_POOL_TIMEOUT,
+        pool_recycle=settings.DATABASE_POOL_RECYCLE,
+        pool_pre_ping=settings.DATABASE_POOL_PRE_PING,
+        connect_args={
+            "server_settings": {
+                "statement_timeout": str(settings.DATABASE_STATEMENT_TIMEOUT)
+            }
+        },
+    )
+
+
+def get_database_pool_stats() -> dict:
+    stats = {"pid": os.getpid(), **engine.pool.snapshot()}
+    if get_settings().ASYNC_ROUTES:
+        stats["async_pool"] = get_async_engine().pool.snapshot()
+    return stats
+
+
+@event.listens_for(Session, "after_begin")
+def apply_statement_timeout(session, transaction, connection):
+    # set by the statement_timeout dependency, lasts until the transaction ends
+    milliseconds = session.info.get("statement_timeout")
+    if milliseconds is not None:
+        connection.exec_driver_sql(f"SET LOCAL statement_timeout = {int(milliseconds)}")
+
+
+def after_commit(session: Session, callback: Callable[[], None]):
+    """Runs callback once the current transaction of session is committed.
+
+    Callbacks are dropped when the transaction is rolled back instead.
+    """
+    session.info.setdefault("after_commit", []).append(callback)
+
+
+@event.listens_for(Session, "after_commit")
+def run_after_commit(session):
+    for callback in session.info.pop("after_commit", []):
+        callback()
+
+
+@event.listens_for(Session, "after_rollback")
+def discard_after_commit(session):
+    session.info.pop("after_commit", None)
 
 
 def get_db():
@@ -51,3 +180,70 @@ def get_db():
         raise e
     finally:
         session.close()
+
+
+def statement_timeout(milliseconds: int):
+    """Returns a route dependency limiting how long each statement of the request
+    may run.
+
+    The timeout is applied when the request's transaction begins, requests served
+    from the cache never check out a connection for it.
+    """
+
+    def set_statement_timeout(session: Session = Depends(get_db)):
+        session.info["statement_timeout"] = milliseconds
+
+    return set_statement_timeout
+
+
+async def get_async_db():
+    # NOTE: the sync repositories run on it through AsyncSession.run_sync
+    session = AsyncSession(get_async_engine())
+    try:
+        yield session
+
+        await session.commit()
+    except Exception as e:
+        await session.rollback()
+        raise e
+    finally:
+        await session.close()
+
+
+def async_statement_timeout(milliseconds: int):
+    """statement_timeout for the routes using get_async_db."""
+
+    async def set_statement_timeout(session: AsyncSession = Depends(get_async_db)):
+        # NOTE: info is the one of the sync session, after_begin applies it as well
+        session.info["statement_timeout"] = milliseconds
+
+    return set_statement_timeout
+
+
+# NOTE: session for work running outside of a request, e.g. background cache refreshes
+@contextmanager
+def db_session_scope():
+    session = Session(engine)
+    try:
+        yield session
+
+        session.commit()
+    except Exception as e:
+        session.rollback()
+        raise e
+    finally:
+        session.close()
+
+
+@asynccontextmanager
+async def async_db_session_scope():
+    session = AsyncSession(get_async_engine())
+    try:
+        yield session
+
+        await session.commit()
+    except Exception as e:
+        await session.rollback()
+        raise e
+    finally:
+        await session.close()
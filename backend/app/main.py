@@ -1,3 +1,4 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, HTTPException
 from loguru import logger
 import sys
@@ -6,10 +7,47 @@ from starlette.exceptions import HTTPException as StarletteHTTPException
 from starlette.requests import Request
 from fastapi.middleware.cors import CORSMiddleware
 
-from app.routers import dashboards, exercises, routines, sessions, users
+from app.dependencies import get_async_engine, get_settings
+from app.routers import (
+    async_dashboards,
+    async_exercises,
+    async_routines,
+    async_sessions,
+    dashboards,
+    exercises,
+    metrics,
+    routines,
+    sessions,
+    users,
+)
+from app.services.async_redis_service import (
+    close_async_redis_pool,
+    init_async_redis_pool,
+)
+from app.services.redis_service import (
+    close_redis_pool,
+    init_redis_pool,
+    start_cache_invalidation_listener,
+    stop_cache_invalidation_listener,
+)
 
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # NOTE: lifespan runs once per gunicorn worker, so each worker owns one pool
+    init_redis_pool(get_settings())
+    if get_settings().ASYNC_ROUTES:
+        init_async_redis_pool(get_settings())
+    start_cache_invalidation_listener()
+    yield
+    stop_cache_invalidation_listener()
+    close_redis_pool()
+    if get_settings().ASYNC_ROUTES:
+        await close_async_redis_pool()
+        await get_async_engine().dispose()
+
+
+app = FastAPI(lifespan=lifespan)
 
 # cors
 origins = [
@@ -24,11 +62,25 @@ app.add_middleware(
     allow_headers=["*"],  # allow headers
 )
 
+# NOTE: the first route matching a path and method wins, the async read routes
+# shadow their sync twins, which document them, while writes still go to the sync
+# routers
+if get_settings().ASYNC_ROUTES:
+    app.include_router(async_sessions.router, prefix="/api/v1", include_in_schema=False)
+    app.include_router(async_routines.router, prefix="/api/v1", include_in_schema=False)
+    app.include_router(
+        async_exercises.router, prefix="/api/v1", include_in_schema=False
+    )
+    app.include_router(
+        async_dashboards.router, prefix="/api/v1", include_in_schema=False
+    )
+
 app.include_router(dashboards.router, prefix="/api/v1", tags=["dashboards"])
 app.include_router(users.router, prefix="/api/v1", tags=["users"])
 app.include_router(sessions.router, prefix="/api/v1", tags=["sessions"])
 app.include_router(routines.router, prefix="/api/v1", tags=["routines"])
 app.include_router(exercises.router, prefix="/api/v1", tags=["exercises"])
+app.include_router(metrics.router, prefix="/api/v1", tags=["metrics"])
 
 # NOTE: FastAPI makes use of StarletteHTTPException, using it as default http handler
 # To inject logger method later in override function
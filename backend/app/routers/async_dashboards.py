@@ -0,0 +1,132 @@
+from datetime import datetime
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+
+from app.dependencies import async_statement_timeout
+from app.routers.cached_response import to_response
+from app.routers.mappers.dashboard_mapper import GRANULARITY, METRIC
+from app.routers.schemas.response_schemas import (
+    DayReportResponse,
+    SeriesReportResponse,
+    WeekReportResponse,
+    YearReportResponse,
+)
+from app.services.dashboard_service import (
+    AsyncDashboardService,
+    get_async_dashboard_service,
+)
+
+# NOTE: included before the sync router when ASYNC_ROUTES is set
+router = APIRouter(
+    tags=["dashboards"],
+    prefix="/dashboards",
+    dependencies=[Depends(async_statement_timeout(3000))],
+)
+
+
+@router.get(
+    "/weights/total/day",
+    response_model=DayReportResponse,
+)
+async def get_total_weights_by_day(
+    request: Request,
+    target_date: str = datetime.today().strftime("%Y-%m-%d"),
+    dashboard_service: AsyncDashboardService = Depends(get_async_dashboard_service),
+):
+    try:
+        return to_response(
+            request, await dashboard_service.get_total_weight_by_day(target_date)
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"An internal error occurred: {e.__class__.__name__}",
+        )
+
+
+@router.get(
+    "/weights/total/week",
+    response_model=WeekReportResponse,
+)
+async def get_total_weights_by_week(
+    request: Request,
+    start_date: str = datetime.today().strftime("%Y-%m-%d"),
+    end_date: str = datetime.today().strftime("%Y-%m-%d"),
+    dashboard_service: AsyncDashboardService = Depends(get_async_dashboard_service),
+):
+    try:
+        return to_response(
+            request,
+            await dashboard_service.get_total_weight_by_week(start_date, end_date),
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"An internal error occurred: {e.__class__.__name__}",
+        )
+
+
+@router.get(
+    "/weights/total/year",
+    response_model=YearReportResponse,
+)
+async def get_total_weights_by_year(
+    request: Request,
+    year: int = datetime.now().year,
+    dashboard_service: AsyncDashboardService = Depends(get_async_dashboard_service),
+):
+    try:
+        return to_response(
+            request, await dashboard_service.get_total_weight_by_year(year)
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"An internal error occurred: {e.__class__.__name__}",
+        )
+
+
+@router.get(
+    "/series",
+    response_model=SeriesReportResponse,
+)
+async def get_series(
+    request: Request,
+    start_date: str = Query(alias="from"),
+    end_date: str = Query(alias="to"),
+    granularity: GRANULARITY = GRANULARITY.DAY,
+    metric: METRIC = METRIC.VOLUME,
+    exercise_id: Optional[int] = None,
+    dashboard_service: AsyncDashboardService = Depends(get_async_dashboard_service),
+):
+    try:
+        return to_response(
+            request,
+            await dashboard_service.get_series(
+                start_date, end_date, granularity, metric, exercise_id
+            ),
+        )
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"An internal error occurred: {e.__class__.__name__}",
+        )
+
+
+@router.get(
+    "/glance",
+)
+async def get_a_glance(
+    request: Request,
+    dashboard_service: AsyncDashboardService = Depends(get_async_dashboard_service),
+):
+    try:
+        return to_response(request, await dashboard_service.get_a_glance())
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"An internal error occurred: {e.__class__.__name__}",
+        )
@@ -0,0 +1,48 @@
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+
+from app.routers.cached_response import to_response
+from app.routers.schemas.response_schemas import ExerciseResponse
+from app.services.exercise_service import (
+    AsyncExerciseService,
+    get_async_exercise_service,
+)
+
+# NOTE: read routes only, included before the sync router when ASYNC_ROUTES is set
+router = APIRouter(tags=["exercises"], prefix="/exercises")
+
+
+@router.get(
+    "",
+    response_model=list[ExerciseResponse],
+)
+async def read_exercises(
+    request: Request,
+    exercise_service: AsyncExerciseService = Depends(get_async_exercise_service),
+):
+    try:
+        return to_response(request, await exercise_service.get_all())
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"An internal error occurred: {e.__class__.__name__}",
+        )
+
+
+@router.get(
+    "/{exercise_id}",
+    response_model=ExerciseResponse,
+)
+async def get_exercise(
+    request: Request,
+    exercise_id: int,
+    exercise_service: AsyncExerciseService = Depends(get_async_exercise_service),
+):
+    try:
+        return to_response(request, await exercise_service.get_one(exercise_id))
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"An internal error occurred: {e.__class__.__name__}",
+        )
@@ -0,0 +1,45 @@
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+
+from app.routers.cached_response import to_response
+from app.routers.schemas.response_schemas import RoutineResponse
+from app.services.routine_service import AsyncRoutineService, get_async_routine_service
+
+# NOTE: read routes only, included before the sync router when ASYNC_ROUTES is set
+router = APIRouter(tags=["routines"], prefix="/routines")
+
+
+@router.get(
+    "",
+    response_model=list[RoutineResponse],
+)
+async def read_routines(
+    request: Request,
+    routine_service: AsyncRoutineService = Depends(get_async_routine_service),
+):
+    try:
+        return to_response(request, await routine_service.get_all())
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"An internal error occurred: {e.__class__.__name__}",
+        )
+
+
+@router.get(
+    "/{routine_id}",
+    response_model=RoutineResponse,
+)
+async def get_routine(
+    request: Request,
+    routine_id: int,
+    routine_service: AsyncRoutineService = Depends(get_async_routine_service),
+):
+    try:
+        return to_response(request, await routine_service.get_one(routine_id))
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"An internal error occurred: {e.__class__.__name__}",
+        )
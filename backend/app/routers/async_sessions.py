@@ -0,0 +1,61 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+
+from app.dependencies import async_statement_timeout
+from app.routers.cached_response import to_response
+from app.routers.schemas.response_schemas import (
+    SessionPageResponse,
+    SessionResponse,
+)
+from app.services.session_service import AsyncSessionService, get_async_session_service
+
+# NOTE: read routes only, included before the sync router when ASYNC_ROUTES is set
+router = APIRouter(tags=["sessions"], prefix="/sessions")
+
+
+@router.get(
+    "",
+    response_model=SessionPageResponse,
+    dependencies=[Depends(async_statement_timeout(2000))],
+)
+async def read_sessions(
+    request: Request,
+    limit: int = Query(default=20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    session_service: AsyncSessionService = Depends(get_async_session_service),
+):
+    try:
+        return to_response(
+            request,
+            await session_service.get_page(limit, cursor, start_date, end_date),
+        )
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"An internal error occurred: {e.__class__.__name__}",
+        )
+
+
+@router.get(
+    "/{workout_session_id}",
+    response_model=SessionResponse,
+)
+async def get_session(
+    request: Request,
+    workout_session_id: int,
+    session_service: AsyncSessionService = Depends(get_async_session_service),
+):
+    try:
+        return to_response(request, await session_service.get_one(workout_session_id))
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"An internal error occurred: {e.__class__.__name__}",
+        )
@@ -0,0 +1,75 @@
+from email.utils import formatdate
+
+from fastapi import Request, Response, status
+
+from app.services.base_redis_service import CacheEntry
+
+
+def to_response(request: Request, entry: CacheEntry) -> Response:
+    """Sends a cached body as it is stored, without validating it again.
+
+    Compressed bodies are passed through to clients accepting gzip and only
+    decompressed for the others. Clients already holding the body, according to
+    If-None-Match, get an empty 304 instead.
+    """
+    headers: dict = {
+        "Vary": "Accept-Encoding",
+        # NOTE: let clients keep the body but revalidate it on every use
+        "Cache-Control": "private, no-cache",
+    }
+    if entry.etag:
+        # weak, the gzip and identity bodies share the same etag
+        headers["ETag"] = f'W/"{entry.etag}"'
+    if entry.version:
+        headers["Last-Modified"] = formatdate(entry.version, usegmt=True)
+
+    if entry.etag and _etag_matches(request.headers.get("if-none-match"), entry.etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    if entry.content_encoding == "gzip":
+        if _accepts_gzip(request.headers.get("accept-encoding")):
+            headers["Content-Encoding"] = "gzip"
+            return Response(entry.body, media_type="application/json", headers=headers)
+
+    return Response(
+        entry.decoded_body(), media_type="application/json", headers=headers
+    )
+
+
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+
+    if if_none_match.strip() == "*":
+        return True
+
+    # NOTE: weak comparison, as required for If-None-Match
+    return any(
+        candidate.strip().removeprefix("W/").strip('"') == etag
+        for candidate in if_none_match.split(",")
+    )
+
+
+def _accepts_gzip(accept_encoding: str | None) -> bool:
+    """Whether gzip has a q-value above 0 in Accept-Encoding, directly or by "*"."""
+    if not accept_encoding:
+        return False
+
+    qualities: dict[str, float] = {}
+    for coding in accept_encoding.split(","):
+        name, *parameters = coding.split(";")
+        quality: float = 1.0
+        for parameter in parameters:
+            key, _, value = parameter.partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    # NOTE: an unreadable q-value is not a consent
+                    quality = 0.0
+        qualities[name.strip().lower()] = quality
+
+    for name in ("gzip", "x-gzip", "*"):
+        if name in qualities:
+            return qualities[name] > 0
+    return False
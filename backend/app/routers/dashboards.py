@@ -1,16 +1,26 @@
 from app.services.dashboard_service import get_dashboard_service
 from app.services.dashboard_service import DashboardService
 from datetime import datetime
+from typing import Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
 
+from app.dependencies import statement_timeout
+from app.routers.cached_response import to_response
+from app.routers.mappers.dashboard_mapper import GRANULARITY, METRIC
 from app.routers.schemas.response_schemas import (
     DayReportResponse,
+    SeriesReportResponse,
     WeekReportResponse,
     YearReportResponse,
 )
 
-router = APIRouter(tags=["dashboards"], prefix="/dashboards")
+# NOTE: read only aggregations, a slow one is cut short instead of holding a connection
+router = APIRouter(
+    tags=["dashboards"],
+    prefix="/dashboards",
+    dependencies=[Depends(statement_timeout(3000))],
+)
 
 # NOTE: Do dashboard repository in the future
 
@@ -20,11 +30,14 @@ router = APIRouter(tags=["dashboards"], prefix="/dashboards")
     response_model=DayReportResponse,
 )
 def get_total_weights_by_day(
+    request: Request,
     target_date: str = datetime.today().strftime("%Y-%m-%d"),
     dashboard_service: DashboardService = Depends(get_dashboard_service),
 ):
     try:
-        return dashboard_service.get_total_weight_by_day(target_date)
+        return to_response(
+            request, dashboard_service.get_total_weight_by_day(target_date)
+        )
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -33,16 +46,19 @@ def get_total_weights_by_day(
 
 
 @router.get(
-    "weights/total/week",
+    "/weights/total/week",
     response_model=WeekReportResponse,
 )
 def get_total_weights_by_week(
+    request: Request,
     start_date: str = datetime.today().strftime("%Y-%m-%d"),
     end_date: str = datetime.today().strftime("%Y-%m-%d"),
     dashboard_service: DashboardService = Depends(get_dashboard_service),
 ):
     try:
-        return dashboard_service.get_total_weight_by_week(start_date, end_date)
+        return to_response(
+            request, dashboard_service.get_total_weight_by_week(start_date, end_date)
+        )
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -55,11 +71,41 @@ def get_total_weights_by_week(
     response_model=YearReportResponse,
 )
 def get_total_weights_by_year(
+    request: Request,
     year: int = datetime.now().year,
     dashboard_service: DashboardService = Depends(get_dashboard_service),
 ):
     try:
-        return dashboard_service.get_total_weight_by_year(year)
+        return to_response(request, dashboard_service.get_total_weight_by_year(year))
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"An internal error occurred: {e.__class__.__name__}",
+        )
+
+
+@router.get(
+    "/series",
+    response_model=SeriesReportResponse,
+)
+def get_series(
+    request: Request,
+    start_date: str = Query(alias="from"),
+    end_date: str = Query(alias="to"),
+    granularity: GRANULARITY = GRANULARITY.DAY,
+    metric: METRIC = METRIC.VOLUME,
+    exercise_id: Optional[int] = None,
+    dashboard_service: DashboardService = Depends(get_dashboard_service),
+):
+    try:
+        return to_response(
+            request,
+            dashboard_service.get_series(
+                start_date, end_date, granularity, metric, exercise_id
+            ),
+        )
+    except HTTPException as e:
+        raise e
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -71,10 +117,11 @@ def get_total_weights_by_year(
     "/glance",
 )
 def get_a_glance(
+    request: Request,
     dashboard_service: DashboardService = Depends(get_dashboard_service),
 ):
     try:
-        return dashboard_service.get_a_glance()
+        return to_response(request, dashboard_service.get_a_glance())
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
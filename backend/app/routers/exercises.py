@@ -1,10 +1,11 @@
 from fastapi.responses import JSONResponse
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 
 from app.routers.schemas.request_schemas import (
     CreateExerciseRequest,
     UpdateExerciseRequest,
 )
+from app.routers.cached_response import to_response
 from app.routers.schemas.response_schemas import ExerciseResponse
 from app.services.exercise_service import get_exercise_service, ExerciseService
 
@@ -15,9 +16,12 @@ router = APIRouter(tags=["exercises"], prefix="/exercises")
     "",
     response_model=list[ExerciseResponse],
 )
-def read_exercises(exercise_service: ExerciseService = Depends(get_exercise_service)):
+def read_exercises(
+    request: Request,
+    exercise_service: ExerciseService = Depends(get_exercise_service),
+):
     try:
-        return exercise_service.get_all()
+        return to_response(request, exercise_service.get_all())
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -30,11 +34,14 @@ def read_exercises(exercise_service: ExerciseService = Depends(get_exercise_serv
     response_model=ExerciseResponse,
 )
 def get_exercise(
-    exercise_id: int, exercise_service: ExerciseService = Depends(get_exercise_service)
+    request: Request,
+    exercise_id: int,
+    exercise_service: ExerciseService = Depends(get_exercise_service),
 ):
     try:
-        print("sdasdasd")
-        return exercise_service.get_one(exercise_id)
+        return to_response(request, exercise_service.get_one(exercise_id))
+    except HTTPException as e:
+        raise e
     except Exception as e:
         print(e)
         raise HTTPException(
@@ -5,6 +5,8 @@ from app.routers.schemas.response_schemas import (
     WeekReportResponse,
     YearReportResponse,
     GlanceReportResponse,
+    SeriesPointResponse,
+    SeriesReportResponse,
 )
 from enum import Enum
 
@@ -36,6 +38,22 @@ class ReportMapper(BaseResponseMapper):
     def map_glance_response(self, results: object) -> GlanceReportResponse:
         return GlanceReportResponse.model_validate(results)
 
+    def map_to_series_response(
+        self,
+        granularity: "GRANULARITY",
+        metric: "METRIC",
+        exercise_id: int | None,
+        points: list[tuple],
+    ) -> SeriesReportResponse:
+        return SeriesReportResponse(
+            granularity=granularity.value,
+            metric=metric.value,
+            exercise_id=exercise_id,
+            points=[
+                SeriesPointResponse(start=start, value=value) for start, value in points
+            ],
+        )
+
 
 class TIMERANGE(Enum):
     DAY = "day"
@@ -44,6 +62,20 @@ class TIMERANGE(Enum):
     YEARLY = "yearly"
 
 
+class GRANULARITY(Enum):
+    DAY = "day"
+    WEEK = "week"
+    MONTH = "month"
+    YEAR = "year"
+
+
+class METRIC(Enum):
+    VOLUME = "volume"
+    REPS = "reps"
+    SETS = "sets"
+    SESSIONS = "sessions"
+
+
 class WEEKDAY(Enum):
     MON = "monday"
     TUE = "tuesday"
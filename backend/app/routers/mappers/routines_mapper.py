@@ -2,7 +2,10 @@ from app.routers.mappers.base_mapper import BaseResponseMapper
 from app.routers.schemas.response_schemas import RoutineResponse
 from typing import Sequence
 from app.database.models import Routine
-from app.routers.schemas.response_schemas import RoutineExerciseResponse
+from app.routers.schemas.response_schemas import (
+    ExerciseSetResponse,
+    RoutineExerciseResponse,
+)
 
 
 class RoutineMapper(BaseResponseMapper):
@@ -34,7 +37,10 @@ class RoutineMapper(BaseResponseMapper):
                     if exercise_link.exercise.personal_record
                     else None
                 )
-                exercise.sets = exercise_link.routine_exercise_sets
+                exercise.sets = [
+                    ExerciseSetResponse.model_validate(routine_exercise_set)
+                    for routine_exercise_set in exercise_link.routine_exercise_sets
+                ]
                 exercises.append(exercise)
 
             routine_response.exercises = exercises
@@ -68,7 +74,10 @@ class RoutineMapper(BaseResponseMapper):
                 if exercise_link.exercise.personal_record
                 else None
             )
-            exercise.sets = exercise_link.routine_exercise_sets
+            exercise.sets = [
+                ExerciseSetResponse.model_validate(routine_exercise_set)
+                for routine_exercise_set in exercise_link.routine_exercise_sets
+            ]
 
             exercises.append(exercise)
 
@@ -0,0 +1,36 @@
+from fastapi import APIRouter
+
+from app.routers.schemas.response_schemas import (
+    CacheStatsResponse,
+    DatabasePoolStatsResponse,
+    RedisPoolStatsResponse,
+)
+from app.dependencies import get_database_pool_stats
+from app.services.redis_service import get_cache_stats, get_redis_pool_stats
+
+router = APIRouter(tags=["metrics"], prefix="/metrics")
+
+
+# NOTE: stats are per worker process, the pid tells which worker answered
+@router.get(
+    "/redis",
+    response_model=RedisPoolStatsResponse,
+)
+def get_redis_metrics():
+    return get_redis_pool_stats()
+
+
+@router.get(
+    "/database",
+    response_model=DatabasePoolStatsResponse,
+)
+def get_database_metrics():
+    return get_database_pool_stats()
+
+
+@router.get(
+    "/cache",
+    response_model=CacheStatsResponse,
+)
+def get_cache_metrics():
+    return get_cache_stats()
@@ -1,6 +1,6 @@
 from app.services.routine_service import RoutineService
 from app.services.routine_service import get_routine_service
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from fastapi.responses import JSONResponse
 
 from app.routers.schemas.request_schemas import (
@@ -8,6 +8,7 @@ from app.routers.schemas.request_schemas import (
     UpdateRoutineRequest,
 )
 
+from app.routers.cached_response import to_response
 from app.routers.schemas.response_schemas import RoutineResponse
 
 router = APIRouter(tags=["routines"], prefix="/routines")
@@ -18,10 +19,11 @@ router = APIRouter(tags=["routines"], prefix="/routines")
     response_model=list[RoutineResponse],
 )
 def read_routines(
+    request: Request,
     routine_service: RoutineService = Depends(get_routine_service),
 ):
     try:
-        return routine_service.get_all()
+        return to_response(request, routine_service.get_all())
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -34,11 +36,12 @@ def read_routines(
     response_model=RoutineResponse,
 )
 def get_routine(
+    request: Request,
     routine_id: int,
     routine_service: RoutineService = Depends(get_routine_service),
 ):
     try:
-        return routine_service.get_by_id(routine_id)
+        return to_response(request, routine_service.get_one(routine_id))
     except HTTPException as e:
         raise e
     except Exception as e:
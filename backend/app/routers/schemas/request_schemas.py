@@ -7,10 +7,13 @@ from sqlmodel import SQLModel
 # region User request schemas
 class CreateUserRequest(SQLModel):
     username: str
+    # IANA time zone, e.g. Europe/Berlin
+    timezone: str = "UTC"
 
 
 class UpdateUserRequest(SQLModel):
-    username: str
+    username: Optional[str] = None
+    timezone: Optional[str] = None
 
 
 # endregion
@@ -1,7 +1,16 @@
+from datetime import date, datetime
 from decimal import Decimal
-from pydantic import RootModel
+from pydantic import BeforeValidator, RootModel
 from sqlmodel import SQLModel
-from typing import Optional
+from typing import Annotated, Optional
+
+
+def _to_epoch_seconds(value):
+    return value.timestamp() if isinstance(value, datetime) else value
+
+
+# NOTE: timestamptz columns are sent as epoch seconds, like the float columns
+EpochSeconds = Annotated[float, BeforeValidator(_to_epoch_seconds)]
 
 
 # region Exercise response schemas
@@ -63,8 +72,8 @@ class SessionResponse(SQLModel):
     description: Optional[str] = None
     duration: Optional[int] = None
     total_weights: Optional[int] = None
-    created_at: float
-    updated_at: Optional[float] = None
+    created_at: EpochSeconds
+    updated_at: Optional[EpochSeconds] = None
     notes: Optional[str] = None
 
     # Relationships
@@ -72,6 +81,12 @@ class SessionResponse(SQLModel):
     exercises: Optional[list["SessionExerciseResponse"]] = None
 
 
+class SessionPageResponse(SQLModel):
+    items: list[SessionResponse]
+    # pass it back as cursor to get the next page, None on the last page
+    next_cursor: Optional[str] = None
+
+
 class SessionExerciseResponse(SQLModel):
     class SessionExerciseSetResponse(SQLModel):
         id: Optional[int] = 0
@@ -105,7 +120,75 @@ class GlanceReportResponse(SQLModel):
     total_workouts: int = 0
     total_volumes: int = 0
     streaks: int = 0
-    last_workout: object = 0
+    last_workout: Optional[EpochSeconds] = None
+
+
+class SeriesPointResponse(SQLModel):
+    # first day of the bucket
+    start: date
+    value: float = 0
+
+
+class SeriesReportResponse(SQLModel):
+    granularity: str
+    metric: str
+    exercise_id: Optional[int] = None
+    points: list[SeriesPointResponse] = []
+
+
+# endregion
+
+
+# region Metrics response schemas
+class RedisPoolStatsResponse(SQLModel):
+    pid: int
+    max_connections: int
+    created_connections: int
+    available_connections: int
+    in_use_connections: int
+
+
+class PoolStatsResponse(SQLModel):
+    size: int
+    max_overflow: int
+    checked_out: int
+    checked_in: int
+    overflow: int
+    # threads blocked on a checkout right now
+    waiting: int
+    checkouts: int
+    timeouts: int
+    # seconds
+    average_wait: float
+    max_wait: float
+
+
+class DatabasePoolStatsResponse(PoolStatsResponse):
+    pid: int
+    # the pool of the async engine, when ASYNC_ROUTES is enabled
+    async_pool: Optional[PoolStatsResponse] = None
+
+
+class CacheTierStatsResponse(SQLModel):
+    hits: int = 0
+    misses: int = 0
+    size: Optional[int] = None
+    max_entries: Optional[int] = None
+
+
+class CircuitBreakerStatsResponse(SQLModel):
+    state: str
+    consecutive_failures: int
+    trips: int
+    rejected_calls: int
+    retry_in: float
+
+
+class CacheStatsResponse(SQLModel):
+    pid: int
+    local: CacheTierStatsResponse
+    redis: CacheTierStatsResponse
+    breaker: CircuitBreakerStatsResponse
 
 
 # endregion
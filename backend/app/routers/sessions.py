@@ -1,14 +1,19 @@
 from app.services.session_service import get_session_service
 from app.services.session_service import SessionService
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
 from fastapi.responses import JSONResponse
 
+from app.dependencies import statement_timeout
+from app.routers.cached_response import to_response
 from app.routers.schemas.request_schemas import (
     CreateWorkoutSessionRequest,
     UpdateWorkoutSessionRequest,
 )
 from app.routers.schemas.response_schemas import (
+    SessionPageResponse,
     SessionResponse,
 )
 
@@ -17,13 +22,23 @@ router = APIRouter(tags=["sessions"], prefix="/sessions")
 
 @router.get(
     "",
-    response_model=list[SessionResponse],
+    response_model=SessionPageResponse,
+    dependencies=[Depends(statement_timeout(2000))],
 )
 def read_sessions(
+    request: Request,
+    limit: int = Query(default=20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
     session_service: SessionService = Depends(get_session_service),
 ):
     try:
-        return session_service.get_all()
+        return to_response(
+            request, session_service.get_page(limit, cursor, start_date, end_date)
+        )
+    except HTTPException as e:
+        raise e
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -36,11 +51,14 @@ def read_sessions(
     response_model=SessionResponse,
 )
 def get_session(
+    request: Request,
     workout_session_id: int,
     session_service: SessionService = Depends(get_session_service),
 ):
     try:
-        return session_service.get_one(workout_session_id)
+        return to_response(request, session_service.get_one(workout_session_id))
+    except HTTPException as e:
+        raise e
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
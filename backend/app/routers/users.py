@@ -1,16 +1,27 @@
 from datetime import datetime, timezone
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 
 from fastapi import APIRouter, Depends, HTTPException
 from fastapi.responses import JSONResponse, Response
 from sqlmodel import Session, select
 
+from app.database.daily_volume_repository import DailyVolumeRepository
 from app.database.models import User
 from app.routers.schemas.request_schemas import CreateUserRequest, UpdateUserRequest
 from app.dependencies import get_db
+from app.services.dashboard_service import DashboardService
+from app.services.redis_service import RedisService, get_redis_service
 
 router = APIRouter(tags=["users"], prefix="/users")
 
 
+def validate_timezone(name: str) -> str:
+    try:
+        return ZoneInfo(name).key
+    except (ZoneInfoNotFoundError, ValueError):
+        raise HTTPException(status_code=400, detail=f"Unknown time zone: {name}")
+
+
 @router.get("", response_model=list[User], dependencies=[Depends(get_db)])
 def read_users(session: Session = Depends(get_db)):
     users = session.exec(select(User)).all()
@@ -32,6 +43,7 @@ def create_user(input: CreateUserRequest, session: Session = Depends(get_db)):
     timestamp = datetime.now(timezone.utc).timestamp()
     user = User(
         username=input.username,
+        timezone=validate_timezone(input.timezone),
         created_at=timestamp,
         updated_at=timestamp,
     )
@@ -43,20 +55,37 @@ def create_user(input: CreateUserRequest, session: Session = Depends(get_db)):
 
 @router.patch("/{user_id}", response_model=User, dependencies=[Depends(get_db)])
 def update_user(
-    user_id: int, input: UpdateUserRequest, session: Session = Depends(get_db)
+    user_id: int,
+    input: UpdateUserRequest,
+    session: Session = Depends(get_db),
+    redis_service: RedisService = Depends(get_redis_service),
+    daily_volume_repository: DailyVolumeRepository = Depends(DailyVolumeRepository),
 ):
     user = session.get(User, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
     timestamp = datetime.now(timezone.utc).timestamp()
+    is_edited = False
     if input.username and user.username != input.username:
         user.username = input.username
+        is_edited = True
+
+    if input.timezone and user.timezone != input.timezone:
+        user.timezone = validate_timezone(input.timezone)
+        # sets may fall on other days now, rebuild the user's rollup
+        daily_volume_repository.rebuild(session, user.id, user.timezone)
+        is_edited = True
+
+    if is_edited:
         user.updated_at = timestamp
 
         session.add(user)
         session.commit()
         session.refresh(user)
+        # NOTE: after the commit, dashboards are then built under keys of the new
+        # generation, the former ones expire on their own
+        redis_service.remove_cache(DashboardService.build_zone_key(user.id))
         return user
     return Response(status_code=204)
 
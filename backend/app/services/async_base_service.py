@@ -0,0 +1,57 @@
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.services.async_redis_service import AsyncRedisService
+from app.services.base_redis_service import CacheEntry
+from app.services.base_service import BaseService
+
+
+class AsyncBaseService(BaseService):
+    """Read path of BaseService for the async routes.
+
+    The sync repository and mapper run on the AsyncSession through run_sync, in a
+    greenlet whose database round trips await asyncpg, so the queries are shared
+    with the sync path and lazy loads keep working. Cache keys and tags are the ones
+    of the sync service, writes stay on the sync routes.
+
+    Mixed in front of a resource service, e.g. AsyncBaseService, ExerciseService.
+    """
+
+    redis_service: AsyncRedisService
+    db_session: AsyncSession
+
+    async def get_all(self):
+        return await self.redis_service.get_or_load(
+            self.redis_key,
+            lambda db_session: db_session.run_sync(self._load_all),
+            self.db_session,
+            tags=self.get_cache_tags,
+            version=self.get_list_version,
+        )
+
+    async def get_one(self, obj_id: int):
+        return await self.redis_service.get_or_load(
+            self.get_entity_key(obj_id),
+            lambda db_session: db_session.run_sync(self._load_one, obj_id),
+            self.db_session,
+            tags=self.get_entity_cache_tags,
+            version=self.get_version,
+        )
+
+    async def get_many(self, obj_ids: list[int]) -> dict[int, CacheEntry]:
+        keys: dict[int, str] = self._entity_keys(obj_ids)
+        entries = self._fresh_entries(
+            keys, await self.redis_service.get_entries(list(keys.values()))
+        )
+
+        missing_ids: list[int] = [obj_id for obj_id in keys if obj_id not in entries]
+        if missing_ids:
+            responses = await self.db_session.run_sync(self._load_many, missing_ids)
+            for obj_id, response in responses.items():
+                entries[obj_id] = await self.redis_service.cache_value(
+                    keys[obj_id],
+                    response,
+                    tags=self.get_entity_cache_tags(response),
+                    version=self.get_version(response),
+                )
+
+        return {obj_id: entries[obj_id] for obj_id in obj_ids if obj_id in entries}
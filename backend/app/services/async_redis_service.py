@@ -0,0 +1,270 @@
+from fastapi import Depends
+from loguru import logger
+from redis.asyncio import ConnectionPool, Redis
+from sqlmodel.ext.asyncio.session import AsyncSession
+from typing import Any, Awaitable, Callable
+import asyncio
+import orjson
+import time
+import uuid
+
+from app.dependencies import Settings, async_db_session_scope, get_settings
+from app.services.base_redis_service import (
+    UNAVAILABLE,
+    BaseRedisService,
+    CacheEntry,
+    RedisResourceKey,
+    get_local_cache,
+)
+from app.services.single_flight import AsyncSingleFlight
+
+# coalesces concurrent rebuilds of the same key within this worker's event loop
+_single_flight = AsyncSingleFlight()
+
+# NOTE: tasks are only weakly referenced by the loop, keep them until they are done
+_refresh_tasks: set[asyncio.Task] = set()
+_refreshing_keys: set[str] = set()
+
+
+class AsyncRedisService(BaseRedisService):
+    """RedisService on redis.asyncio, for the async routes.
+
+    Keys, tags and entries are the same as the sync service's, both paths read and
+    invalidate each other's entries. Loaders are coroutines taking an AsyncSession.
+    """
+
+    redis_session: Redis | None
+
+    async def get_value(
+        self, resource_type: RedisResourceKey | str, user_id: int = None
+    ):
+        entry = await self.get_entry(self.resolve_key(resource_type, user_id))
+        return orjson.loads(entry.decoded_body()) if entry else None
+
+    async def get_entry(self, key: str) -> CacheEntry | None:
+        entry = self.local_cache.get(key)
+        if entry is not None:
+            return entry
+
+        payload = await self._execute(
+            lambda redis_session: redis_session.get(key), "read cache"
+        )
+        return self._read_payload(key, payload)
+
+    async def get_entries(self, keys: list[str]) -> dict[str, CacheEntry]:
+        entries, missing_keys = self._split_local(keys)
+        if not missing_keys:
+            return entries
+
+        payloads = await self._execute(
+            lambda redis_session: redis_session.mget(missing_keys), "read cache"
+        )
+        return self._read_payloads(missing_keys, payloads, entries)
+
+    async def cache_value(
+        self,
+        resource_type: RedisResourceKey | str,
+        value: list | object | str,
+        user_id: int = None,
+        duration: int | None = None,
+        tags: list[str] | None = None,
+        version: float | None = None,
+    ) -> CacheEntry:
+        entry, hard_duration = self._encode_entry(value, duration, version)
+        key: str = self.resolve_key(resource_type, user_id)
+        stored = await self._execute(
+            self._store_operation(key, entry, hard_duration, tags), "cache value"
+        )
+        self._keep_stored(key, entry, hard_duration, stored)
+        return entry
+
+    async def get_or_load(
+        self,
+        resource_type: RedisResourceKey | str,
+        loader: Callable[[AsyncSession], Awaitable[Any]],
+        db_session: AsyncSession,
+        duration: int | None = None,
+        tags: list[str] | Callable[[Any], list[str]] | None = None,
+        version: Callable[[Any], float | None] | None = None,
+    ):
+        """Same as RedisService.get_or_load, stale values are refreshed in a task."""
+        key: str = self.resolve_key(resource_type)
+        entry = await self.get_entry(key)
+        if entry:
+            if entry.is_stale():
+                self._refresh_in_background(key, loader, duration, tags, version)
+            return entry
+
+        return await _single_flight.do(
+            key,
+            lambda: self._load_once(key, loader, db_session, duration, tags, version),
+        )
+
+    async def _load_once(
+        self,
+        key: str,
+        loader: Callable[[AsyncSession], Awaitable[Any]],
+        db_session: AsyncSession,
+        duration: int | None,
+        tags: list[str] | Callable[[Any], list[str]] | None,
+        version: Callable[[Any], float | None] | None,
+    ):
+        entry = await self.get_entry(key)
+        if entry:
+            return entry
+
+        lock_key: str = self.build_lock_key(key)
+        token: str = uuid.uuid4().hex
+        if not await self._acquire_lock(lock_key, token):
+            entry = await self._wait_for_entry(key, lock_key)
+            if entry:
+                return entry
+
+        try:
+            return await self._load_and_cache(
+                key, loader, db_session, duration, tags, version
+            )
+        finally:
+            await self._release_lock(lock_key, token)
+
+    async def _load_and_cache(
+        self,
+        key: str,
+        loader: Callable[[AsyncSession], Awaitable[Any]],
+        db_session: AsyncSession,
+        duration: int | None,
+        tags: list[str] | Callable[[Any], list[str]] | None,
+        version: Callable[[Any], float | None] | None,
+    ):
+        value = await loader(db_session)
+        return await self.cache_value(
+            key,
+            value,
+            duration=duration,
+            tags=tags(value) if callable(tags) else tags,
+            version=version(value) if version else None,
+        )
+
+    def _refresh_in_background(
+        self,
+        key: str,
+        loader: Callable[[AsyncSession], Awaitable[Any]],
+        duration: int | None,
+        tags: list[str] | Callable[[Any], list[str]] | None,
+        version: Callable[[Any], float | None] | None,
+    ):
+        # NOTE: no lock needed, the event loop runs one coroutine at a time
+        if key in _refreshing_keys:
+            return
+        _refreshing_keys.add(key)
+
+        async def refresh():
+            lock_key: str = self.build_lock_key(key)
+            token: str = uuid.uuid4().hex
+            try:
+                if not await self._acquire_lock(lock_key, token):
+                    return
+
+                try:
+                    async with async_db_session_scope() as db_session:
+                        await self._load_and_cache(
+                            key, loader, db_session, duration, tags, version
+                        )
+                finally:
+                    await self._release_lock(lock_key, token)
+            except Exception as e:
+                logger.warning(f"Can't refresh cache key {key}: {e}")
+            finally:
+                _refreshing_keys.discard(key)
+
+        task = asyncio.create_task(refresh())
+        _refresh_tasks.add(task)
+        task.add_done_callback(_refresh_tasks.discard)
+
+    async def _acquire_lock(self, lock_key: str, token: str) -> bool:
+        acquired = await self._execute(
+            self._acquire_lock_operation(lock_key, token), "acquire lock"
+        )
+        return self._is_lock_acquired(acquired)
+
+    async def _wait_for_entry(self, key: str, lock_key: str) -> CacheEntry | None:
+        deadline: float = time.monotonic() + self.lock_wait_duration_ms / 1000
+        while time.monotonic() < deadline:
+            await asyncio.sleep(self.lock_poll_interval_ms / 1000)
+            entry = await self.get_entry(key)
+            if entry:
+                return entry
+
+            exists = await self._execute(
+                lambda redis_session: redis_session.exists(lock_key), "check lock"
+            )
+            if exists is UNAVAILABLE or not exists:
+                return None
+
+        return None
+
+    async def _release_lock(self, lock_key: str, token: str):
+        await self._execute(
+            self._release_lock_operation(lock_key, token), "release lock"
+        )
+
+    async def remove_cache(
+        self, resource_type: RedisResourceKey | str, user_id: int = None
+    ):
+        await self.invalidate(self.resolve_key(resource_type, user_id))
+
+    async def invalidate(self, *keys: str, tags: list[str] | None = None):
+        removed_keys = await self._execute(
+            self._invalidate_operation(keys, tags), "remove cache"
+        )
+        self._evict_removed(removed_keys)
+
+    async def _execute(self, operation: Callable[[Redis], Awaitable[Any]], action: str):
+        """Awaits operation against redis through the circuit breaker."""
+        if not self._allow_request():
+            return UNAVAILABLE
+
+        try:
+            result = await operation(self.redis_session)
+        except Exception as e:
+            self._record_error(e, action)
+            return UNAVAILABLE
+
+        self._record_success()
+        return result
+
+
+# NOTE: bound to the event loop of the worker, created in the FastAPI lifespan
+_async_redis_pool: ConnectionPool | None = None
+
+
+def init_async_redis_pool(settings: Settings) -> ConnectionPool:
+    global _async_redis_pool
+    if _async_redis_pool is None:
+        _async_redis_pool = ConnectionPool(
+            host=settings.REDIS_HOST,
+            port=settings.REDIS_PORT,
+            db=settings.REDIS_DATABASE_INDEX,
+            max_connections=settings.REDIS_MAX_CONNECTIONS,
+            socket_timeout=settings.REDIS_SOCKET_TIMEOUT,
+            socket_connect_timeout=settings.REDIS_SOCKET_CONNECT_TIMEOUT,
+            health_check_interval=settings.REDIS_HEALTH_CHECK_INTERVAL,
+            decode_responses=False,
+        )
+    return _async_redis_pool
+
+
+async def close_async_redis_pool():
+    global _async_redis_pool
+    if _async_redis_pool is not None:
+        await _async_redis_pool.aclose()
+        _async_redis_pool = None
+
+
+# NOTE: async dependencies run on the event loop, sync ones in the threadpool
+async def _get_async_redis():
+    return Redis(connection_pool=init_async_redis_pool(get_settings()))
+
+
+async def get_async_redis_service(redis_session=Depends(_get_async_redis)):
+    return AsyncRedisService(redis_session, get_local_cache())
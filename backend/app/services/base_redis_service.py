@@ -0,0 +1,405 @@
+from datetime import date
+from decimal import Decimal
+from enum import Enum
+from functools import lru_cache
+from loguru import logger
+from redis.exceptions import ConnectionError, TimeoutError
+from typing import Any, Callable
+import gzip
+import hashlib
+import orjson
+import time
+import uuid
+
+from app.dependencies import get_settings
+from app.services.circuit_breaker import CircuitBreaker
+from app.services.local_cache import LocalCache, TierStats
+
+CACHE_INVALIDATION_CHANNEL = "cache:invalidate"
+
+# NOTE: identifies this worker process in invalidation messages
+INSTANCE_ID = uuid.uuid4().hex
+
+# KEYS: tag sets, ARGV: channel, origin, explicit keys to remove
+# Returns every removed key so the caller can evict its local tier too
+INVALIDATE_SCRIPT = """
+local removed = {}
+for i = 3, #ARGV do
+    table.insert(removed, ARGV[i])
+end
+for _, tag in ipairs(KEYS) do
+    for _, key in ipairs(redis.call('SMEMBERS', tag)) do
+        table.insert(removed, key)
+    end
+end
+for _, key in ipairs(removed) do
+    redis.call('DEL', key)
+end
+if #KEYS > 0 then
+    redis.call('DEL', unpack(KEYS))
+end
+if #removed > 0 then
+    redis.call('PUBLISH', ARGV[1], cjson.encode({origin = ARGV[2], keys = removed}))
+end
+return removed
+"""
+
+RELEASE_LOCK_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+# hit/miss counters of the redis tier, the local tier keeps its own
+redis_stats = TierStats()
+
+# returned by _execute when redis was not called or the call failed
+UNAVAILABLE = object()
+
+
+class RedisResourceKey(Enum):
+    EXERCISES = "exercises"
+    WORKOUT_SESSION = "workout_sessions"
+    DASHBOARDS = "dashboards"
+    ROUTINES = "routines"
+
+
+class BaseRedisService:
+    """Keys, entries and commands shared by RedisService and AsyncRedisService.
+
+    Nothing here talks to redis: the subclasses run the operations built here on
+    their sync or async client, through _execute, and hand the results back.
+    Both share the local tier, the stats and the circuit breaker of the worker.
+    """
+
+    def __init__(self, redis_session: Any, local_cache: LocalCache):
+        self.redis_session = redis_session
+        # in-process tier in front of redis
+        self.local_cache: LocalCache = local_cache
+        # 2 hours
+        self.key_duration: int = 7200
+        # tag sets outlive every entry registered in them, 31 days
+        self.tag_duration: int = 2678400
+        # stale values are still served for 1 day after their duration
+        self.stale_duration: int = 86400
+        # bodies from this size on are stored gzip compressed, 0 disables it
+        self.compress_min_bytes: int = get_settings().CACHE_COMPRESS_MIN_BYTES
+        # a rebuild holds the lock at most 10 seconds, others wait up to 5 seconds
+        self.lock_duration_ms: int = 10000
+        self.lock_wait_duration_ms: int = 5000
+        self.lock_poll_interval_ms: int = 50
+
+    @staticmethod
+    def build_key(
+        resource_type: RedisResourceKey, *scope: object, user_id: int = None
+    ) -> str:
+        """Builds a key scoped to a resource, a user and optional parameters.
+
+        e.g. build_key(RedisResourceKey.DASHBOARDS, "year", 2025) -> "dashboards/1/year/2025"
+        """
+        parts: list[str] = [resource_type.value, str(user_id if user_id else 1)]
+        parts.extend(str(part) for part in scope)
+        return "/".join(parts)
+
+    def resolve_key(
+        self, resource_type: RedisResourceKey | str, user_id: int = None
+    ) -> str:
+        # NOTE: plain strings are keys already built with build_key
+        if isinstance(resource_type, str):
+            return resource_type
+        return self.build_key(resource_type, user_id=user_id)
+
+    @staticmethod
+    def build_tag_key(tag: str) -> str:
+        return f"tag:{tag}"
+
+    @staticmethod
+    def build_lock_key(key: str) -> str:
+        return f"lock:{key}"
+
+    def _read_payload(self, key: str, payload: Any) -> "CacheEntry | None":
+        """Turns what redis returned for key into an entry, counting hits and misses."""
+        if payload is UNAVAILABLE:
+            return None
+
+        entry = CacheEntry.loads(payload) if payload else None
+        if entry:
+            redis_stats.hit()
+            self.local_cache.set(key, entry)
+            return entry
+
+        redis_stats.miss()
+        return None
+
+    def _split_local(
+        self, keys: list[str]
+    ) -> tuple[dict[str, "CacheEntry"], list[str]]:
+        """Returns the entries of keys held by the local tier and the keys it misses."""
+        entries: dict[str, CacheEntry] = {}
+        for key in keys:
+            entry = self.local_cache.get(key)
+            if entry is not None:
+                entries[key] = entry
+
+        return entries, [key for key in keys if key not in entries]
+
+    def _read_payloads(
+        self, keys: list[str], payloads: Any, entries: dict[str, "CacheEntry"]
+    ) -> dict[str, "CacheEntry"]:
+        """Adds the entries an MGET of keys returned to entries."""
+        if payloads is UNAVAILABLE:
+            return entries
+
+        for key, payload in zip(keys, payloads):
+            entry = self._read_payload(key, payload)
+            if entry:
+                entries[key] = entry
+
+        return entries
+
+    def _encode_entry(
+        self, value: Any, duration: int | None, version: float | None
+    ) -> tuple["CacheEntry", int]:
+        """Encodes value and returns it with the redis ttl of its key."""
+        # fresh for 2 hours unless told otherwise, then served stale for a day
+        duration = duration or self.key_duration
+        entry = CacheEntry.encode(
+            value, time.time() + duration, self.compress_min_bytes, version
+        )
+        return entry, duration + self.stale_duration
+
+    def _store_operation(
+        self,
+        key: str,
+        entry: "CacheEntry",
+        hard_duration: int,
+        tags: list[str] | None,
+    ) -> Callable[[Any], Any]:
+        def store(redis_session):
+            pipeline = redis_session.pipeline(transaction=False)
+            pipeline.setex(key, hard_duration, entry.dumps())
+            # register the key in every tag set it depends on
+            for tag in tags or []:
+                tag_key: str = self.build_tag_key(tag)
+                pipeline.sadd(tag_key, key)
+                pipeline.expire(tag_key, max(hard_duration, self.tag_duration))
+            return pipeline.execute()
+
+        return store
+
+    def _keep_stored(
+        self, key: str, entry: "CacheEntry", hard_duration: int, stored: Any
+    ):
+        # NOTE: only keep a local copy of what other workers can be told to drop
+        if stored is not UNAVAILABLE:
+            self.local_cache.set(key, entry, hard_duration)
+
+    def _acquire_lock_operation(
+        self, lock_key: str, token: str
+    ) -> Callable[[Any], Any]:
+        return lambda redis_session: redis_session.set(
+            lock_key, token, nx=True, px=self.lock_duration_ms
+        )
+
+    @staticmethod
+    def _is_lock_acquired(acquired: Any) -> bool:
+        # nothing to coordinate with, go ahead
+        return True if acquired is UNAVAILABLE else bool(acquired)
+
+    @staticmethod
+    def _release_lock_operation(lock_key: str, token: str) -> Callable[[Any], Any]:
+        # NOTE: only delete the lock if it is still ours
+        return lambda redis_session: redis_session.register_script(RELEASE_LOCK_SCRIPT)(
+            keys=[lock_key], args=[token]
+        )
+
+    def _invalidate_operation(
+        self, keys: tuple[str, ...], tags: list[str] | None
+    ) -> Callable[[Any], Any]:
+        return lambda redis_session: redis_session.register_script(INVALIDATE_SCRIPT)(
+            keys=[self.build_tag_key(tag) for tag in tags or []],
+            args=[CACHE_INVALIDATION_CHANNEL, INSTANCE_ID, *keys],
+        )
+
+    def _evict_removed(self, removed_keys: Any):
+        if removed_keys is UNAVAILABLE:
+            # NOTE: tagged keys are unknown here, drop every local copy instead
+            self.local_cache.clear()
+            return
+
+        self.local_cache.delete(*(removed_key.decode() for removed_key in removed_keys))
+
+    def _allow_request(self) -> bool:
+        return bool(self.redis_session) and get_redis_breaker().allow_request()
+
+    @staticmethod
+    def _record_success():
+        get_redis_breaker().record_success()
+
+    @staticmethod
+    def _record_error(e: Exception, action: str):
+        breaker: CircuitBreaker = get_redis_breaker()
+        if isinstance(e, (ConnectionError, TimeoutError)):
+            breaker.record_failure()
+            logger.warning(f"Can't {action}, redis unreachable: {e}")
+            return
+
+        # NOTE: redis answered, so it does not count against the breaker
+        breaker.record_success()
+        logger.error(f"Can't {action}: {e}")
+
+
+class CacheEntry:
+    """A cached response body and the wall clock time until which it is fresh.
+
+    The body is the final JSON sent to clients, so a hit costs no decoding,
+    validation or re-encoding. version is the updated_at of the cached data, if known,
+    etag a hash of the uncompressed body computed once when it is encoded.
+    Stored as "<fresh_until>:<content encoding>:<version>:<etag>:<body>".
+    The redis ttl of an entry is its fresh duration plus the stale duration,
+    so stale entries stay readable until the hard expiry.
+    """
+
+    def __init__(
+        self,
+        body: bytes,
+        fresh_until: float,
+        content_encoding: str = "identity",
+        version: float | None = None,
+        etag: str = "",
+    ):
+        self.body = body
+        self.fresh_until = fresh_until
+        self.content_encoding = content_encoding
+        self.version = version
+        self.etag = etag
+
+    def is_stale(self) -> bool:
+        return self.fresh_until < time.time()
+
+    def decoded_body(self) -> bytes:
+        if self.content_encoding == "gzip":
+            return gzip.decompress(self.body)
+        return self.body
+
+    def dumps(self) -> bytes:
+        version: str = "" if self.version is None else repr(self.version)
+        header: str = (
+            f"{self.fresh_until:.3f}:{self.content_encoding}:{version}:{self.etag}:"
+        )
+        return header.encode() + self.body
+
+    @staticmethod
+    def loads(payload: bytes) -> "CacheEntry | None":
+        try:
+            fresh_until, content_encoding, version, etag, body = payload.split(b":", 4)
+            if not etag.isalnum():
+                raise ValueError("invalid etag")
+            return CacheEntry(
+                body,
+                float(fresh_until),
+                content_encoding.decode(),
+                float(version) if version else None,
+                etag.decode(),
+            )
+        except ValueError:
+            # NOTE: values written in an older format are treated as misses
+            return None
+
+    @staticmethod
+    def encode(
+        value: Any,
+        fresh_until: float,
+        compress_min_bytes: int = 0,
+        version: float | None = None,
+    ):
+        body: bytes = orjson.dumps(value, default=_json_default)
+        etag: str = hashlib.blake2b(body, digest_size=16).hexdigest()
+        if compress_min_bytes and len(body) >= compress_min_bytes:
+            return CacheEntry(
+                gzip.compress(body, compresslevel=5, mtime=0),
+                fresh_until,
+                "gzip",
+                version,
+                etag,
+            )
+        return CacheEntry(body, fresh_until, version=version, etag=etag)
+
+
+def _json_default(obj):
+    # NOTE: same representation as FastAPI's response serialization
+    if isinstance(obj, Decimal):
+        return str(obj)
+
+    # Handle Pydantic/SQLModel (recurses automatically)
+    if hasattr(obj, "model_dump"):
+        return obj.model_dump()
+
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+class CacheTag:
+    """Builds the tags that describe what a cache entry depends on.
+
+    A write invalidates the tags of the rows it touched, which removes every cache
+    entry registered under them no matter which resource the entry belongs to.
+    """
+
+    @staticmethod
+    def resource(resource_type: RedisResourceKey) -> str:
+        return f"resource:{resource_type.value}"
+
+    @staticmethod
+    def entity(resource_type: RedisResourceKey, obj_id: int) -> str:
+        return f"{resource_type.value}:{obj_id}"
+
+    @staticmethod
+    def exercise(exercise_id: int) -> str:
+        return f"exercise:{exercise_id}"
+
+    @staticmethod
+    def day(day: date) -> str:
+        return f"day:{day.isoformat()}"
+
+    @staticmethod
+    def week(day: date) -> str:
+        iso_year, iso_week, _ = day.isocalendar()
+        return f"week:{iso_year}-W{iso_week:02d}"
+
+    @staticmethod
+    def month(day: date) -> str:
+        return f"month:{day.year}-{day.month:02d}"
+
+    @staticmethod
+    def year(year: int) -> str:
+        return f"year:{year}"
+
+    @staticmethod
+    def periods(day: date) -> list[str]:
+        """Returns the day, week, month and year buckets a day belongs to."""
+        return [
+            CacheTag.day(day),
+            CacheTag.week(day),
+            CacheTag.month(day),
+            CacheTag.year(day.year),
+        ]
+
+
+@lru_cache
+def get_local_cache() -> LocalCache:
+    settings = get_settings()
+    return LocalCache(
+        max_entries=settings.CACHE_LOCAL_MAX_ENTRIES, ttl=settings.CACHE_LOCAL_TTL
+    )
+
+
+@lru_cache
+def get_redis_breaker() -> CircuitBreaker:
+    settings = get_settings()
+    return CircuitBreaker(
+        "redis",
+        failure_threshold=settings.REDIS_BREAKER_FAILURE_THRESHOLD,
+        reset_timeout=settings.REDIS_BREAKER_RESET_TIMEOUT,
+        max_reset_timeout=settings.REDIS_BREAKER_MAX_RESET_TIMEOUT,
+    )
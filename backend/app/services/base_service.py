@@ -1,6 +1,8 @@
 from abc import ABC
 from typing import Any
 from app.database.base_repository import BaseRepository
+from app.dependencies import after_commit
+from app.services.base_redis_service import CacheEntry, CacheTag
 from app.services.redis_service import RedisService
 from sqlmodel import Session
 from app.routers.mappers.base_mapper import BaseResponseMapper
@@ -23,46 +25,162 @@ class BaseService(ABC):
         self.redis_key = redis_key
 
     def get_all(self):
-        cache_value = self.redis_service.get_value(self.redis_key)
-        if cache_value:
-            return cache_value
-
-        query_list = self.repository.get_all(session=self.db_session)
-        results = self.mapper.map_list_to_response(query_list)
-
-        self.redis_service.cache_value(self.redis_key, results)
-
-        return results
+        return self.redis_service.get_or_load(
+            self.redis_key,
+            self._load_all,
+            self.db_session,
+            tags=self.get_cache_tags,
+            version=self.get_list_version,
+        )
 
     def get_one(self, obj_id: int):
-        result = self.repository.get_by_id(self.db_session, obj_id)
+        return self.redis_service.get_or_load(
+            self.get_entity_key(obj_id),
+            lambda db_session: self._load_one(db_session, obj_id),
+            self.db_session,
+            tags=self.get_entity_cache_tags,
+            version=self.get_version,
+        )
+
+    def get_many(self, obj_ids: list[int]) -> dict[int, CacheEntry]:
+        """Cached entries of many objects, keyed by id, ids not found are left out.
+
+        Cached entries are fetched with a single MGET, the ids missing or stale are
+        loaded with a single query and cached under their own key.
+        """
+        keys: dict[int, str] = self._entity_keys(obj_ids)
+        entries = self._fresh_entries(
+            keys, self.redis_service.get_entries(list(keys.values()))
+        )
+
+        missing_ids: list[int] = [obj_id for obj_id in keys if obj_id not in entries]
+        if missing_ids:
+            for obj_id, response in self._load_many(
+                self.db_session, missing_ids
+            ).items():
+                entries[obj_id] = self.redis_service.cache_value(
+                    keys[obj_id],
+                    response,
+                    tags=self.get_entity_cache_tags(response),
+                    version=self.get_version(response),
+                )
+
+        return {obj_id: entries[obj_id] for obj_id in obj_ids if obj_id in entries}
+
+    def _load_all(self, db_session: Session):
+        return self.mapper.map_list_to_response(
+            self.repository.get_all(session=db_session)
+        )
+
+    def _load_one(self, db_session: Session, obj_id: int):
+        result = self.repository.get_by_id(db_session, obj_id)
 
         if not result:
             raise HTTPException(status_code=404, detail="Not found")
 
         return self.mapper.transform_to_response(result)
 
+    def _load_many(self, db_session: Session, obj_ids: list[int]) -> dict[int, Any]:
+        return {
+            result.id: self.mapper.transform_to_response(result)
+            for result in self.repository.get_by_ids(db_session, obj_ids)
+        }
+
+    def _entity_keys(self, obj_ids: list[int]) -> dict[int, str]:
+        return {obj_id: self.get_entity_key(obj_id) for obj_id in obj_ids}
+
+    @staticmethod
+    def _fresh_entries(
+        keys: dict[int, str], cached_entries: dict[str, CacheEntry]
+    ) -> dict[int, CacheEntry]:
+        # NOTE: stale entries are loaded again along with the missing ones
+        entries: dict[int, CacheEntry] = {}
+        for obj_id, key in keys.items():
+            entry = cached_entries.get(key)
+            if entry and not entry.is_stale():
+                entries[obj_id] = entry
+        return entries
+
     def create(self, input_data: Any):
         result = self.repository.create(self.db_session, input_data)
 
         # remove cache
-        self.redis_service.remove_cache(self.redis_key)
+        self.invalidate_cache(self.get_invalidation_tags(result))
 
         return self.mapper.transform_to_response(result)
 
     def update(self, obj_id: int, input_data: Any):
+        # NOTE: tags are collected before the update as well, entries built from
+        # the previous state of the object have to go too
+        previous_tags = self.get_invalidation_tags(
+            self.repository.get_by_id(self.db_session, obj_id)
+        )
         updated_result = self.repository.update(self.db_session, obj_id, input_data)
 
         if updated_result:
             # remove cache
-            self.redis_service.remove_cache(self.redis_key)
+            self.invalidate_cache(
+                previous_tags + self.get_invalidation_tags(updated_result)
+            )
             return self.mapper.transform_to_response(updated_result)
 
         return None
 
     def delete(self, obj_id: int):
+        tags = self.get_invalidation_tags(
+            self.repository.get_by_id(self.db_session, obj_id)
+        )
         self.repository.remove_by_id(self.db_session, obj_id)
         # remove cache
-        self.redis_service.remove_cache(self.redis_key)
+        self.invalidate_cache(tags)
 
         return True
+
+    def invalidate_cache(self, tags: list[str]):
+        # own list key and every entry depending on the written object, in one call
+        key: str = self.redis_service.resolve_key(self.redis_key)
+        tags = list(set(tags))
+        # NOTE: once committed, a reader in between would cache the former rows again
+        after_commit(
+            self.db_session, lambda: self.redis_service.invalidate(key, tags=tags)
+        )
+
+    def get_cache_tags(self, results: list[Any]) -> list[str]:
+        """Tags of the cached list, override to add what the list depends on."""
+        return [CacheTag.resource(self.redis_key)]
+
+    def get_entity_cache_tags(self, result: Any) -> list[str]:
+        """Tags of a single cached object, the ones of a list holding only it.
+
+        The resource tag is left out so creating another object keeps it cached.
+        """
+        return [CacheTag.entity(self.redis_key, result.id)] + [
+            tag
+            for tag in self.get_cache_tags([result])
+            if tag != CacheTag.resource(self.redis_key)
+        ]
+
+    def get_invalidation_tags(self, obj: Any) -> list[str]:
+        """Tags invalidated when obj is written, override to add related resources."""
+        tags = [CacheTag.resource(self.redis_key)]
+        if obj:
+            tags.append(CacheTag.entity(self.redis_key, obj.id))
+        return tags
+
+    def get_entity_key(self, obj_id: int) -> str:
+        return self.redis_service.build_key(self.redis_key, "id", obj_id)
+
+    @staticmethod
+    def get_list_version(results: list[Any]) -> float | None:
+        # NOTE: sent as Last-Modified, the etag also covers removed and nested rows
+        return max(
+            filter(None, (BaseService.get_version(result) for result in results)),
+            default=None,
+        )
+
+    @staticmethod
+    def get_version(result: Any) -> float | None:
+        # NOTE: the cached copy of an object is as recent as its updated_at
+        return getattr(result, "updated_at", None) or getattr(
+            result, "created_at", None
+        )
@@ -0,0 +1,115 @@
+from enum import Enum
+from loguru import logger
+from threading import Lock
+import time
+
+
+class CircuitState(Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """Stops calling a failing dependency until a probe shows it is back.
+
+    Closed: every call goes through, failure_threshold consecutive failures open it.
+    Open: calls are skipped until the reset timeout elapsed, then a single probe
+    call is let through (half open). A successful probe closes the breaker, a failed
+    one opens it again with the reset timeout doubled, up to max_reset_timeout.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int,
+        reset_timeout: float,
+        max_reset_timeout: float,
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.max_reset_timeout = max_reset_timeout
+        self._lock = Lock()
+        self._state: CircuitState = CircuitState.CLOSED
+        self._consecutive_failures: int = 0
+        self._current_reset_timeout: float = reset_timeout
+        self._opened_at: float = 0
+        self._probe_in_flight: bool = False
+        self._trips: int = 0
+        self._rejected_calls: int = 0
+
+    def allow_request(self) -> bool:
+        with self._lock:
+            if self._state == CircuitState.CLOSED:
+                return True
+
+            if self._state == CircuitState.OPEN:
+                if time.monotonic() - self._opened_at >= self._current_reset_timeout:
+                    self._state = CircuitState.HALF_OPEN
+                    logger.info(f"Circuit breaker {self.name} half open, probing")
+                else:
+                    self._rejected_calls += 1
+                    return False
+
+            # NOTE: half open, a single probe at a time
+            if self._probe_in_flight:
+                self._rejected_calls += 1
+                return False
+            self._probe_in_flight = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self._consecutive_failures = 0
+            self._probe_in_flight = False
+            if self._state != CircuitState.CLOSED:
+                self._state = CircuitState.CLOSED
+                self._current_reset_timeout = self.reset_timeout
+                logger.info(f"Circuit breaker {self.name} closed")
+
+    def record_failure(self):
+        with self._lock:
+            self._consecutive_failures += 1
+            self._probe_in_flight = False
+
+            if self._state == CircuitState.HALF_OPEN:
+                self._current_reset_timeout = min(
+                    self._current_reset_timeout * 2, self.max_reset_timeout
+                )
+                self._open()
+            elif (
+                self._state == CircuitState.CLOSED
+                and self._consecutive_failures >= self.failure_threshold
+            ):
+                self._open()
+
+    def _open(self):
+        self._state = CircuitState.OPEN
+        self._opened_at = time.monotonic()
+        self._trips += 1
+        logger.warning(
+            f"Circuit breaker {self.name} open after {self._consecutive_failures} "
+            f"consecutive failures, retrying in {self._current_reset_timeout}s"
+        )
+
+    @property
+    def state(self) -> CircuitState:
+        with self._lock:
+            return self._state
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            retry_in = 0.0
+            if self._state == CircuitState.OPEN:
+                retry_in = max(
+                    self._current_reset_timeout - (time.monotonic() - self._opened_at),
+                    0.0,
+                )
+            return {
+                "state": self._state.value,
+                "consecutive_failures": self._consecutive_failures,
+                "trips": self._trips,
+                "rejected_calls": self._rejected_calls,
+                "retry_in": retry_in,
+            }
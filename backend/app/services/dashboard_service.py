@@ -1,11 +1,27 @@
 from app.services.redis_service import get_redis_service
 from app.services.redis_service import RedisService
-from fastapi import Depends
-from app.database.dashboard_repository import DashboardRepository
-from app.dependencies import get_db
+from app.services.async_redis_service import (
+    AsyncRedisService,
+    get_async_redis_service,
+)
+from fastapi import Depends, HTTPException
+from app.database.dashboard_repository import DashboardRepository, GRANULARITY_STEPS
+from app.dependencies import get_async_db, get_db
 from sqlmodel import Session
-from app.routers.mappers.dashboard_mapper import ReportMapper
-from app.services.redis_service import RedisResourceKey
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.routers.mappers.dashboard_mapper import GRANULARITY, METRIC, ReportMapper
+from app.services.base_redis_service import CacheEntry, CacheTag, RedisResourceKey
+from datetime import date, datetime, timedelta
+from typing import Any, Callable
+from zoneinfo import ZoneInfo
+
+import orjson
+
+# 30 days, a change of time zone drops the zone right away
+ZONE_DURATION: int = 2592000
+
+# key, loader, duration and tags of a cached report
+Report = tuple[str, Callable[[Session], Any], int, list[str]]
 
 
 class DashboardService:
@@ -23,71 +39,217 @@ class DashboardService:
         self.mapper = mapper
         self.redis_key = redis_key
 
-        # store each key by year and day
-        # TODO: kill this key
-        self.year_dashboard_redis_key = f"{self.redis_key}/{{year}}"
-        self.day_dashboard_redis_key = f"{self.redis_key}/{{day}}"
-        self.week_dashboard_redis_key = f"{self.redis_key}/{{start_date}}/{{end_date}}"
+        # periods that are over rarely change, the current one changes on every workout
+        # 30 days
+        self.closed_period_duration: int = 2592000
+        # 5 minutes
+        self.open_period_duration: int = 300
+        # a year of days, or more than a century of any other bucket
+        self.max_series_buckets: int = 366
 
-    def get_a_glance(self):
-        cache_value = self.redis_service.get_value(self.redis_key)
-        if cache_value:
-            return cache_value
+    def _period_duration(self, period_end: date, user_timezone: ZoneInfo) -> int:
+        """Returns the cache duration of a period ending (exclusive) at period_end."""
+        today = datetime.now(user_timezone).date()
+        if period_end <= today:
+            return self.closed_period_duration
+        return self.open_period_duration
 
-        results = self.repository.get_glance(self.db_session)
-        result_response = self.mapper.map_glance_response(results)
+    def get_zone(self) -> tuple[ZoneInfo, str]:
+        """Returns the time zone dashboards are bucketed in and the scope of their keys.
 
-        if results:
-            self.redis_service.cache_value(self.redis_key, result_response)
+        The scope holds the zone and the generation of the user's settings. A change
+        of time zone drops the cached zone, so every dashboard is then built under new
+        keys while the former ones expire on their own.
+        """
+        entry = self.redis_service.get_or_load(
+            self.build_zone_key(),
+            self.repository.get_zone,
+            self.db_session,
+            duration=ZONE_DURATION,
+        )
+        return self.parse_zone(entry)
+
+    @staticmethod
+    def parse_zone(entry: CacheEntry) -> tuple[ZoneInfo, str]:
+        zone: dict = orjson.loads(entry.decoded_body())
+        return ZoneInfo(zone["timezone"]), f"{zone['timezone']}@{zone['generation']}"
 
-        return result_response
+    @staticmethod
+    def build_zone_key(user_id: int = None) -> str:
+        return RedisService.build_key(
+            RedisResourceKey.DASHBOARDS, "zone", user_id=user_id
+        )
+
+    def get_a_glance(self):
+        return self._get_report(*self._glance_report(*self.get_zone()))
 
     def get_total_weight_by_year(self, year: int):
-        redis_key: str = self.year_dashboard_redis_key.format(year=year)
-        cache_value = self.redis_service.get_value(redis_key)
-        if cache_value:
-            return cache_value
+        return self._get_report(*self._year_report(year, *self.get_zone()))
 
-        results = self.repository.get_total_weight_by_year(self.db_session, year)
-        result_response = self.mapper.map_to_year_response(results)
+    def get_total_weight_by_week(self, start_date: str, end_date: str):
+        return self._get_report(
+            *self._week_report(start_date, end_date, *self.get_zone())
+        )
 
-        if results:
-            self.redis_service.cache_value(redis_key, result_response)
+    def get_total_weight_by_day(self, day: str):
+        return self._get_report(*self._day_report(day, *self.get_zone()))
 
-        return result_response
+    def get_series(
+        self,
+        start_date: str,
+        end_date: str,
+        granularity: GRANULARITY,
+        metric: METRIC,
+        exercise_id: int | None = None,
+    ):
+        """Returns a metric per bucket between two inclusive YYYY-MM-DD local dates."""
+        return self._get_report(
+            *self._series_report(
+                start_date,
+                end_date,
+                granularity,
+                metric,
+                exercise_id,
+                *self.get_zone(),
+            )
+        )
 
-    def get_total_weight_by_week(self, start_date: str, end_date: str):
-        redis_key: str = self.week_dashboard_redis_key.format(
-            start_date=start_date, end_date=end_date
+    def _get_report(
+        self,
+        key: str,
+        loader: Callable[[Session], Any],
+        duration: int,
+        tags: list[str],
+    ):
+        return self.redis_service.get_or_load(
+            key, loader, self.db_session, duration=duration, tags=tags
         )
 
-        cache_value = self.redis_service.get_value(redis_key)
-        if cache_value:
-            return cache_value
+    # NOTE: the _*_report methods return the key, loader, duration and tags of a
+    # report, shared by the sync and async services
 
-        results = self.repository.get_total_weight_by_week(
-            self.db_session, start_date, end_date
+    def _glance_report(self, user_timezone: ZoneInfo, zone_scope: str) -> Report:
+        # NOTE: the glance summarises the latest sessions, any session write changes it
+        return (
+            self.redis_service.build_key(self.redis_key, "glance", zone_scope),
+            lambda db_session: self.mapper.map_glance_response(
+                self.repository.get_glance(db_session, user_timezone)
+            ),
+            self.open_period_duration,
+            [CacheTag.resource(RedisResourceKey.WORKOUT_SESSION)],
         )
-        result_response = self.mapper.map_to_weekly_response(results)
 
-        if results:
-            self.redis_service.cache_value(redis_key, result_response)
+    def _year_report(
+        self, year: int, user_timezone: ZoneInfo, zone_scope: str
+    ) -> Report:
+        return (
+            self.redis_service.build_key(self.redis_key, "year", year, zone_scope),
+            lambda db_session: self.mapper.map_to_year_response(
+                self.repository.get_total_weight_by_year(db_session, year)
+            ),
+            self._period_duration(date(year + 1, 1, 1), user_timezone),
+            [CacheTag.year(year)],
+        )
 
-        return result_response
+    def _week_report(
+        self, start_date: str, end_date: str, user_timezone: ZoneInfo, zone_scope: str
+    ) -> Report:
+        # the last reported week ends on the monday after end_date
+        start_date_obj = datetime.strptime(start_date, "%Y-%m-%d").date()
+        end_date_obj = datetime.strptime(end_date, "%Y-%m-%d").date()
+        period_end = end_date_obj + timedelta(days=7 - end_date_obj.weekday())
+        week_tags: list[str] = [
+            CacheTag.week(start_date_obj + timedelta(weeks=week))
+            for week in range((period_end - start_date_obj).days // 7 + 1)
+        ]
 
-    def get_total_weight_by_day(self, day: str):
-        redis_key: str = self.day_dashboard_redis_key.format(day=day)
-        cache_value = self.redis_service.get_value(redis_key)
-        if cache_value:
-            return cache_value
+        return (
+            self.redis_service.build_key(
+                self.redis_key, "week", start_date, end_date, zone_scope
+            ),
+            lambda db_session: self.mapper.map_to_weekly_response(
+                self.repository.get_total_weight_by_week(
+                    db_session, start_date, end_date
+                )
+            ),
+            self._period_duration(period_end, user_timezone),
+            week_tags,
+        )
+
+    def _day_report(self, day: str, user_timezone: ZoneInfo, zone_scope: str) -> Report:
+        # NOTE: an empty day is still a valid answer worth caching
+        day_obj = datetime.strptime(day, "%Y-%m-%d").date()
+        return (
+            self.redis_service.build_key(self.redis_key, "day", day, zone_scope),
+            lambda db_session: self.mapper.transform_to_day_response(
+                self.repository.get_total_weight_by_day(db_session, day)
+            ),
+            self._period_duration(day_obj + timedelta(days=1), user_timezone),
+            [CacheTag.day(day_obj)],
+        )
 
-        results = self.repository.get_total_weight_by_day(self.db_session, day)
-        result_response = self.mapper.transform_to_day_response(results)
+    def _series_report(
+        self,
+        start_date: str,
+        end_date: str,
+        granularity: GRANULARITY,
+        metric: METRIC,
+        exercise_id: int | None,
+        user_timezone: ZoneInfo,
+        zone_scope: str,
+    ) -> Report:
+        try:
+            start_date_obj = datetime.strptime(start_date, "%Y-%m-%d").date()
+            end_date_obj = datetime.strptime(end_date, "%Y-%m-%d").date()
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Dates must be YYYY-MM-DD")
+        if start_date_obj > end_date_obj:
+            raise HTTPException(status_code=400, detail="from must not be after to")
+
+        buckets = self.repository.get_buckets(granularity, start_date_obj, end_date_obj)
+        if len(buckets) > self.max_series_buckets:
+            raise HTTPException(
+                status_code=400,
+                detail=f"A series holds at most {self.max_series_buckets} buckets",
+            )
 
-        if results:
-            self.redis_service.cache_value(redis_key, result_response)
+        # a write invalidates the day, week, month and year of its sets
+        bucket_tag = {
+            GRANULARITY.DAY: CacheTag.day,
+            GRANULARITY.WEEK: CacheTag.week,
+            GRANULARITY.MONTH: CacheTag.month,
+            GRANULARITY.YEAR: lambda bucket: CacheTag.year(bucket.year),
+        }[granularity]
+        period_end = buckets[-1] + GRANULARITY_STEPS[granularity]
 
-        return result_response
+        return (
+            self.redis_service.build_key(
+                self.redis_key,
+                "series",
+                granularity.value,
+                metric.value,
+                start_date,
+                end_date,
+                exercise_id or "",
+                zone_scope,
+            ),
+            lambda db_session: self.mapper.map_to_series_response(
+                granularity,
+                metric,
+                exercise_id,
+                self.repository.get_series(
+                    db_session,
+                    granularity,
+                    metric,
+                    start_date_obj,
+                    end_date_obj,
+                    exercise_id,
+                    user_timezone,
+                ),
+            ),
+            self._period_duration(period_end, user_timezone),
+            [bucket_tag(bucket) for bucket in buckets],
+        )
 
 
 def get_dashboard_service(
@@ -103,3 +265,83 @@ def get_dashboard_service(
         mapper=mapper,
         redis_key=RedisResourceKey.DASHBOARDS,
     )
+
+
+class AsyncDashboardService(DashboardService):
+    """Dashboards for the async routes, same keys, tags and queries as the sync ones.
+
+    The sync repository and mapper run on the AsyncSession through run_sync.
+    """
+
+    redis_service: AsyncRedisService
+    db_session: AsyncSession
+
+    async def get_zone(self) -> tuple[ZoneInfo, str]:
+        entry = await self.redis_service.get_or_load(
+            self.build_zone_key(),
+            lambda db_session: db_session.run_sync(self.repository.get_zone),
+            self.db_session,
+            duration=ZONE_DURATION,
+        )
+        return self.parse_zone(entry)
+
+    async def get_a_glance(self):
+        return await self._get_report(*self._glance_report(*await self.get_zone()))
+
+    async def get_total_weight_by_year(self, year: int):
+        return await self._get_report(*self._year_report(year, *await self.get_zone()))
+
+    async def get_total_weight_by_week(self, start_date: str, end_date: str):
+        return await self._get_report(
+            *self._week_report(start_date, end_date, *await self.get_zone())
+        )
+
+    async def get_total_weight_by_day(self, day: str):
+        return await self._get_report(*self._day_report(day, *await self.get_zone()))
+
+    async def get_series(
+        self,
+        start_date: str,
+        end_date: str,
+        granularity: GRANULARITY,
+        metric: METRIC,
+        exercise_id: int | None = None,
+    ):
+        return await self._get_report(
+            *self._series_report(
+                start_date,
+                end_date,
+                granularity,
+                metric,
+                exercise_id,
+                *await self.get_zone(),
+            )
+        )
+
+    async def _get_report(
+        self,
+        key: str,
+        loader: Callable[[Session], Any],
+        duration: int,
+        tags: list[str],
+    ):
+        return await self.redis_service.get_or_load(
+            key,
+            lambda db_session: db_session.run_sync(loader),
+            self.db_session,
+            duration=duration,
+            tags=tags,
+        )
+
+
+async def get_async_dashboard_service(
+    redis_service: AsyncRedisService = Depends(get_async_redis_service),
+    session: AsyncSession = Depends(get_async_db),
+):
+    return AsyncDashboardService(
+        redis_service=redis_service,
+        repository=DashboardRepository(),
+        db_session=session,
+        mapper=ReportMapper(),
+        redis_key=RedisResourceKey.DASHBOARDS,
+    )
@@ -1,14 +1,19 @@
+from app.services.async_base_service import AsyncBaseService
+from app.services.async_redis_service import (
+    AsyncRedisService,
+    get_async_redis_service,
+)
 from app.services.base_service import BaseService
 from app.database.exercise_repository import ExerciseRepository
 from app.routers.mappers.exercises_mapper import ExerciseMapper
 from fastapi import Depends
-from app.dependencies import get_db
-from app.services.redis_service import (
-    RedisService,
-    RedisResourceKey,
-    get_redis_service,
-)
+from app.dependencies import get_async_db, get_db
+from app.services.base_redis_service import CacheTag, RedisResourceKey
+from app.services.redis_service import RedisService, get_redis_service
 from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.database.models import Exercise
+from app.routers.schemas.response_schemas import ExerciseResponse
 
 
 class ExerciseService(BaseService):
@@ -28,6 +33,18 @@ class ExerciseService(BaseService):
             redis_key=redis_key,
         )
 
+    def get_cache_tags(self, exercises: list[ExerciseResponse]) -> list[str]:
+        return super().get_cache_tags(exercises) + [
+            CacheTag.exercise(exercise.id) for exercise in exercises
+        ]
+
+    def get_invalidation_tags(self, exercise: Exercise | None) -> list[str]:
+        tags = super().get_invalidation_tags(exercise)
+        if exercise:
+            # routines and sessions display the exercise too
+            tags.append(CacheTag.exercise(exercise.id))
+        return tags
+
 
 def get_exercise_service(
     redis_service: RedisService = Depends(get_redis_service),
@@ -42,3 +59,21 @@ def get_exercise_service(
         mapper=mapper,
         redis_key=RedisResourceKey.EXERCISES,
     )
+
+
+class AsyncExerciseService(AsyncBaseService, ExerciseService):
+    pass
+
+
+# NOTE: async, sync dependencies would each take a trip through the threadpool
+async def get_async_exercise_service(
+    redis_service: AsyncRedisService = Depends(get_async_redis_service),
+    session: AsyncSession = Depends(get_async_db),
+):
+    return AsyncExerciseService(
+        redis_service=redis_service,
+        repository=ExerciseRepository(),
+        db_session=session,
+        mapper=ExerciseMapper(),
+        redis_key=RedisResourceKey.EXERCISES,
+    )
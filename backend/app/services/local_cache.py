@@ -0,0 +1,89 @@
+from collections import OrderedDict
+from threading import Lock
+from typing import Any
+import time
+
+
+class TierStats:
+    """Thread safe hit/miss counters of a single cache tier."""
+
+    def __init__(self):
+        self._lock = Lock()
+        self.hits: int = 0
+        self.misses: int = 0
+
+    def hit(self):
+        with self._lock:
+            self.hits += 1
+
+    def miss(self):
+        with self._lock:
+            self.misses += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses}
+
+
+class LocalCache:
+    """Bounded in-process LRU cache whose entries also expire after a TTL.
+
+    Routes run in the anyio threadpool, so every access goes through a lock.
+    Entries are evicted in least recently used order once max_entries is reached.
+    """
+
+    def __init__(self, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.stats = TierStats()
+        self._lock = Lock()
+        # key -> (expires_at, value)
+        self._entries: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+
+    def get(self, key: str):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.stats.miss()
+                return None
+
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                self.stats.miss()
+                return None
+
+            self._entries.move_to_end(key)
+            self.stats.hit()
+            return value
+
+    def set(self, key: str, value: Any, ttl: float | None = None):
+        if self.max_entries <= 0:
+            return
+
+        # NOTE: never keep an entry longer than the local ttl so a lost
+        # invalidation message can only serve stale data for a short time
+        duration = min(ttl, self.ttl) if ttl else self.ttl
+        with self._lock:
+            self._entries[key] = (time.monotonic() + duration, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, *keys: str):
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            size = len(self._entries)
+        return {
+            **self.stats.snapshot(),
+            "size": size,
+            "max_entries": self.max_entries,
+        }
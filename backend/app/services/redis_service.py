@@ -1,110 +1,406 @@
 from fastapi import Depends
-from decimal import Decimal
-from enum import Enum
-from redis import Redis
+from loguru import logger
+from redis import ConnectionPool, Redis
+from concurrent.futures import ThreadPoolExecutor
+from sqlmodel import Session
+from threading import Event, Lock, Thread
+from typing import Any, Callable
 import json
+import orjson
 import os
+import time
+import uuid
 
+from app.dependencies import Settings, db_session_scope, get_settings
+from app.services.base_redis_service import (
+    CACHE_INVALIDATION_CHANNEL,
+    INSTANCE_ID,
+    UNAVAILABLE,
+    BaseRedisService,
+    CacheEntry,
+    RedisResourceKey,
+    get_local_cache,
+    get_redis_breaker,
+    redis_stats,
+)
+from app.services.local_cache import LocalCache
+from app.services.single_flight import SingleFlight
 
-class RedisResourceKey(Enum):
-    EXERCISES = "exercises"
-    WORKOUT_SESSION = "workout_sessions"
-    DASHBOARDS = "dashboards"
-    ROUTINES = "routines"
+# coalesces concurrent rebuilds of the same key within this worker
+_single_flight = SingleFlight()
 
+# stale entries are rebuilt off the request path, one refresh per key at a time
+_refresh_executor = ThreadPoolExecutor(
+    max_workers=2, thread_name_prefix="cache-refresh"
+)
+_refreshing_keys: set[str] = set()
+_refreshing_lock = Lock()
 
-class RedisService:
-    def __init__(self, redis_session: Redis | None):
-        self.redis_session: Redis | None = redis_session
-        # 2 hours
-        self.key_duration: int = 7200
 
-    def get_value(self, resource_type: RedisResourceKey, user_id: int = None):
-        if self.redis_session and resource_type:
-            try:
-                key: str = f"{resource_type.value}/{user_id if user_id else 1}"
-                value_str = self.redis_session.get(key)
-                if value_str:
-                    return json.loads(value_str)
-            except Exception:
-                # NOTE: Do logging here
-                print("Redis may be failed or empty")
-                pass
+class RedisService(BaseRedisService):
+    redis_session: Redis | None
 
-        return None
+    def get_value(self, resource_type: RedisResourceKey | str, user_id: int = None):
+        # NOTE: returns stale values too, get_or_load decides what to do with them
+        entry = self.get_entry(self.resolve_key(resource_type, user_id))
+        return orjson.loads(entry.decoded_body()) if entry else None
+
+    def get_entry(self, key: str) -> CacheEntry | None:
+        entry = self.local_cache.get(key)
+        if entry is not None:
+            return entry
+
+        payload = self._execute(
+            lambda redis_session: redis_session.get(key), "read cache"
+        )
+        return self._read_payload(key, payload)
+
+    def get_entries(self, keys: list[str]) -> dict[str, CacheEntry]:
+        """Returns the entries found for keys, with a single MGET for the keys
+        missing from the local tier.
+        """
+        entries, missing_keys = self._split_local(keys)
+        if not missing_keys:
+            return entries
+
+        payloads = self._execute(
+            lambda redis_session: redis_session.mget(missing_keys), "read cache"
+        )
+        return self._read_payloads(missing_keys, payloads, entries)
 
     def cache_value(
         self,
-        resource_type: RedisResourceKey,
+        resource_type: RedisResourceKey | str,
         value: list | object | str,
         user_id: int = None,
+        duration: int | None = None,
+        tags: list[str] | None = None,
+        version: float | None = None,
+    ) -> CacheEntry:
+        """Encodes value into the final response body and caches it.
+
+        The encoded entry is returned even when redis is unavailable, so callers
+        can always respond with it. version is the updated_at of the cached data.
+        """
+        entry, hard_duration = self._encode_entry(value, duration, version)
+        key: str = self.resolve_key(resource_type, user_id)
+        stored = self._execute(
+            self._store_operation(key, entry, hard_duration, tags), "cache value"
+        )
+        self._keep_stored(key, entry, hard_duration, stored)
+        return entry
+
+    def get_or_load(
+        self,
+        resource_type: RedisResourceKey | str,
+        loader: Callable[[Session], Any],
+        db_session: Session,
+        duration: int | None = None,
+        tags: list[str] | Callable[[Any], list[str]] | None = None,
+        version: Callable[[Any], float | None] | None = None,
     ):
-        def custom_json_serializer(obj):
-            if isinstance(obj, Decimal):
-                return float(obj)
+        """Returns the cached value of a key, or builds and caches it with loader.
+
+        Past its fresh duration a value is still returned right away while a
+        background refresh rebuilds it with its own database session, so callers
+        never wait for a rebuild as long as a stale copy exists.
+
+        Concurrent misses are coalesced: callers of the same worker share one
+        in-flight load and a short redis lock lets a single worker rebuild the key
+        while the others wait for its result.
+
+        tags and version may be callables, they are computed from the loaded value.
+        """
+        key: str = self.resolve_key(resource_type)
+        entry = self.get_entry(key)
+        if entry:
+            if entry.is_stale():
+                self._refresh_in_background(key, loader, duration, tags, version)
+            return entry
 
-            # 2. Handle Pydantic/SQLModel (recurses automatically)
-            if hasattr(obj, "model_dump"):
-                return obj.model_dump()
+        return _single_flight.do(
+            key,
+            lambda: self._load_once(key, loader, db_session, duration, tags, version),
+        )
+
+    def _load_once(
+        self,
+        key: str,
+        loader: Callable[[Session], Any],
+        db_session: Session,
+        duration: int | None,
+        tags: list[str] | Callable[[Any], list[str]] | None,
+        version: Callable[[Any], float | None] | None,
+    ):
+        # a previous leader of this worker may have filled the key meanwhile
+        entry = self.get_entry(key)
+        if entry:
+            return entry
 
-            # 3. Handle older Pydantic v1
-            if hasattr(obj, "dict"):
-                return obj.dict()
+        lock_key: str = self.build_lock_key(key)
+        token: str = uuid.uuid4().hex
+        if not self._acquire_lock(lock_key, token):
+            entry = self._wait_for_entry(key, lock_key)
+            if entry:
+                return entry
+            # NOTE: the lock holder failed or is too slow, rebuild here instead
 
-            raise TypeError(
-                f"Object of type {type(obj).__name__} is not JSON serializable"
+        try:
+            return self._load_and_cache(
+                key, loader, db_session, duration, tags, version
             )
+        finally:
+            self._release_lock(lock_key, token)
 
-        if self.redis_session:
-            # maybe trigger background tasks here instead of waiting
-            # save response in 2 hours
+    def _load_and_cache(
+        self,
+        key: str,
+        loader: Callable[[Session], Any],
+        db_session: Session,
+        duration: int | None,
+        tags: list[str] | Callable[[Any], list[str]] | None,
+        version: Callable[[Any], float | None] | None,
+    ):
+        value = loader(db_session)
+        return self.cache_value(
+            key,
+            value,
+            duration=duration,
+            tags=tags(value) if callable(tags) else tags,
+            version=version(value) if version else None,
+        )
+
+    def _refresh_in_background(
+        self,
+        key: str,
+        loader: Callable[[Session], Any],
+        duration: int | None,
+        tags: list[str] | Callable[[Any], list[str]] | None,
+        version: Callable[[Any], float | None] | None,
+    ):
+        with _refreshing_lock:
+            if key in _refreshing_keys:
+                return
+            _refreshing_keys.add(key)
+
+        def refresh():
+            lock_key: str = self.build_lock_key(key)
+            token: str = uuid.uuid4().hex
             try:
-                key: str = f"{resource_type.value}/{user_id if user_id else 1}"
-                payload = json.dumps(value, default=custom_json_serializer)
-                self.redis_session.setex(
-                    key,
-                    self.key_duration,
-                    payload,
-                )
+                # another worker is already refreshing this key
+                if not self._acquire_lock(lock_key, token):
+                    return
+
+                try:
+                    # NOTE: the request session is closed once the response is sent
+                    with db_session_scope() as db_session:
+                        self._load_and_cache(
+                            key, loader, db_session, duration, tags, version
+                        )
+                finally:
+                    self._release_lock(lock_key, token)
             except Exception as e:
-                print("Can't cache_value")
-                print(e)
-                pass
+                # the stale value keeps being served until the next attempt
+                logger.warning(f"Can't refresh cache key {key}: {e}")
+            finally:
+                with _refreshing_lock:
+                    _refreshing_keys.discard(key)
 
-    def remove_cache(self, resource_type: RedisResourceKey, user_id: int = None):
-        if self.redis_session:
-            try:
-                key: str = f"{resource_type.value}/{user_id if user_id else 1}"
+        _refresh_executor.submit(refresh)
 
-                if not self.redis_session.get(key):
-                    # NOTE: add logger here to indicate no action
-                    return
+    def _acquire_lock(self, lock_key: str, token: str) -> bool:
+        acquired = self._execute(
+            self._acquire_lock_operation(lock_key, token), "acquire lock"
+        )
+        return self._is_lock_acquired(acquired)
+
+    def _wait_for_entry(self, key: str, lock_key: str) -> CacheEntry | None:
+        deadline: float = time.monotonic() + self.lock_wait_duration_ms / 1000
+        while time.monotonic() < deadline:
+            time.sleep(self.lock_poll_interval_ms / 1000)
+            entry = self.get_entry(key)
+            if entry:
+                return entry
+
+            exists = self._execute(
+                lambda redis_session: redis_session.exists(lock_key), "check lock"
+            )
+            if exists is UNAVAILABLE or not exists:
+                return None
+
+        return None
+
+    def _release_lock(self, lock_key: str, token: str):
+        self._execute(self._release_lock_operation(lock_key, token), "release lock")
 
-                self.redis_session.delete(key)
+    def remove_cache(self, resource_type: RedisResourceKey | str, user_id: int = None):
+        self.invalidate(self.resolve_key(resource_type, user_id))
+
+    def invalidate(self, *keys: str, tags: list[str] | None = None):
+        """Removes the given keys and every key tagged with one of tags.
+
+        Everything happens in a single script call, which also broadcasts the removed
+        keys so other workers drop their local copies.
+        """
+        removed_keys = self._execute(
+            self._invalidate_operation(keys, tags), "remove cache"
+        )
+        self._evict_removed(removed_keys)
+
+    def _execute(self, operation: Callable[[Redis], Any], action: str):
+        """Runs operation against redis through the circuit breaker.
+
+        Returns UNAVAILABLE without calling redis while the breaker is open, and
+        when the call fails, so callers fall back to the database right away.
+        """
+        if not self._allow_request():
+            return UNAVAILABLE
+
+        try:
+            result = operation(self.redis_session)
+        except Exception as e:
+            self._record_error(e, action)
+            return UNAVAILABLE
+
+        self._record_success()
+        return result
+
+
+class CacheInvalidationListener(Thread):
+    """Evicts local cache entries removed by other workers or nodes.
+
+    Each worker subscribes to the invalidation channel on its own pubsub connection.
+    Messages may be lost while disconnected, so the local tier is emptied on every
+    (re)subscribe.
+    """
+
+    def __init__(self, pool: ConnectionPool, local_cache: LocalCache):
+        super().__init__(name="cache-invalidation-listener", daemon=True)
+        self.pool = pool
+        self.local_cache = local_cache
+        self._stop_event = Event()
+
+    def run(self):
+        settings = get_settings()
+        retry_delay: float = settings.REDIS_BREAKER_RESET_TIMEOUT
+        while not self._stop_event.is_set():
+            pubsub = None
+            try:
+                pubsub = Redis(connection_pool=self.pool).pubsub(
+                    ignore_subscribe_messages=True
+                )
+                pubsub.subscribe(CACHE_INVALIDATION_CHANNEL)
+                self.local_cache.clear()
+                retry_delay = settings.REDIS_BREAKER_RESET_TIMEOUT
+
+                while not self._stop_event.is_set():
+                    message = pubsub.get_message(timeout=1.0)
+                    if message:
+                        self._handle_message(message["data"])
             except Exception as e:
-                print("Can't remove cache")
-                print(e)
-                pass
+                self.local_cache.clear()
+                logger.warning(
+                    f"Cache invalidation listener disconnected, retrying in {retry_delay}s: {e}"
+                )
+                self._stop_event.wait(retry_delay)
+                retry_delay = min(
+                    retry_delay * 2, settings.REDIS_BREAKER_MAX_RESET_TIMEOUT
+                )
+            finally:
+                if pubsub:
+                    pubsub.close()
 
+    def stop(self):
+        self._stop_event.set()
 
-def _get_redis():
-    session = None
-    try:
-        session = Redis(
-            host=os.getenv("REDIS_HOST", "localhost"),
-            port=os.getenv("REDIS_PORT", 6379),
-            db=os.getenv("REDIS_DATABASE_INDEX", 0),
-            decode_responses=True,
+    def _handle_message(self, data: bytes):
+        message: dict = json.loads(data)
+        if message.get("origin") == INSTANCE_ID:
+            return
+
+        self.local_cache.delete(*message.get("keys", []))
+
+
+# NOTE: one pool per worker process, created in the FastAPI lifespan
+_redis_pool: ConnectionPool | None = None
+_invalidation_listener: CacheInvalidationListener | None = None
+
+
+def init_redis_pool(settings: Settings) -> ConnectionPool:
+    global _redis_pool
+    if _redis_pool is None:
+        _redis_pool = ConnectionPool(
+            host=settings.REDIS_HOST,
+            port=settings.REDIS_PORT,
+            db=settings.REDIS_DATABASE_INDEX,
+            max_connections=settings.REDIS_MAX_CONNECTIONS,
+            socket_timeout=settings.REDIS_SOCKET_TIMEOUT,
+            socket_connect_timeout=settings.REDIS_SOCKET_CONNECT_TIMEOUT,
+            health_check_interval=settings.REDIS_HEALTH_CHECK_INTERVAL,
+            # NOTE: cached bodies are raw bytes, possibly gzip compressed
+            decode_responses=False,
         )
-        yield session
-    except Exception as e:
-        print("Cant connect to redis database")
-        print(e)
-        raise e
-    finally:
-        if session:
-            session.close()
+    return _redis_pool
+
+
+def close_redis_pool():
+    global _redis_pool
+    if _redis_pool is not None:
+        _redis_pool.disconnect()
+        _redis_pool = None
+
+
+def get_redis_pool_stats() -> dict:
+    if _redis_pool is None:
+        return {
+            "pid": os.getpid(),
+            "max_connections": 0,
+            "created_connections": 0,
+            "available_connections": 0,
+            "in_use_connections": 0,
+        }
+
+    return {
+        "pid": os.getpid(),
+        "max_connections": _redis_pool.max_connections,
+        "created_connections": _redis_pool._created_connections,
+        "available_connections": len(_redis_pool._available_connections),
+        "in_use_connections": len(_redis_pool._in_use_connections),
+    }
+
+
+def start_cache_invalidation_listener():
+    global _invalidation_listener
+    if _invalidation_listener is None:
+        _invalidation_listener = CacheInvalidationListener(
+            init_redis_pool(get_settings()), get_local_cache()
+        )
+        _invalidation_listener.start()
+
+
+def stop_cache_invalidation_listener():
+    global _invalidation_listener
+    if _invalidation_listener is not None:
+        _invalidation_listener.stop()
+        _invalidation_listener.join(timeout=2)
+        _invalidation_listener = None
+
+
+def get_cache_stats() -> dict:
+    return {
+        "pid": os.getpid(),
+        "local": get_local_cache().snapshot(),
+        "redis": redis_stats.snapshot(),
+        "breaker": get_redis_breaker().snapshot(),
+    }
+
+
+def _get_redis():
+    # NOTE: the client borrows a connection from the shared pool per command,
+    # so there is nothing to close at the end of a request
+    pool = init_redis_pool(get_settings())
+    return Redis(connection_pool=pool)
 
 
 def get_redis_service(redis_session=Depends(_get_redis)):
-    return RedisService(redis_session)
+    return RedisService(redis_session, get_local_cache())
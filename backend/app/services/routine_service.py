@@ -1,17 +1,25 @@
-from app.services.redis_service import RedisResourceKey
-from app.dependencies import get_db
+from app.services.base_redis_service import RedisResourceKey
+from app.dependencies import get_async_db, get_db
 from app.database.routine_repository import RoutineRepository
 from app.services.redis_service import get_redis_service
 from fastapi import Depends
 from app.routers.mappers.routines_mapper import RoutineMapper
 from app.database.base_repository import BaseRepository
+from app.services.base_redis_service import CacheTag
 from app.services.redis_service import RedisService
 from app.services.base_service import BaseService
+from app.services.async_base_service import AsyncBaseService
+from app.services.async_redis_service import (
+    AsyncRedisService,
+    get_async_redis_service,
+)
 from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.routers.schemas.response_schemas import RoutineResponse
 
 
 class RoutineService(BaseService):
-    def __int__(
+    def __init__(
         self,
         redis_service: RedisService,
         repository: BaseRepository,
@@ -27,6 +35,15 @@ class RoutineService(BaseService):
             redis_key=redis_key,
         )
 
+    def get_cache_tags(self, routines: list[RoutineResponse]) -> list[str]:
+        # personal bests and exercise names are part of each routine
+        return super().get_cache_tags(routines) + [
+            CacheTag.exercise(exercise.exercise_id)
+            for routine in routines
+            for exercise in routine.exercises or []
+            if exercise.exercise_id
+        ]
+
 
 def get_routine_service(
     redis_service: RedisService = Depends(get_redis_service),
@@ -41,3 +58,20 @@ def get_routine_service(
         mapper=mapper,
         redis_key=RedisResourceKey.ROUTINES,
     )
+
+
+class AsyncRoutineService(AsyncBaseService, RoutineService):
+    pass
+
+
+async def get_async_routine_service(
+    redis_service: AsyncRedisService = Depends(get_async_redis_service),
+    session: AsyncSession = Depends(get_async_db),
+):
+    return AsyncRoutineService(
+        redis_service=redis_service,
+        repository=RoutineRepository(),
+        db_session=session,
+        mapper=RoutineMapper(),
+        redis_key=RedisResourceKey.ROUTINES,
+    )
@@ -1,12 +1,31 @@
-from app.dependencies import get_db
-from fastapi import Depends
+from app.dependencies import get_async_db, get_db
+from fastapi import Depends, HTTPException
 from app.services.redis_service import get_redis_service
-from app.services.redis_service import RedisResourceKey
+from app.services.base_redis_service import RedisResourceKey
 from app.routers.mappers.sessions_mapper import WorkoutSessionMapper
 from app.database.session_repository import SessionRepository
+from app.services.base_redis_service import CacheTag
 from app.services.redis_service import RedisService
 from app.services.base_service import BaseService
+from app.services.dashboard_service import ZONE_DURATION, DashboardService
+from app.database.dashboard_repository import UTC, DashboardRepository
+from app.services.async_base_service import AsyncBaseService
+from app.services.async_redis_service import (
+    AsyncRedisService,
+    get_async_redis_service,
+)
 from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+from app.database.models import WorkoutSession
+from app.routers.schemas.request_schemas import (
+    CreateWorkoutSessionRequest,
+    UpdateWorkoutSessionRequest,
+)
+from app.routers.schemas.response_schemas import SessionPageResponse, SessionResponse
+from typing import Iterable
+import base64
 
 
 class SessionService(BaseService):
@@ -26,6 +45,212 @@ class SessionService(BaseService):
             redis_key=redis_key,
         )
 
+    def get_page(
+        self,
+        limit: int,
+        cursor: str | None = None,
+        start_date: str | None = None,
+        end_date: str | None = None,
+    ):
+        """Returns a page of sessions, latest first, within an optional date range.
+
+        Pages are keyed by (created_at, id) instead of an offset, so a page costs
+        the same no matter how deep it is and stays stable while sessions are added.
+        Both dates are inclusive, formatted as YYYY-MM-DD, and span whole days of
+        the user's time zone.
+        """
+        user_timezone, zone_scope = (
+            self.get_zone() if start_date or end_date else (UTC, "")
+        )
+        decoded_cursor, start, end = self._parse_page(
+            cursor, start_date, end_date, user_timezone
+        )
+        return self.redis_service.get_or_load(
+            self._page_key(limit, cursor, start_date, end_date, zone_scope),
+            lambda db_session: self._load_page(
+                db_session, limit, decoded_cursor, start, end
+            ),
+            self.db_session,
+            tags=lambda page: self.get_cache_tags(page.items),
+            version=lambda page: self.get_list_version(page.items),
+        )
+
+    def get_zone(self) -> tuple[ZoneInfo, str]:
+        """Returns the user's time zone and its scope, shared with the dashboards."""
+        entry = self.redis_service.get_or_load(
+            DashboardService.build_zone_key(),
+            DashboardRepository().get_zone,
+            self.db_session,
+            duration=ZONE_DURATION,
+        )
+        return DashboardService.parse_zone(entry)
+
+    def _parse_page(
+        self,
+        cursor: str | None,
+        start_date: str | None,
+        end_date: str | None,
+        user_timezone: ZoneInfo,
+    ) -> tuple[tuple[datetime, int] | None, datetime | None, datetime | None]:
+        decoded_cursor = self.decode_cursor(cursor) if cursor else None
+        try:
+            start = self._day_start(start_date, user_timezone) if start_date else None
+            end = (
+                self._day_start(end_date, user_timezone) + timedelta(days=1)
+                if end_date
+                else None
+            )
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Dates must be YYYY-MM-DD")
+
+        return decoded_cursor, start, end
+
+    def _page_key(
+        self,
+        limit: int,
+        cursor: str | None,
+        start_date: str | None,
+        end_date: str | None,
+        zone_scope: str,
+    ) -> str:
+        return self.redis_service.build_key(
+            self.redis_key,
+            "page",
+            limit,
+            cursor or "",
+            start_date or "",
+            end_date or "",
+            zone_scope,
+        )
+
+    def _load_page(
+        self,
+        db_session: Session,
+        limit: int,
+        decoded_cursor: tuple[datetime, int] | None,
+        start: datetime | None,
+        end: datetime | None,
+    ) -> SessionPageResponse:
+        # one extra row tells whether another page follows
+        workout_sessions = self.repository.get_page(
+            db_session, limit + 1, decoded_cursor, start, end
+        )
+        page = workout_sessions[:limit]
+        return SessionPageResponse(
+            items=self.mapper.map_list_to_response(page),
+            next_cursor=self.encode_cursor(page[-1])
+            if len(workout_sessions) > limit
+            else None,
+        )
+
+    @staticmethod
+    def encode_cursor(workout_session: WorkoutSession) -> str:
+        # NOTE: isoformat keeps the microseconds stored by timestamptz
+        value = f"{workout_session.created_at.isoformat()}|{workout_session.id}"
+        return base64.urlsafe_b64encode(value.encode()).decode()
+
+    @staticmethod
+    def decode_cursor(cursor: str) -> tuple[datetime, int]:
+        try:
+            created_at, workout_session_id = (
+                base64.urlsafe_b64decode(cursor).decode().split("|")
+            )
+            return datetime.fromisoformat(created_at), int(workout_session_id)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    @staticmethod
+    def _day_start(day: str, user_timezone: ZoneInfo) -> datetime:
+        # NOTE: adding a day to it keeps the wall clock, so the end of a day stays
+        # at midnight across a DST change
+        return datetime.strptime(day, "%Y-%m-%d").replace(tzinfo=user_timezone)
+
+    def create(self, input_data: CreateWorkoutSessionRequest):
+        workout_session = self.repository.create(self.db_session, input_data)
+        record_exercise_ids = self.repository.upsert_personal_records(
+            self.db_session, workout_session
+        )
+
+        # remove cache
+        self.invalidate_cache(
+            self.get_invalidation_tags(workout_session)
+            + self.get_personal_record_tags(record_exercise_ids)
+        )
+
+        return self.mapper.transform_to_response(workout_session)
+
+    def update(self, obj_id: int, input_data: UpdateWorkoutSessionRequest):
+        # NOTE: loaded once, the repository updates the same session and sets
+        stored_session = self.repository.get_by_id(self.db_session, obj_id)
+        record_sets = self.repository.get_personal_record_sets(self.db_session, obj_id)
+        # records held by sets removed, lowered or moved by the update change too
+        previous_tags = self.get_invalidation_tags(
+            stored_session
+        ) + self.get_personal_record_tags(record_sets.values())
+        workout_session = self.repository.update(
+            self.db_session, obj_id, input_data, stored_session, record_sets
+        )
+        if not workout_session:
+            return None
+
+        record_exercise_ids = self.repository.upsert_personal_records(
+            self.db_session, workout_session
+        )
+
+        # remove cache
+        self.invalidate_cache(
+            previous_tags
+            + self.get_invalidation_tags(workout_session)
+            + self.get_personal_record_tags(record_exercise_ids)
+        )
+
+        return self.mapper.transform_to_response(workout_session)
+
+    def delete(self, obj_id: int):
+        tags = self.get_invalidation_tags(
+            self.repository.get_by_id(self.db_session, obj_id)
+        )
+        record_exercise_ids = self.repository.remove_by_id(self.db_session, obj_id)
+        # remove cache
+        self.invalidate_cache(tags + self.get_personal_record_tags(record_exercise_ids))
+
+        return True
+
+    def get_cache_tags(self, workout_sessions: list[SessionResponse]) -> list[str]:
+        return super().get_cache_tags(workout_sessions) + [
+            CacheTag.exercise(exercise.id)
+            for workout_session in workout_sessions
+            for exercise in workout_session.exercises or []
+            if exercise.id
+        ]
+
+    def get_invalidation_tags(
+        self, workout_session: WorkoutSession | None
+    ) -> list[str]:
+        tags = super().get_invalidation_tags(workout_session)
+        if not workout_session:
+            return tags
+
+        # every period holding one of the sets changes its dashboard totals
+        timestamps: set[datetime] = {workout_session.created_at} | {
+            session_exercise.created_at
+            for session_exercise in workout_session.exercise_links
+        }
+
+        # dashboards bucket the sets in the user's time zone
+        user_timezone = ZoneInfo(workout_session.user.timezone)
+        for day in {
+            timestamp.astimezone(user_timezone).date() for timestamp in timestamps
+        }:
+            tags.extend(CacheTag.periods(day))
+
+        return tags
+
+    @staticmethod
+    def get_personal_record_tags(exercise_ids: Iterable[int]) -> list[str]:
+        # personal records shown by exercises and routines
+        return [CacheTag.exercise(exercise_id) for exercise_id in exercise_ids]
+
 
 def get_session_service(
     redis_service: RedisService = Depends(get_redis_service),
@@ -40,3 +265,50 @@ def get_session_service(
         mapper=mapper,
         redis_key=RedisResourceKey.WORKOUT_SESSION,
     )
+
+
+class AsyncSessionService(AsyncBaseService, SessionService):
+    async def get_page(
+        self,
+        limit: int,
+        cursor: str | None = None,
+        start_date: str | None = None,
+        end_date: str | None = None,
+    ):
+        user_timezone, zone_scope = (
+            await self.get_zone() if start_date or end_date else (UTC, "")
+        )
+        decoded_cursor, start, end = self._parse_page(
+            cursor, start_date, end_date, user_timezone
+        )
+        return await self.redis_service.get_or_load(
+            self._page_key(limit, cursor, start_date, end_date, zone_scope),
+            lambda db_session: db_session.run_sync(
+                self._load_page, limit, decoded_cursor, start, end
+            ),
+            self.db_session,
+            tags=lambda page: self.get_cache_tags(page.items),
+            version=lambda page: self.get_list_version(page.items),
+        )
+
+    async def get_zone(self) -> tuple[ZoneInfo, str]:
+        entry = await self.redis_service.get_or_load(
+            DashboardService.build_zone_key(),
+            lambda db_session: db_session.run_sync(DashboardRepository().get_zone),
+            self.db_session,
+            duration=ZONE_DURATION,
+        )
+        return DashboardService.parse_zone(entry)
+
+
+async def get_async_session_service(
+    redis_service: AsyncRedisService = Depends(get_async_redis_service),
+    session: AsyncSession = Depends(get_async_db),
+):
+    return AsyncSessionService(
+        redis_service=redis_service,
+        repository=SessionRepository(),
+        db_session=session,
+        mapper=WorkoutSessionMapper(),
+        redis_key=RedisResourceKey.WORKOUT_SESSION,
+    )
@@ -0,0 +1,128 @@
+"""Compares the throughput of one worker serving the read routes sync and async.
+
+Starts a single uvicorn worker for each mode, ASYNC_ROUTES=0 then 1, and sends the
+same concurrent GET requests to both, reporting requests per second and latency
+percentiles. The database and redis of the environment are used as they are, run
+with CACHE_LOCAL_MAX_ENTRIES=0 to measure the redis round trips rather than the
+in-process tier, or against a stopped redis to measure the database path.
+
+Needs httpx, which is not an application dependency.
+
+Usage, from the backend directory:
+    python -m benchmarks.async_throughput [--concurrency 100] [--requests 3000]
+"""
+
+from contextlib import contextmanager
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+
+PATHS = [
+    "/api/v1/exercises",
+    "/api/v1/exercises/1",
+    "/api/v1/routines",
+    "/api/v1/sessions?limit=20",
+    "/api/v1/dashboards/glance",
+    "/api/v1/dashboards/weights/total/year",
+    "/api/v1/dashboards/series?from=2025-01-01&to=2025-12-31&granularity=month",
+]
+
+
+@contextmanager
+def serve(async_routes: bool, port: int):
+    env = {**os.environ, "ASYNC_ROUTES": "1" if async_routes else "0"}
+    server = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            "app.main:app",
+            "--port",
+            str(port),
+            "--log-level",
+            "warning",
+            "--no-access-log",
+            # NOTE: a saturated loop may run the default 5s keep alive timer before
+            # reading the next request of a connection, which resets it
+            "--timeout-keep-alive",
+            "60",
+        ],
+        env=env,
+        stdout=subprocess.DEVNULL,
+    )
+    try:
+        deadline = time.monotonic() + 30
+        while True:
+            try:
+                httpx.get(f"http://127.0.0.1:{port}/docs").raise_for_status()
+                break
+            except httpx.HTTPError:
+                if time.monotonic() > deadline or server.poll() is not None:
+                    raise RuntimeError("the server did not start")
+                time.sleep(0.2)
+        yield f"http://127.0.0.1:{port}"
+    finally:
+        server.terminate()
+        server.wait()
+
+
+async def run(base_url: str, concurrency: int, requests: int) -> tuple[float, list]:
+    latencies: list[float] = []
+    queue: asyncio.Queue = asyncio.Queue()
+    for index in range(requests):
+        queue.put_nowait(PATHS[index % len(PATHS)])
+
+    async def client_loop(client: httpx.AsyncClient):
+        while not queue.empty():
+            path = queue.get_nowait()
+            started_at = time.perf_counter()
+            response = await client.get(path)
+            response.raise_for_status()
+            latencies.append(time.perf_counter() - started_at)
+
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(
+        base_url=base_url, limits=limits, timeout=60
+    ) as client:
+        # warm the caches and the pools first
+        for path in PATHS:
+            (await client.get(path)).raise_for_status()
+
+        started_at = time.perf_counter()
+        await asyncio.gather(*(client_loop(client) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started_at
+
+    return elapsed, latencies
+
+
+def report(name: str, elapsed: float, latencies: list[float]):
+    percentiles = statistics.quantiles(latencies, n=100)
+    print(
+        f"{name:<6} {len(latencies) / elapsed:8.0f} req/s "
+        f"p50 {percentiles[49] * 1000:6.1f} ms  p99 {percentiles[98] * 1000:6.1f} ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--requests", type=int, default=3000)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    for async_routes in (False, True):
+        with serve(async_routes, args.port) as base_url:
+            elapsed, latencies = asyncio.run(
+                run(base_url, args.concurrency, args.requests)
+            )
+        report("async" if async_routes else "sync", elapsed, latencies)
+
+
+if __name__ == "__main__":
+    main()
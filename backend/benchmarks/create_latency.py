@@ -0,0 +1,194 @@
+"""Measures the latency of creating a workout session by number of sets.
+
+Creates sessions of 6 exercises with a growing number of sets inside a transaction
+that is rolled back at the end, with the former one ORM object per set create and
+with SessionRepository.create. Also reports the cursor executions per create, an
+executemany counts once although psycopg2 sends its UPDATEs one by one.
+
+Usage, from the backend directory:
+    python -m benchmarks.create_latency [--sets 6 30 60 120] [--runs 20]
+"""
+
+from datetime import datetime, timezone
+import argparse
+import statistics
+import time
+
+from sqlalchemy import event
+from sqlmodel import Session, select
+
+from app.database.daily_volume_repository import DailyVolumeRepository
+from app.database.models import (
+    Exercise,
+    PersonalRecord,
+    SessionExercise,
+    WorkoutSession,
+)
+from app.database.session_repository import SessionRepository
+from app.dependencies import engine
+from app.routers.schemas.request_schemas import CreateWorkoutSessionRequest
+
+EXERCISES = 6
+
+
+def seed(session: Session) -> list[Exercise]:
+    now = datetime.now(timezone.utc).timestamp()
+    exercises = [
+        Exercise(
+            name=f"create benchmark {index}",
+            created_at=now,
+            updated_at=now,
+            user_id=1,
+        )
+        for index in range(EXERCISES)
+    ]
+    session.add_all(exercises)
+    session.flush()
+    return exercises
+
+
+def build_request(
+    exercises: list[Exercise], sets: int, run: int
+) -> CreateWorkoutSessionRequest:
+    # heavier sets on every run, so each create beats the personal records
+    return CreateWorkoutSessionRequest(
+        name="create benchmark",
+        duration=3600,
+        exercises=[
+            CreateWorkoutSessionRequest.RoutineExerciseRequest(
+                id=exercise.id,
+                name=exercise.name,
+                sets=[
+                    CreateWorkoutSessionRequest.RoutineExerciseRequest.ExerciseSet(
+                        weight_lifted=run * 10 + set_index, reps_completed=5
+                    )
+                    for set_index in range(sets // EXERCISES)
+                ],
+            )
+            for exercise in exercises
+        ],
+    )
+
+
+def legacy_create(session: Session, input: CreateWorkoutSessionRequest):
+    """The former create, one ORM object per set and per personal record."""
+    now = datetime.now(timezone.utc)
+    workout_session = WorkoutSession(
+        name=input.name,
+        user_id=input.user_id,
+        created_at=now,
+        updated_at=now,
+        duration=input.duration,
+    )
+    session.add(workout_session)
+
+    total_weights: int = 0
+    personal_records = {
+        personal_record.exercise_id: personal_record
+        for personal_record in session.exec(
+            select(PersonalRecord).where(
+                PersonalRecord.exercise_id.in_(
+                    [exercise.id for exercise in input.exercises]
+                )
+            )
+        ).all()
+    }
+    for exercise_index, exercise in enumerate(input.exercises):
+        for set_index, exercise_set in enumerate(exercise.sets):
+            session_exercise = SessionExercise(
+                session=workout_session,
+                exercise_id=exercise.id,
+                exercise_name=exercise.name,
+                order=exercise_index + 1,
+                set_number=set_index + 1,
+                weight_lifted=exercise_set.weight_lifted,
+                reps_completed=exercise_set.reps_completed,
+                created_at=now,
+            )
+            total_weights += exercise_set.weight_lifted
+            session.add(session_exercise)
+
+            personal_record = personal_records.get(exercise.id)
+            if personal_record:
+                if personal_record.weight < exercise_set.weight_lifted:
+                    personal_record.weight = exercise_set.weight_lifted
+                    personal_record.updated_at = now.timestamp()
+                    personal_record.session_exercise = session_exercise
+            else:
+                personal_record = PersonalRecord(
+                    user_id=input.user_id,
+                    exercise_id=exercise.id,
+                    weight=exercise_set.weight_lifted,
+                    updated_at=now.timestamp(),
+                    session_exercise=session_exercise,
+                )
+                personal_records[exercise.id] = personal_record
+                session.add(personal_record)
+
+    workout_session.total_weights = total_weights
+    session.flush()
+    session.refresh(workout_session)
+    rollup = DailyVolumeRepository()
+    rollup.apply(session, rollup.contribution(workout_session))
+    return workout_session
+
+
+def measure(session: Session, name: str, create, exercises, sets: int, runs: int):
+    statements: list[int] = []
+
+    def count(*args):
+        statements[-1] += 1
+
+    event.listen(engine, "before_cursor_execute", count)
+    timings: list[float] = []
+    try:
+        for run in range(runs):
+            request = build_request(exercises, sets, run)
+            statements.append(0)
+            started_at = time.perf_counter()
+            create(session, request)
+            timings.append((time.perf_counter() - started_at) * 1000)
+            # NOTE: keep the identity map as small as in a request
+            session.expunge_all()
+    finally:
+        event.remove(engine, "before_cursor_execute", count)
+
+    print(
+        f"{sets:>4} sets  {name:<14} median {statistics.median(timings):7.2f} ms  "
+        f"max {max(timings):7.2f} ms  {statistics.median(statements):4.0f} statements"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sets", type=int, nargs="+", default=[6, 30, 60, 120])
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    with engine.connect() as connection:
+        transaction = connection.begin()
+        try:
+            with Session(bind=connection) as session:
+                exercises = seed(session)
+                exercise_ids = [exercise.id for exercise in exercises]
+                repository = SessionRepository()
+                for sets in args.sets:
+                    for name, create in [
+                        ("one per set", legacy_create),
+                        (
+                            "bulk",
+                            lambda session, request: repository.upsert_personal_records(
+                                session, repository.create(session, request)
+                            ),
+                        ),
+                    ]:
+                        exercises = session.exec(
+                            select(Exercise).where(Exercise.id.in_(exercise_ids))
+                        ).all()
+                        measure(session, name, create, exercises, sets, args.runs)
+        finally:
+            transaction.rollback()
+
+
+if __name__ == "__main__":
+    main()
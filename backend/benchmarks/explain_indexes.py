@@ -0,0 +1,149 @@
+"""Checks that the hot queries are planned with the indexes meant for them.
+
+Runs EXPLAIN on each query and fails when the expected index is not part of the plan.
+Small development databases are cheaper to scan sequentially, so sequential scans
+are disabled for the check unless --natural is given.
+
+Usage, from the backend directory:
+    python -m benchmarks.explain_indexes [--natural] [--analyze]
+"""
+
+from datetime import datetime, timedelta, timezone
+import argparse
+import sys
+
+from sqlalchemy import text
+from sqlmodel import Session, func, select
+
+from app.database.models import (
+    DailyUserVolume,
+    PersonalRecord,
+    RoutineExercise,
+    RoutineExerciseSet,
+    SessionExercise,
+    WorkoutSession,
+)
+from app.database.session_repository import SessionRepository
+from app.dependencies import engine
+
+
+def build_queries() -> list[tuple[str, str, object]]:
+    """Returns (description, expected index, statement) of every hot query."""
+    now = datetime.now(timezone.utc)
+    week_ago = now - timedelta(days=7)
+
+    return [
+        (
+            "dashboard weights lifted within a time range",
+            "uq_daily_user_volume_user_id_day_exercise_id",
+            select(func.sum(DailyUserVolume.total_weight)).where(
+                DailyUserVolume.user_id == 1,
+                DailyUserVolume.day >= week_ago.date(),
+                DailyUserVolume.day <= now.date(),
+            ),
+        ),
+        (
+            "personal record recompute, heaviest set of each exercise",
+            "ix_sessions_exercises_exercise_id_weight_lifted",
+            SessionRepository.select_heaviest_sets([1, 2]),
+        ),
+        (
+            "last workout of a user",
+            "ix_sessions_user_id_created_at",
+            select(WorkoutSession.created_at)
+            .where(WorkoutSession.user_id == 1)
+            .order_by(WorkoutSession.created_at.desc())
+            .limit(1),
+        ),
+        (
+            "sessions of a user within a time range",
+            "ix_sessions_user_id_created_at",
+            select(WorkoutSession).where(
+                WorkoutSession.user_id == 1,
+                WorkoutSession.created_at >= week_ago,
+                WorkoutSession.created_at < now,
+            ),
+        ),
+        (
+            "sets of a session",
+            "ix_sessions_exercises_session_id",
+            select(SessionExercise).where(SessionExercise.session_id == 1),
+        ),
+        (
+            "exercises of a routine",
+            "ix_routines_exercises_routine_id",
+            select(RoutineExercise).where(RoutineExercise.routine_id == 1),
+        ),
+        (
+            "sets of a routine exercise",
+            "ix_routines_exercises_sets_routine_exercise_id",
+            select(RoutineExerciseSet).where(
+                RoutineExerciseSet.routine_exercise_id == 1
+            ),
+        ),
+        (
+            "personal record of a removed set",
+            "ix_personal_records_session_exercise_id",
+            select(PersonalRecord).where(PersonalRecord.session_exercise_id == 1),
+        ),
+    ]
+
+
+def find_index_names(plan: dict) -> set[str]:
+    names: set[str] = set()
+    if "Index Name" in plan:
+        names.add(plan["Index Name"])
+    for child in plan.get("Plans", []):
+        names |= find_index_names(child)
+    return names
+
+
+def explain(session: Session, statement, analyze: bool) -> dict:
+    compiled = statement.compile(
+        dialect=engine.dialect, compile_kwargs={"literal_binds": True}
+    )
+    options = "ANALYZE, BUFFERS, FORMAT JSON" if analyze else "FORMAT JSON"
+    result = session.exec(text(f"EXPLAIN ({options}) {compiled}")).one()
+    return result[0][0]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--natural",
+        action="store_true",
+        help="keep sequential scans enabled, plans then depend on the table sizes",
+    )
+    parser.add_argument(
+        "--analyze", action="store_true", help="run the queries and report timings"
+    )
+    args = parser.parse_args()
+
+    failures = 0
+    with Session(engine) as session:
+        if not args.natural:
+            session.exec(text("SET LOCAL enable_seqscan = off"))
+
+        for description, index_name, statement in build_queries():
+            result = explain(session, statement, args.analyze)
+            used = find_index_names(result["Plan"])
+            ok = index_name in used
+            failures += not ok
+
+            timing = (
+                f" {result['Execution Time']:.3f}ms"
+                if "Execution Time" in result
+                else ""
+            )
+            print(
+                f"[{'ok' if ok else 'MISSING'}] {description}: expected {index_name}, "
+                f"used {sorted(used) or 'no index'}{timing}"
+            )
+
+        session.rollback()
+
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
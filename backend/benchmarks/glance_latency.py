@@ -0,0 +1,178 @@
+"""Measures the latency of the dashboard glance query on a large history.
+
+Seeds sessions and their sets (1M set rows by default, spread over the past years)
+inside a transaction that is rolled back at the end, then times the former four
+round trip glance against DashboardRepository.get_glance.
+
+Usage, from the backend directory:
+    python -m benchmarks.glance_latency [--sessions 50000] [--sets 20] [--runs 20]
+"""
+
+from datetime import datetime, timedelta, timezone
+import argparse
+import statistics
+import time
+
+from dateutil.relativedelta import relativedelta
+from sqlalchemy import text
+from sqlmodel import Session, case, func, select
+
+from app.database.dashboard_repository import DashboardRepository
+from app.database.models import SessionExercise, WorkoutSession
+from app.dependencies import engine
+
+# a session every 50 minutes, 50000 sessions go back almost 5 years
+SESSION_INTERVAL = 3000
+
+
+def seed(session: Session, sessions: int, sets: int):
+    now = datetime.now(timezone.utc)
+    session.exec(
+        text(
+            """
+            INSERT INTO sessions
+                (name, duration, total_weights, created_at, updated_at, user_id)
+            SELECT 'glance benchmark', 3600, 0, :now - g * :interval,
+                :now - g * :interval, 1
+            FROM generate_series(1, :sessions) g
+            """
+        ).bindparams(
+            now=now, interval=timedelta(seconds=SESSION_INTERVAL), sessions=sessions
+        )
+    )
+    session.exec(
+        text(
+            """
+            INSERT INTO sessions_exercises
+                (session_id, exercise_name, "order", set_type, set_number,
+                weight_lifted, reps_completed, created_at)
+            SELECT s.id, 'glance benchmark', 1, 'normal', n, 20, 10, s.created_at
+            FROM sessions s CROSS JOIN generate_series(1, :sets) n
+            WHERE s.name = 'glance benchmark'
+            """
+        ).bindparams(sets=sets)
+    )
+    # the rollup the session repository maintains on write
+    session.exec(
+        text(
+            """
+            INSERT INTO daily_user_volume
+                (user_id, day, exercise_id, total_weight, total_reps, total_sets,
+                session_count)
+            SELECT s.user_id, (se.created_at AT TIME ZONE 'UTC')::date,
+                se.exercise_id, sum(se.weight_lifted), sum(se.reps_completed),
+                count(*), count(DISTINCT se.session_id)
+            FROM sessions_exercises se JOIN sessions s ON s.id = se.session_id
+            WHERE s.name = 'glance benchmark'
+            GROUP BY 1, 2, 3
+            ON CONFLICT ON CONSTRAINT uq_daily_user_volume_user_id_day_exercise_id
+            DO UPDATE SET
+                total_weight = daily_user_volume.total_weight
+                    + EXCLUDED.total_weight,
+                total_reps = daily_user_volume.total_reps + EXCLUDED.total_reps,
+                total_sets = daily_user_volume.total_sets + EXCLUDED.total_sets,
+                session_count = daily_user_volume.session_count
+                    + EXCLUDED.session_count
+            """
+        )
+    )
+    session.exec(text("ANALYZE sessions, sessions_exercises, daily_user_volume"))
+
+
+def four_round_trips(session: Session):
+    """The glance as it used to be computed, one unfiltered query per figure."""
+    current_date_obj = datetime.now(timezone.utc)
+    week_start = current_date_obj - relativedelta(days=current_date_obj.weekday())
+    year_start = datetime(current_date_obj.year, 1, 1, tzinfo=timezone.utc)
+    now = current_date_obj
+
+    def between(column, start):
+        return (column > start) & (column < now)
+
+    return {
+        "total_workouts": session.exec(
+            select(
+                func.count(
+                    case((between(WorkoutSession.created_at, week_start), 1), else_=0)
+                )
+            )
+        ).one(),
+        "total_volumes": session.exec(
+            select(
+                func.sum(
+                    case(
+                        (
+                            between(SessionExercise.created_at, week_start),
+                            SessionExercise.weight_lifted,
+                        ),
+                        else_=0,
+                    )
+                )
+            )
+        ).one(),
+        "streaks": session.exec(
+            select(
+                func.count(
+                    case((between(WorkoutSession.created_at, year_start), 1), else_=0)
+                )
+            )
+        ).one(),
+        "last_workout": session.exec(
+            select(WorkoutSession.created_at)
+            .order_by(WorkoutSession.created_at.desc())
+            .limit(1)
+        ).one_or_none(),
+    }
+
+
+def measure(session: Session, name: str, load, runs: int):
+    load(session)
+    timings: list[float] = []
+    for _ in range(runs):
+        started_at = time.perf_counter()
+        load(session)
+        timings.append((time.perf_counter() - started_at) * 1000)
+
+    timings.sort()
+    print(
+        f"{name:<24} median {statistics.median(timings):>8.2f}ms "
+        f"p95 {timings[int(len(timings) * 0.95) - 1]:>8.2f}ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=50000)
+    parser.add_argument("--sets", type=int, default=20)
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    with engine.connect() as connection:
+        transaction = connection.begin()
+        # seeding runs past the statement timeout of the app
+        connection.exec_driver_sql("SET LOCAL statement_timeout = 0")
+        try:
+            with Session(bind=connection) as session:
+                started_at = time.perf_counter()
+                seed(session, args.sessions, args.sets)
+                set_rows = session.exec(
+                    select(func.count()).select_from(SessionExercise)
+                ).one()
+                print(
+                    f"seeded {args.sessions * args.sets} sets in "
+                    f"{time.perf_counter() - started_at:.1f}s, {set_rows} set rows"
+                )
+
+                measure(session, "four round trips", four_round_trips, args.runs)
+                measure(
+                    session,
+                    "single CTE statement",
+                    lambda session: DashboardRepository().get_glance(session),
+                    args.runs,
+                )
+        finally:
+            transaction.rollback()
+
+
+if __name__ == "__main__":
+    main()
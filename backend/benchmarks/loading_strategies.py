@@ -0,0 +1,233 @@
+"""Compares joined and selectin eager loading of the routine and session lists.
+
+Seeds routines and sessions inside a transaction that is rolled back at the end,
+then loads and maps both lists with the former joinedload trees and with the
+repositories. Reports the statements sent, the rows and bytes received, measured
+as the pg_column_size of the result rows, and the median time of a few runs.
+
+Usage, from the backend directory:
+    python -m benchmarks.loading_strategies [--routines 50] [--sessions 200]
+        [--exercises 8] [--sets 5] [--runs 5]
+"""
+
+from datetime import datetime, timedelta, timezone
+import argparse
+import statistics
+import time
+import uuid
+
+from sqlalchemy import event
+from sqlalchemy.orm import joinedload
+from sqlmodel import Session, select
+
+from app.database.models import (
+    Exercise,
+    Routine,
+    RoutineExercise,
+    RoutineExerciseSet,
+    SessionExercise,
+    WorkoutSession,
+)
+from app.database.routine_repository import RoutineRepository
+from app.database.session_repository import SessionRepository
+from app.dependencies import engine
+from app.routers.mappers.routines_mapper import RoutineMapper
+from app.routers.mappers.sessions_mapper import WorkoutSessionMapper
+
+
+class QueryCounter:
+    """Counts the statements executed on a connection and the rows they return.
+
+    With measure_bytes, every statement is run a second time wrapped in a query
+    summing the size of its rows, so timings taken meanwhile are meaningless.
+    """
+
+    def __init__(self, connection, measure_bytes: bool = False):
+        self.connection = connection
+        self.measure_bytes = measure_bytes
+        self.statements = 0
+        self.rows = 0
+        self.bytes = 0
+
+    def __enter__(self):
+        event.listen(self.connection, "after_cursor_execute", self._count)
+        return self
+
+    def __exit__(self, *args):
+        event.remove(self.connection, "after_cursor_execute", self._count)
+
+    def _count(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements += 1
+        self.rows += max(cursor.rowcount, 0)
+        if self.measure_bytes:
+            with cursor.connection.cursor() as size_cursor:
+                size_cursor.execute(
+                    f"SELECT coalesce(sum(pg_column_size(q.*)), 0) FROM ({statement}) q",
+                    parameters,
+                )
+                self.bytes += size_cursor.fetchone()[0]
+
+
+def seed(session: Session, routines: int, sessions: int, exercises: int, sets: int):
+    now = datetime.now(timezone.utc)
+    timestamp = now.timestamp()
+    prefix = uuid.uuid4().hex[:8]
+    exercise_rows = [
+        Exercise(
+            name=f"benchmark {prefix} {index}",
+            created_at=timestamp,
+            updated_at=timestamp,
+            user_id=1,
+        )
+        for index in range(exercises)
+    ]
+    session.add_all(exercise_rows)
+    session.flush()
+
+    for routine_index in range(routines):
+        session.add(
+            Routine(
+                name=f"benchmark {prefix} {routine_index}",
+                created_at=timestamp,
+                updated_at=timestamp,
+                user_id=1,
+                exercise_links=[
+                    RoutineExercise(
+                        exercise_id=exercise.id,
+                        order=order + 1,
+                        created_at=timestamp,
+                        updated_at=timestamp,
+                        routine_exercise_sets=[
+                            RoutineExerciseSet(
+                                set_number=set_number + 1,
+                                targeted_weight=20,
+                                targeted_reps=10,
+                            )
+                            for set_number in range(sets)
+                        ],
+                    )
+                    for order, exercise in enumerate(exercise_rows)
+                ],
+            )
+        )
+
+    for session_index in range(sessions):
+        created_at = now - timedelta(days=session_index)
+        session.add(
+            WorkoutSession(
+                name=f"benchmark {prefix} {session_index}",
+                created_at=created_at,
+                updated_at=created_at,
+                user_id=1,
+                exercise_links=[
+                    SessionExercise(
+                        exercise_id=exercise.id,
+                        exercise_name=exercise.name,
+                        order=order + 1,
+                        set_number=set_number + 1,
+                        weight_lifted=20,
+                        reps_completed=10,
+                        created_at=created_at,
+                    )
+                    for order, exercise in enumerate(exercise_rows)
+                    for set_number in range(sets)
+                ],
+            )
+        )
+    session.flush()
+    # NOTE: plan with the seeded rows, they are visible to this transaction only
+    session.connection().exec_driver_sql(
+        "ANALYZE routines, routines_exercises, routines_exercises_sets, "
+        "sessions, sessions_exercises"
+    )
+
+
+def joined_routines(session: Session):
+    return (
+        session.exec(
+            select(Routine).options(
+                joinedload(Routine.exercise_links).options(
+                    joinedload(RoutineExercise.routine_exercise_sets),
+                    joinedload(RoutineExercise.exercise).joinedload(
+                        Exercise.personal_record
+                    ),
+                )
+            )
+        )
+        .unique()
+        .all()
+    )
+
+
+def joined_sessions(session: Session):
+    return (
+        session.exec(
+            select(WorkoutSession).options(
+                joinedload(WorkoutSession.exercise_links).joinedload(
+                    SessionExercise.exercise
+                )
+            )
+        )
+        .unique()
+        .all()
+    )
+
+
+def measure(connection, name: str, load, mapper, runs: int):
+    # NOTE: a fresh session each time, nothing is served from the identity map
+    with Session(bind=connection) as session:
+        with QueryCounter(connection, measure_bytes=True) as counter:
+            results = mapper.map_list_to_response(load(session))
+
+    timings: list[float] = []
+    for _ in range(runs):
+        with Session(bind=connection) as session:
+            started_at = time.perf_counter()
+            mapper.map_list_to_response(load(session))
+            timings.append((time.perf_counter() - started_at) * 1000)
+
+    print(
+        f"{name:<24} {len(results):>6} objects {counter.statements:>4} statements "
+        f"{counter.rows:>8} rows {counter.bytes / 1024:>9.1f}KiB "
+        f"{statistics.median(timings):>8.1f}ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--routines", type=int, default=50)
+    parser.add_argument("--sessions", type=int, default=200)
+    parser.add_argument("--exercises", type=int, default=8)
+    parser.add_argument("--sets", type=int, default=5)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    with engine.connect() as connection:
+        transaction = connection.begin()
+        # seeding runs past the statement timeout of the app
+        connection.exec_driver_sql("SET LOCAL statement_timeout = 0")
+        try:
+            with Session(bind=connection) as session:
+                seed(session, args.routines, args.sessions, args.exercises, args.sets)
+
+            for name, load, mapper in [
+                ("routines joinedload", joined_routines, RoutineMapper()),
+                (
+                    "routines selectinload",
+                    lambda session: RoutineRepository().get_all(session),
+                    RoutineMapper(),
+                ),
+                ("sessions joinedload", joined_sessions, WorkoutSessionMapper()),
+                (
+                    "sessions selectinload",
+                    lambda session: SessionRepository().get_all(session),
+                    WorkoutSessionMapper(),
+                ),
+            ]:
+                measure(connection, name, load, mapper, args.runs)
+        finally:
+            transaction.rollback()
+
+
+if __name__ == "__main__":
+    main()
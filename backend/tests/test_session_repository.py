@@ -0,0 +1,406 @@
+"""Tests of SessionRepository against the development database.
+
+Every test runs in a transaction rolled back at the end, nothing is kept. Skipped
+when the DATABASE_* variables are not set, see conftest.py.
+
+Usage, from the backend directory:
+    python -m pytest tests
+"""
+
+from datetime import datetime, timezone
+from decimal import Decimal
+import uuid
+
+import pytest
+from sqlmodel import Session, select
+
+from app.database.exercise_repository import ExerciseRepository
+from app.database.models import (
+    DailyUserVolume,
+    Exercise,
+    PersonalRecord,
+    SessionExercise,
+    User,
+    WorkoutSession,
+)
+from app.database.session_repository import SessionRepository
+from app.dependencies import engine
+from app.routers.schemas.request_schemas import (
+    CreateWorkoutSessionRequest,
+    UpdateWorkoutSessionRequest,
+)
+
+
+@pytest.fixture
+def session():
+    with engine.connect() as connection:
+        transaction = connection.begin()
+        with Session(
+            bind=connection, join_transaction_mode="create_savepoint"
+        ) as db_session:
+            yield db_session
+        transaction.rollback()
+
+
+@pytest.fixture
+def user(session: Session) -> User:
+    timestamp = datetime.now(timezone.utc).timestamp()
+    user = User(
+        username=f"test-{uuid.uuid4().hex}",
+        timezone="UTC",
+        created_at=timestamp,
+        updated_at=timestamp,
+    )
+    session.add(user)
+    session.flush()
+    return user
+
+
+def create_exercise(session: Session, user: User, name: str) -> Exercise:
+    timestamp = datetime.now(timezone.utc).timestamp()
+    exercise = Exercise(
+        name=f"{name}-{uuid.uuid4().hex}",
+        description=None,
+        created_at=timestamp,
+        updated_at=timestamp,
+        user_id=user.id,
+    )
+    session.add(exercise)
+    session.flush()
+    return exercise
+
+
+def get_record(session: Session, exercise: Exercise) -> PersonalRecord | None:
+    return session.exec(
+        select(PersonalRecord).where(PersonalRecord.exercise_id == exercise.id)
+    ).one_or_none()
+
+
+def get_volume(session: Session, user: User, exercise: Exercise) -> Decimal:
+    return sum(
+        session.exec(
+            select(DailyUserVolume.total_weight).where(
+                DailyUserVolume.user_id == user.id,
+                DailyUserVolume.exercise_id == exercise.id,
+            )
+        ).all(),
+        Decimal(0),
+    )
+
+
+def get_rollup(session: Session, user: User) -> list[tuple]:
+    """Rows of the user's rollup, comparable with the ones rebuild writes."""
+    session.flush()
+    return sorted(
+        (
+            (
+                row.day,
+                row.exercise_id,
+                row.total_weight,
+                row.total_reps,
+                row.total_sets,
+                row.session_count,
+            )
+            for row in session.exec(
+                select(DailyUserVolume).where(DailyUserVolume.user_id == user.id)
+            ).all()
+        ),
+        key=lambda row: (row[0], row[1] or 0),
+    )
+
+
+def assert_rollup_is_rebuilt(
+    session: Session, repository: SessionRepository, user: User
+):
+    rollup = get_rollup(session, user)
+    repository.daily_volume_repository.rebuild(session, user.id, user.timezone)
+    assert rollup == get_rollup(session, user)
+
+
+def create_workout_session(
+    repository: SessionRepository,
+    session: Session,
+    user: User,
+    *exercise_sets: tuple[Exercise, list[dict]],
+) -> WorkoutSession:
+    workout_session = repository.create(
+        session,
+        CreateWorkoutSessionRequest(
+            name="workout",
+            user_id=user.id,
+            exercises=[
+                CreateWorkoutSessionRequest.RoutineExerciseRequest(
+                    id=exercise.id, name=exercise.name, sets=sets
+                )
+                for exercise, sets in exercise_sets
+            ],
+        ),
+    )
+    repository.upsert_personal_records(session, workout_session)
+    return workout_session
+
+
+def test_create_inserts_the_sets_the_rollup_and_the_records(
+    session: Session, user: User
+):
+    repository = SessionRepository()
+    squat = create_exercise(session, user, "squat")
+    plank = create_exercise(session, user, "plank")
+
+    workout_session = create_workout_session(
+        repository,
+        session,
+        user,
+        (
+            squat,
+            [
+                {"weight_lifted": 60, "reps_completed": 5},
+                {"weight_lifted": 100, "reps_completed": 3},
+            ],
+        ),
+        (plank, [{"weight_lifted": None, "reps_completed": 1}]),
+    )
+    session.expire_all()
+
+    sets = session.exec(
+        select(SessionExercise)
+        .where(SessionExercise.session_id == workout_session.id)
+        .order_by(SessionExercise.order, SessionExercise.set_number)
+    ).all()
+    assert [
+        (set_row.exercise_id, set_row.order, set_row.set_number, set_row.weight_lifted)
+        for set_row in sets
+    ] == [
+        (squat.id, 1, 1, Decimal(60)),
+        (squat.id, 1, 2, Decimal(100)),
+        (plank.id, 2, 1, Decimal(0)),
+    ]
+    assert session.get(WorkoutSession, workout_session.id).total_weights == 160
+
+    day = workout_session.created_at.date()
+    assert get_rollup(session, user) == [
+        (day, squat.id, Decimal(160), 8, 2, 1),
+        (day, plank.id, Decimal(0), 1, 1, 1),
+    ]
+    assert_rollup_is_rebuilt(session, repository, user)
+
+    assert get_record(session, squat).session_exercise_id == sets[1].id
+    assert get_record(session, squat).weight == Decimal(100)
+    assert get_record(session, plank).weight == Decimal(0)
+
+
+def test_remove_by_id_negates_the_rollup_and_recomputes_the_records(
+    session: Session, user: User
+):
+    repository = SessionRepository()
+    squat = create_exercise(session, user, "squat")
+    lunge = create_exercise(session, user, "lunge")
+
+    first_session = create_workout_session(
+        repository,
+        session,
+        user,
+        (squat, [{"weight_lifted": 80, "reps_completed": 5}]),
+    )
+    (first_set,) = first_session.exercise_links
+    second_session = create_workout_session(
+        repository,
+        session,
+        user,
+        (squat, [{"weight_lifted": 100, "reps_completed": 5}]),
+        (lunge, [{"weight_lifted": 40, "reps_completed": 8}]),
+    )
+    assert get_record(session, squat).weight == Decimal(100)
+
+    assert sorted(repository.remove_by_id(session, second_session.id)) == sorted(
+        [squat.id, lunge.id]
+    )
+    session.expire_all()
+
+    assert get_rollup(session, user) == [
+        (first_session.created_at.date(), squat.id, Decimal(80), 5, 1, 1)
+    ]
+    assert_rollup_is_rebuilt(session, repository, user)
+
+    squat_record = get_record(session, squat)
+    assert squat_record.session_exercise_id == first_set.id
+    assert squat_record.weight == Decimal(80)
+    assert get_record(session, lunge) is None
+
+
+def test_removing_an_exercise_moves_its_rollup_to_the_rows_without_exercise(
+    session: Session, user: User
+):
+    repository = SessionRepository()
+    squat = create_exercise(session, user, "squat")
+    lunge = create_exercise(session, user, "lunge")
+    curl = create_exercise(session, user, "curl")
+
+    create_workout_session(
+        repository,
+        session,
+        user,
+        (squat, [{"weight_lifted": 100, "reps_completed": 5}]),
+        (lunge, [{"weight_lifted": 40, "reps_completed": 8}]),
+    )
+    create_workout_session(
+        repository, session, user, (squat, [{"weight_lifted": 90, "reps_completed": 5}])
+    )
+    lunge_session = create_workout_session(
+        repository, session, user, (lunge, [{"weight_lifted": 50, "reps_completed": 8}])
+    )
+    curl_session = create_workout_session(
+        repository, session, user, (curl, [{"weight_lifted": 20, "reps_completed": 10}])
+    )
+
+    # the second removal merges into the rows the first one left without exercise
+    ExerciseRepository().remove_by_id(session, lunge.id)
+    session.flush()
+    ExerciseRepository().remove_by_id(session, squat.id)
+    session.flush()
+
+    day = curl_session.created_at.date()
+    assert get_rollup(session, user) == [
+        (day, None, Decimal(280), 26, 4, 3),
+        (day, curl.id, Decimal(20), 10, 1, 1),
+    ]
+    assert_rollup_is_rebuilt(session, repository, user)
+
+    # the sets left without exercise are still subtracted from the right rows
+    repository.remove_by_id(session, lunge_session.id)
+    session.expire_all()
+    assert get_rollup(session, user) == [
+        (day, None, Decimal(230), 18, 3, 2),
+        (day, curl.id, Decimal(20), 10, 1, 1),
+    ]
+    assert_rollup_is_rebuilt(session, repository, user)
+
+
+def test_update_moves_a_set_to_another_exercise(session: Session, user: User):
+    repository = SessionRepository()
+    squat = create_exercise(session, user, "squat")
+    lunge = create_exercise(session, user, "lunge")
+
+    workout_session = repository.create(
+        session,
+        CreateWorkoutSessionRequest(
+            name="legs",
+            user_id=user.id,
+            exercises=[
+                CreateWorkoutSessionRequest.RoutineExerciseRequest(
+                    id=squat.id,
+                    name=squat.name,
+                    sets=[
+                        {"weight_lifted": 100, "reps_completed": 5},
+                        {"weight_lifted": 60, "reps_completed": 5},
+                    ],
+                ),
+                CreateWorkoutSessionRequest.RoutineExerciseRequest(
+                    id=lunge.id,
+                    name=lunge.name,
+                    sets=[{"weight_lifted": 80, "reps_completed": 5}],
+                ),
+            ],
+        ),
+    )
+    repository.upsert_personal_records(session, workout_session)
+    heavy_set, light_set, lunge_set = sorted(
+        workout_session.exercise_links,
+        key=lambda session_exercise: (
+            session_exercise.order,
+            session_exercise.set_number,
+        ),
+    )
+    assert get_record(session, squat).session_exercise_id == heavy_set.id
+    assert get_record(session, lunge).session_exercise_id == lunge_set.id
+
+    # the heaviest squat set was logged under the wrong exercise
+    workout_session = repository.update(
+        session,
+        workout_session.id,
+        UpdateWorkoutSessionRequest(
+            user_id=user.id,
+            exercises=[
+                UpdateWorkoutSessionRequest.RoutineExerciseRequest(
+                    id=squat.id,
+                    name=squat.name,
+                    sets=[
+                        {"id": light_set.id, "weight_lifted": 60, "reps_completed": 5}
+                    ],
+                ),
+                UpdateWorkoutSessionRequest.RoutineExerciseRequest(
+                    id=lunge.id,
+                    name=lunge.name,
+                    sets=[
+                        {"id": lunge_set.id, "weight_lifted": 80, "reps_completed": 5},
+                        {"id": heavy_set.id, "weight_lifted": 100, "reps_completed": 5},
+                    ],
+                ),
+            ],
+        ),
+    )
+    repository.upsert_personal_records(session, workout_session)
+    session.expire_all()
+
+    moved_set = session.get(SessionExercise, heavy_set.id)
+    assert moved_set.exercise_id == lunge.id
+    assert moved_set.exercise_name == lunge.name
+
+    squat_record = get_record(session, squat)
+    assert squat_record.session_exercise_id == light_set.id
+    assert squat_record.weight == Decimal(60)
+    lunge_record = get_record(session, lunge)
+    assert lunge_record.session_exercise_id == heavy_set.id
+    assert lunge_record.weight == Decimal(100)
+
+    assert get_volume(session, user, squat) == Decimal(60)
+    assert get_volume(session, user, lunge) == Decimal(180)
+
+
+def test_update_removes_the_record_of_an_exercise_left_without_sets(
+    session: Session, user: User
+):
+    repository = SessionRepository()
+    squat = create_exercise(session, user, "squat")
+    lunge = create_exercise(session, user, "lunge")
+
+    workout_session = repository.create(
+        session,
+        CreateWorkoutSessionRequest(
+            name="legs",
+            user_id=user.id,
+            exercises=[
+                CreateWorkoutSessionRequest.RoutineExerciseRequest(
+                    id=squat.id,
+                    name=squat.name,
+                    sets=[{"weight_lifted": 100, "reps_completed": 5}],
+                ),
+            ],
+        ),
+    )
+    repository.upsert_personal_records(session, workout_session)
+    (squat_set,) = workout_session.exercise_links
+
+    workout_session = repository.update(
+        session,
+        workout_session.id,
+        UpdateWorkoutSessionRequest(
+            user_id=user.id,
+            exercises=[
+                UpdateWorkoutSessionRequest.RoutineExerciseRequest(
+                    id=lunge.id,
+                    name=lunge.name,
+                    sets=[
+                        {"id": squat_set.id, "weight_lifted": 100, "reps_completed": 5}
+                    ],
+                ),
+            ],
+        ),
+    )
+    repository.upsert_personal_records(session, workout_session)
+    session.expire_all()
+
+    assert get_record(session, squat) is None
+    assert get_record(session, lunge).session_exercise_id == squat_set.id
+    assert get_volume(session, user, squat) == Decimal(0)
+    assert get_volume(session, user, lunge) == Decimal(100)
@@ -99,8 +99,17 @@ export class ApiService {
       );
   }
 
-  getSessions(): Observable<object> {
-    return this.http.get(this.sessionsAPI).pipe(
+  // returns a page of the latest sessions, pass its next_cursor back as cursor
+  // to get the older ones
+  getSessions(limit?: number, cursor?: string | null): Observable<object> {
+    const params: { limit?: number; cursor?: string } = {};
+    if (limit) {
+      params.limit = limit;
+    }
+    if (cursor) {
+      params.cursor = cursor;
+    }
+    return this.http.get(this.sessionsAPI, { params }).pipe(
       catchError((error: HttpErrorResponse) => {
         return throwError(() => this.catchError(error));
       }),
@@ -5,7 +5,11 @@ import { TableModule } from 'primeng/table';
 import { FormsModule } from '@angular/forms';
 import { CommonModule, DatePipe } from '@angular/common';
 import { Router } from '@angular/router';
-import { DashboardGlance, Session } from '../../shared/models/models';
+import {
+  DashboardGlance,
+  Session,
+  SessionPage,
+} from '../../shared/models/models';
 import { ApiService } from '../../core/services/api.service';
 import { Subject, takeUntil } from 'rxjs';
 import { ExerciseSummaryPipe } from '../../shared/pipes/exercise-summary.pipe';
@@ -57,12 +61,10 @@ export class DashboardsComponent implements OnInit, OnDestroy {
   fetchRecentSessions() {
     this.recentSessionsLoading = true;
     this.apiService
-      .getSessions()
+      .getSessions(5)
       .pipe(takeUntil(this.destroy$))
       .subscribe((data) => {
-        this.recentSessions = data as Session[];
-        // TODO: add pagination
-        this.recentSessions = this.recentSessions.slice(0, 5);
+        this.recentSessions = (data as SessionPage).items;
         this.recentSessionsLoading = false;
       });
   }
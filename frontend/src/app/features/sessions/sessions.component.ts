@@ -3,7 +3,7 @@ import { ButtonModule } from 'primeng/button';
 import { CardModule } from 'primeng/card';
 import { ApiService } from '../../core/services/api.service';
 import { Subject, takeUntil } from 'rxjs';
-import { Session } from '../../shared/models/models';
+import { Session, SessionPage } from '../../shared/models/models';
 import { ScrollPanelModule } from 'primeng/scrollpanel';
 import { ExerciseSummaryPipe } from '../../shared/pipes/exercise-summary.pipe';
 import { Router } from '@angular/router';
@@ -20,6 +20,9 @@ export class SessionsComponent implements OnInit, OnDestroy {
   private router = inject(Router);
 
   public sessions: Session[] = [];
+  // cursor of the next, older page, null once the last page is loaded
+  public nextCursor: string | null = null;
+  public loadingMore = false;
 
   ngOnInit(): void {
     this.fetchSession();
@@ -30,7 +33,30 @@ export class SessionsComponent implements OnInit, OnDestroy {
       .getSessions()
       .pipe(takeUntil(this.destroy$))
       .subscribe((data) => {
-        this.sessions = data as Session[];
+        const page = data as SessionPage;
+        this.sessions = page.items;
+        this.nextCursor = page.next_cursor ?? null;
+      });
+  }
+
+  loadMoreSessions() {
+    if (!this.nextCursor || this.loadingMore) {
+      return;
+    }
+    this.loadingMore = true;
+    this.apiService
+      .getSessions(undefined, this.nextCursor)
+      .pipe(takeUntil(this.destroy$))
+      .subscribe({
+        next: (data) => {
+          const page = data as SessionPage;
+          this.sessions = [...this.sessions, ...page.items];
+          this.nextCursor = page.next_cursor ?? null;
+          this.loadingMore = false;
+        },
+        error: () => {
+          this.loadingMore = false;
+        },
       });
   }
 
@@ -55,6 +55,12 @@ export interface Session {
   total_weights?: number;
 }
 
+export interface SessionPage {
+  items: Session[];
+  // pass it back as cursor to get the next page, null on the last page
+  next_cursor?: string | null;
+}
+
 export interface SessionExercise {
   id: number;
   name?: string | null;